@@ -5,6 +5,16 @@ class API:
     URL_DESCRIPTION = 'description'
     MESSAGE = 'message'
     STATUS_CODE = 'status_code'
+    LIMIT = 'limit'
+    CURSOR = 'cursor'
+    FIELDS = 'fields'
+    QUERY = 'q'
+    TYPE = 'type'
+    SORT = 'sort'
+    STAT = 'stat'
+    SEASON = 'season'
+    WEEKS = 'weeks'
+    MATCH_DAY = 'match_day'
 
 
 class API_ERROR:
@@ -12,6 +22,7 @@ class API_ERROR:
     TEAM_404 = 'There is no team with those filters'
     MATCH_404 = 'There is no matches with those filters'
     STANDINGS_404 = 'There is no standings with those filters'
+    DERIVED_STANDINGS_404 = 'There is no finished match to derive standings from'
     PLAYER_404 = 'There is no players with those filters'
     STATS_404 = 'There is no stats with those filters'
     INTEGER_LIMIT_400 = 'Limit must be an integer'
@@ -21,6 +32,18 @@ class API_ERROR:
     MISSING_FILTER_400 = 'You have not specified a filter to this endpoint'
     RESOURCE_NOT_FOUND_404 = "The resource you're looking for could not be found"
     STANDINGS_MAX_LIMIT_400 = 'Invalid limit, the limit per table is 20'
+    POSITIVE_LIMIT_400 = 'Limit must be greater than 0'
+    INVALID_CURSOR_400 = 'Invalid cursor, use the next link returned with the previous page'
+    INVALID_FIELDS_400 = 'Invalid fields requested'
+    MISSING_QUERY_400 = 'You need to provide a name to search for e.g. ?q=salah'
+    INVALID_SEARCH_TYPE_400 = 'Invalid type, search player, team and / or competition'
+    SEARCH_404 = 'There is no player, team or competition with a similar name'
+    PLAYER_AGGREGATES_404 = 'There is no player aggregates with those filters'
+    INVALID_SORT_400 = 'Invalid sort, sort on an aggregate field e.g. ?sort=-fantasy_points'
+    MISSING_STAT_400 = 'You need to provide a stat to rank players on e.g. ?stat=fantasy_threat'
+    INVALID_STAT_400 = 'Invalid stat, rank on an aggregate or match stats field e.g. goals_scored, own_goals'
+    INVALID_WINDOW_400 = 'Season and weeks must be integers, weeks 0 or more'
+    LEADERBOARD_404 = 'There is no players with stats for that leaderboard'
 
 
 class API_ENDPOINTS:
@@ -29,17 +52,29 @@ class API_ENDPOINTS:
     MATCH = 'match'
     PLAYER = 'player'
     STANDINGS = 'standings'
+    DERIVED_STANDINGS = 'standings/derived'
     STATS = 'stats'
+    SEARCH = 'search'
+    PLAYER_AGGREGATES = 'player/aggregates'
+    LEADERBOARD = 'leaderboard'
 
 class DB_QUERY_FIELD:
     PLAYER_ID = 'player_id'
     MATCH_ID = 'match_id'
 
+
+# Query parameters shaping the response rather than filtering it
+RESPONSE_ARGS = [API.LIMIT, API.CURSOR, API.FIELDS]
+
 ENDPOINT_DESCRIPTION = {
     API_ENDPOINTS.TEAMS: "Details about each team",
     API_ENDPOINTS.COMPETITIONS: "Base information about competitions",
     API_ENDPOINTS.MATCH: "Details of a specific match",
     API_ENDPOINTS.PLAYER: "Retrieve specific player details",
     API_ENDPOINTS.STANDINGS: "Get standings for a specific competition",
-    API_ENDPOINTS.STATS: "Get different match stats for different players"
+    API_ENDPOINTS.DERIVED_STANDINGS: "League tables at any match day, computed from the stored match results",
+    API_ENDPOINTS.STATS: "Get different match stats for different players",
+    API_ENDPOINTS.SEARCH: "Fuzzy search players, teams and competitions by name",
+    API_ENDPOINTS.PLAYER_AGGREGATES: "Player season and last game weeks totals, sortable on any total",
+    API_ENDPOINTS.LEADERBOARD: "Top players on a stat over a season or its last game weeks"
 }
@@ -1,9 +1,14 @@
+from urllib.parse import urlencode
+import orjson
 from flask import request, jsonify, Blueprint, current_app, abort
 from flask_limiter import Limiter
-from api_engine.api_cons import API_ENDPOINTS, API, ENDPOINT_DESCRIPTION, API_ERROR, DB_QUERY_FIELD
-from db_engine.db_filters import TeamFilters, StandingsFilters, CompFilters, MatchFilters, PlayerFilters, StatFilters
+from api_engine.api_cons import API_ENDPOINTS, API, ENDPOINT_DESCRIPTION, API_ERROR, DB_QUERY_FIELD, RESPONSE_ARGS
+from db_engine.db_filters import TeamFilters, StandingsFilters, CompFilters, MatchFilters, PlayerFilters, StatFilters, \
+    PlayerAggregateFilters, LeaderboardFilters
+from api_engine.response_cache import cached_view
+from db_engine.db_interface import decode_cursor, InvalidCursor, InvalidFields, InvalidSort
 from ingest_engine.ingest_driver import Driver
-from ingest_engine.cons import Standings, Competition
+from ingest_engine.cons import Standings, Competition, PlayerAggregate, Search as SEARCH, CURRENT_SEASON
 from sqlalchemy import exc
 import logging
 
@@ -63,6 +68,59 @@ def get_vals(v):
     return None
 
 
+def page_args(ra, default_limit=10):
+    """
+    Parse the pagination query parameters
+    :param ra: request args
+    :param default_limit: page size when no limit is given
+    :return: page size and cursor of the requested page (None for the first page)
+    :rtype: tuple
+    """
+    try:
+        limit = int(ra.get(API.LIMIT, default_limit))
+    except ValueError:
+        raise InvalidUsage(API_ERROR.INTEGER_LIMIT_400, status_code=400)
+
+    if limit < 1:
+        raise InvalidUsage(API_ERROR.POSITIVE_LIMIT_400, status_code=400)
+
+    cursor = ra.get(API.CURSOR)
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except InvalidCursor:
+            raise InvalidUsage(API_ERROR.INVALID_CURSOR_400, status_code=400)
+
+    return limit, cursor
+
+
+def fields_arg(ra):
+    """
+    Parse the field projection query parameter e.g. ?fields=name,team,fantasy_price
+    :param ra: request args
+    :return: requested field names, None when every field is requested
+    :rtype: list
+    """
+    fields = [field.strip() for field in ra.get(API.FIELDS, '').split(',') if field.strip()]
+    return fields or None
+
+
+def paginated_response(result, next_cursor):
+    """
+    JSON response for a page of results, with a Link header to the next page when there is one
+    Records are plain dicts of column values so they are encoded by orjson straight into the body
+    :param result: page of results
+    :param next_cursor: cursor of the next page, None on the last page
+    :return: Flask response
+    """
+    response = current_app.response_class(orjson.dumps(result), mimetype='application/json')
+    if next_cursor:
+        next_url = f'{request.base_url}?{urlencode({**request.args.to_dict(), API.CURSOR: next_cursor})}'
+        response.headers['Link'] = f'<{next_url}>; rel="next"'
+
+    return response
+
+
 class InvalidUsage(Exception):
     status_code = 400
 
@@ -157,6 +215,7 @@ def competition():
 
 @api_service.route('/team/all', methods=['GET'])
 @api_service.route('/team', methods=['GET'])
+@cached_view
 def team():
     """
     /v1/team/all will be used to allow OR type querying across all the available teams
@@ -167,16 +226,22 @@ def team():
         db_interface = current_app.config['db_interface']
     multi = 'team/all' in request.url_rule.rule
     ra = request.args
-    limit = ra.get("limit", 10)
+    limit, cursor = page_args(ra)
     result = {}
-    try:
-        limit = int(limit)
-    except ValueError:
-        raise InvalidUsage(API_ERROR.INTEGER_LIMIT_400, status_code=400)
 
     try:
-        team_filters = TeamFilters(**{k: get_vals(v) for k, v in ra.items() if k != "limit"})
-        result = jsonify(db_interface.get_team(limit=limit, multi=multi, filters=team_filters))
+        team_filters = TeamFilters(**{k: get_vals(v) for k, v in ra.items() if k not in RESPONSE_ARGS})
+        result, next_cursor = db_interface.get_team(limit=limit, multi=multi, filters=team_filters, cursor=cursor,
+                                                    fields=fields_arg(ra))
+
+    except InvalidFields:
+        raise InvalidUsage(API_ERROR.INVALID_FIELDS_400, status_code=400)
+
+    except InvalidCursor:
+        raise InvalidUsage(API_ERROR.INVALID_CURSOR_400, status_code=400)
+
+    except ValueError:  # Filter values that can't be parsed e.g. ?id=$lt5
+        raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
 
     except exc.DataError as e:
         if "invalid input syntax" in e.args[0]:  # e.args[0] is the psycopg2 errors text field
@@ -189,8 +254,8 @@ def team():
         logging.error(e)
         raise InvalidUsage(API_ERROR.RESOURCE_NOT_FOUND_404, status_code=404)
 
-    if result.json:
-        return result
+    if result:
+        return paginated_response(result, next_cursor)
 
     else:
         raise InvalidUsage(API_ERROR.TEAM_404, status_code=404)
@@ -198,6 +263,7 @@ def team():
 
 @api_service.route('/standings/all', methods=['GET'])
 @api_service.route('/standings', methods=['GET'])
+@cached_view
 def standings():
     """
     /v1/standings/all OR type querying across ALL available standings
@@ -218,6 +284,12 @@ def standings():
     if limit > 20:
         raise InvalidUsage(API_ERROR.STANDINGS_MAX_LIMIT_400, status_code=400)
 
+    # Without filters the latest standings of the league are served straight from their summary table
+    if not set(ra) - {API.LIMIT}:
+        result = db_interface.get_latest_standings(fd_competition_id=2021, limit=limit)
+        if result:
+            return paginated_response(result, next_cursor=None)
+
     try:
         comp_filters = CompFilters(**{k: get_vals(v) for k, v in
                                         {Competition.FOOTBALL_DATA_API_ID: 2021}.items()})
@@ -245,8 +317,45 @@ def standings():
         raise InvalidUsage(API_ERROR.STANDINGS_404, status_code=404)
 
 
+@api_service.route('/standings/derived', methods=['GET'])
+@cached_view
+def derived_standings():
+    """
+    /v1/standings/derived?match_day=5&type=HOME tables computed from the stored match results, for any match day
+    including the ones there is no football-data snapshot of
+    :return: standings of each type (or the requested one) as JSON
+    """
+    with current_app.app_context():
+        db_interface = current_app.config['db_interface']
+
+    ra = request.args
+    limit = ra.get(API.LIMIT, 20)
+    try:
+        limit = int(limit)
+    except ValueError:
+        raise InvalidUsage(API_ERROR.INTEGER_LIMIT_400, status_code=400)
+
+    if limit > 20:
+        raise InvalidUsage(API_ERROR.STANDINGS_MAX_LIMIT_400, status_code=400)
+
+    try:
+        match_day = int(ra[API.MATCH_DAY]) if API.MATCH_DAY in ra else None
+        result = db_interface.get_derived_standings(fd_competition_id=2021, match_day=match_day,
+                                                    standings_type=ra.get(API.TYPE), limit=limit)
+
+    except ValueError:
+        raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
+
+    if result:
+        return paginated_response(result, next_cursor=None)
+
+    else:
+        raise InvalidUsage(API_ERROR.DERIVED_STANDINGS_404, status_code=404)
+
+
 @api_service.route('/match/all', methods=['GET'])
 @api_service.route('/match', methods=['GET'])
+@cached_view
 def match():
     """
     /v1/match/all OR type querying across ALL available matches
@@ -258,15 +367,21 @@ def match():
 
     multi = 'match/all' in request.url_rule.rule
     ra = request.args
-    limit = ra.get("limit", 10)
+    limit, cursor = page_args(ra)
     result = {}
     try:
-        limit = int(limit)
-        match_filters = MatchFilters(**{k: get_vals(v) for k, v in ra.items() if k != "limit"})
-        result = jsonify(db_interface.get_match(limit=limit, multi=multi, filters=match_filters))
+        match_filters = MatchFilters(**{k: get_vals(v) for k, v in ra.items() if k not in RESPONSE_ARGS})
+        result, next_cursor = db_interface.get_match(limit=limit, multi=multi, filters=match_filters, cursor=cursor,
+                                                     fields=fields_arg(ra))
 
-    except ValueError:
-        raise InvalidUsage(API_ERROR.INTEGER_LIMIT_400, status_code=400)
+    except InvalidFields:
+        raise InvalidUsage(API_ERROR.INVALID_FIELDS_400, status_code=400)
+
+    except InvalidCursor:
+        raise InvalidUsage(API_ERROR.INVALID_CURSOR_400, status_code=400)
+
+    except ValueError:  # Filter values that can't be parsed e.g. ?id=$lt5
+        raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
 
     except exc.DataError as e:
         if "invalid input syntax" in e.args[0]:  # e.args[0] is the psycopg2 errors text field
@@ -279,8 +394,8 @@ def match():
         logging.error(e)
         raise InvalidUsage(API_ERROR.RESOURCE_NOT_FOUND_404, status_code=404)
 
-    if result.json:
-        return result
+    if result:
+        return paginated_response(result, next_cursor)
 
     else:
         raise InvalidUsage(API_ERROR.MATCH_404, status_code=404)
@@ -288,6 +403,7 @@ def match():
 
 @api_service.route('/stats/all', methods=['GET'])
 @api_service.route('/stats', methods=['GET'])
+@cached_view
 def stats():
     """
     Returns match stats for a specific player or match
@@ -301,15 +417,21 @@ def stats():
     if not ra or not any(f in ra for f in [DB_QUERY_FIELD.MATCH_ID, DB_QUERY_FIELD.PLAYER_ID]):
         raise InvalidUsage(API_ERROR.MISSING_FILTER_400, status_code=400)
 
-    limit = ra.get("limit", 10)
+    limit, cursor = page_args(ra)
     result = {}
     try:
-        limit = int(limit)
-        stat_filters = StatFilters(**{k: get_vals(v) for k, v in ra.items() if k != "limit"})
-        result = jsonify(db_interface.get_stats(limit=limit, multi=multi, filters=stat_filters))
+        stat_filters = StatFilters(**{k: get_vals(v) for k, v in ra.items() if k not in RESPONSE_ARGS})
+        result, next_cursor = db_interface.get_stats(limit=limit, multi=multi, filters=stat_filters, cursor=cursor,
+                                                     fields=fields_arg(ra))
 
-    except ValueError:
-        raise InvalidUsage(API_ERROR.INTEGER_LIMIT_400, status_code=400)
+    except InvalidFields:
+        raise InvalidUsage(API_ERROR.INVALID_FIELDS_400, status_code=400)
+
+    except InvalidCursor:
+        raise InvalidUsage(API_ERROR.INVALID_CURSOR_400, status_code=400)
+
+    except ValueError:  # Filter values that can't be parsed e.g. ?id=$lt5
+        raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
 
     except exc.DataError as e:
         if "invalid input syntax" in e.args[0]:  # e.args[0] is the psycopg2 errors text field
@@ -322,8 +444,8 @@ def stats():
         logging.error(e)
         raise InvalidUsage(API_ERROR.RESOURCE_NOT_FOUND_404, status_code=404)
 
-    if result.json:
-        return result
+    if result:
+        return paginated_response(result, next_cursor)
 
     else:
         raise InvalidUsage(API_ERROR.STATS_404, status_code=404)
@@ -331,6 +453,7 @@ def stats():
 
 @api_service.route('/player/all', methods=['GET'])
 @api_service.route('player', methods=['GET'])
+@cached_view
 def player():
     """
     /v1/player/all OR type querying across ALL available player info
@@ -345,20 +468,20 @@ def player():
     ra = request.args
     if not ra:
         raise InvalidUsage(API_ERROR.MISSING_FILTER_400, status_code=400)
-    limit = ra.get("limit", 10)
+    limit, cursor = page_args(ra)
     try:
-        limit = int(limit)
-        player_filters = PlayerFilters(**{k: get_vals(v) for k, v in ra.items() if k != "limit"})
-        result = db_interface.get_player(limit=limit, multi=multi, filters=player_filters)
-        if isinstance(result, dict):
-            result.pop('matches')
-        elif isinstance(result, list):
-            for player_ in result:
-                player_.pop('matches')
-        result = jsonify(result)
+        player_filters = PlayerFilters(**{k: get_vals(v) for k, v in ra.items() if k not in RESPONSE_ARGS})
+        result, next_cursor = db_interface.get_player(limit=limit, multi=multi, filters=player_filters,
+                                                      cursor=cursor, fields=fields_arg(ra))
 
-    except ValueError:
-        raise InvalidUsage(API_ERROR.INTEGER_LIMIT_400, status_code=400)
+    except InvalidFields:
+        raise InvalidUsage(API_ERROR.INVALID_FIELDS_400, status_code=400)
+
+    except InvalidCursor:
+        raise InvalidUsage(API_ERROR.INVALID_CURSOR_400, status_code=400)
+
+    except ValueError:  # Filter values that can't be parsed e.g. ?id=$lt5
+        raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
 
     except exc.DataError as e:
         if "invalid input syntax" in e.args[0]:  # e.args[0] is the psycopg2 errors text field
@@ -371,25 +494,140 @@ def player():
         logging.error(e)
         raise InvalidUsage(API_ERROR.RESOURCE_NOT_FOUND_404, status_code=404)
 
-    if result.json:
-        return result
+    if result:
+        return paginated_response(result, next_cursor)
 
     else:
         raise InvalidUsage(API_ERROR.PLAYER_404, status_code=404)
 
 
+@api_service.route('/player/aggregates', methods=['GET'])
+@cached_view
+def player_aggregates():
+    """
+    /v1/player/aggregates?sort=-goals_scored&position=Midfielder players ranked on their precomputed totals
+    Current season totals by default, e.g. ?weeks=5 for the last 5 game weeks or ?season=201819 for a past season
+    :return: Player aggregates as JSON (if available)
+    """
+    with current_app.app_context():
+        db_interface = current_app.config['db_interface']
 
+    ra = request.args
+    limit, cursor = page_args(ra)
+    try:
+        aggregate_filters = PlayerAggregateFilters(**{k: get_vals(v) for k, v in ra.items()
+                                                      if k not in RESPONSE_ARGS + [API.SORT]})
+        result, next_cursor = db_interface.get_player_aggregates(limit=limit, filters=aggregate_filters,
+                                                                 sort=ra.get(API.SORT), cursor=cursor,
+                                                                 fields=fields_arg(ra))
 
+    except InvalidSort:
+        raise InvalidUsage(API_ERROR.INVALID_SORT_400, status_code=400)
 
+    except InvalidFields:
+        raise InvalidUsage(API_ERROR.INVALID_FIELDS_400, status_code=400)
 
+    except InvalidCursor:
+        raise InvalidUsage(API_ERROR.INVALID_CURSOR_400, status_code=400)
 
+    except ValueError:  # Filter values that can't be parsed e.g. ?id=$lt5
+        raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
 
+    except exc.DataError as e:
+        if "invalid input syntax" in e.args[0]:  # e.args[0] is the psycopg2 errors text field
+            raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
+        else:
+            logging.error(e)
+            abort(400)
 
+    except TypeError as e:
+        logging.error(e)
+        raise InvalidUsage(API_ERROR.RESOURCE_NOT_FOUND_404, status_code=404)
 
+    if result:
+        return paginated_response(result, next_cursor)
 
+    else:
+        raise InvalidUsage(API_ERROR.PLAYER_AGGREGATES_404, status_code=404)
 
 
+@api_service.route('/leaderboard', methods=['GET'])
+@cached_view
+def leaderboard():
+    """
+    /v1/leaderboard?stat=fantasy_threat&weeks=5&position=Midfielder&fantasy_price=$lt:8&limit=20 top players on a
+    stat, over the whole current season unless season / weeks are given
+    :return: Ranked players as JSON (if any)
+    """
+    with current_app.app_context():
+        db_interface = current_app.config['db_interface']
+
+    ra = request.args
+    stat = ra.get(API.STAT)
+    if not stat:
+        raise InvalidUsage(API_ERROR.MISSING_STAT_400, status_code=400)
+
+    limit, _ = page_args(ra, default_limit=20)
+    try:
+        season = int(ra.get(API.SEASON, CURRENT_SEASON))
+        weeks = int(ra.get(API.WEEKS, PlayerAggregate.SEASON_WEEKS))
+    except ValueError:
+        raise InvalidUsage(API_ERROR.INVALID_WINDOW_400, status_code=400)
+
+    if weeks < 0:
+        raise InvalidUsage(API_ERROR.INVALID_WINDOW_400, status_code=400)
+
+    result = []
+    try:
+        leaderboard_filters = LeaderboardFilters(**{k: get_vals(v) for k, v in ra.items()
+                                                    if k not in RESPONSE_ARGS + [API.STAT, API.SEASON, API.WEEKS]})
+        result = db_interface.get_leaderboard(stat=stat, season=season, weeks=weeks, filters=leaderboard_filters,
+                                              limit=limit)
+
+    except InvalidSort:
+        raise InvalidUsage(API_ERROR.INVALID_STAT_400, status_code=400)
+
+    except ValueError:  # Filter values that can't be parsed e.g. ?fantasy_price=$lt8
+        raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
+
+    except exc.DataError as e:
+        if "invalid input syntax" in e.args[0]:  # e.args[0] is the psycopg2 errors text field
+            raise InvalidUsage(API_ERROR.FILTER_PROBLEM_400, status_code=400)
+        else:
+            logging.error(e)
+            abort(400)
+
+    except TypeError as e:
+        logging.error(e)
+        raise InvalidUsage(API_ERROR.RESOURCE_NOT_FOUND_404, status_code=404)
 
+    if result:
+        return paginated_response(result, next_cursor=None)
 
+    else:
+        raise InvalidUsage(API_ERROR.LEADERBOARD_404, status_code=404)
 
 
+@api_service.route('/search', methods=['GET'])
+def search():
+    """
+    /v1/search?q=salah fuzzy name search across players, teams and competitions, best matches first
+    Narrowed down with type e.g. /v1/search?q=arsenal&type=team,competition
+    :return: ranked matches as JSON (if any)
+    """
+    ra = request.args
+    query = ra.get(API.QUERY, '').strip()
+    if not query:
+        raise InvalidUsage(API_ERROR.MISSING_QUERY_400, status_code=400)
+
+    limit, _ = page_args(ra)
+    kinds = get_vals(ra.get(API.TYPE))
+    if kinds and any(kind not in SEARCH.TYPES for kind in kinds):
+        raise InvalidUsage(API_ERROR.INVALID_SEARCH_TYPE_400, status_code=400)
+
+    result = current_app.config['search_index'].search(query, kinds=kinds, limit=limit)
+    if result:
+        return paginated_response(result, next_cursor=None)
+
+    else:
+        raise InvalidUsage(API_ERROR.SEARCH_404, status_code=404)
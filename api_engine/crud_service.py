@@ -130,7 +130,7 @@ def get_player() -> dict:
     if not multi:
         temp_filters = {TEAM.FANTASY_ID: f_team_id}
         team_filters = TeamFilters(**{k: get_vals(v) for k, v in temp_filters.items() if k != "limit"})
-        player_team = db_interface.get_team(limit=1, multi=False, filters=team_filters)
+        player_team, _ = db_interface.get_team(limit=1, multi=False, filters=team_filters)
         if not player_team:
             raise InvalidUsage(API_ERROR.TEAM_404, status_code=404)
 
@@ -143,9 +143,7 @@ def get_player() -> dict:
         # else:
 
     if multi:
-        players = []
-        for f_id in list(range(1, 21)):
-            players += api_ingest.request_player_details(f_team_id=f_id)
+        players = api_ingest.request_all_player_details(f_team_ids=list(range(1, 21)))
     else:
         players = api_ingest.request_player_details(f_team_id=f_team_id)
 
@@ -250,7 +248,7 @@ def get_team() -> dict:
     comp_fls_id = 2
 
     team_filters = TeamFilters(**{k: get_vals(v) for k, v in ra.items() if k != "limit"})
-    db_teams = db_interface.get_team(limit=limit, multi=multi, filters=team_filters)
+    db_teams, _ = db_interface.get_team(limit=limit, multi=multi, filters=team_filters)
 
     if db_teams:
         teams = db_teams
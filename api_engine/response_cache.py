@@ -0,0 +1,238 @@
+import hashlib
+import os
+from collections import OrderedDict, namedtuple
+from functools import wraps
+from threading import Lock
+from time import time
+from urllib.parse import urlencode
+
+import orjson
+from flask import current_app, request
+
+try:
+    import redis
+except ImportError:  # Only needed for the redis backend
+    redis = None
+
+# Rendered body of a cached response with the headers that are replayed alongside it
+CachedResponse = namedtuple('CachedResponse', ['body', 'etag', 'mimetype', 'link'])
+
+
+def response_key(path, args):
+    """
+    Normalise a request into a cache key, query parameters are sorted so their order doesn't matter
+    :param path: request path e.g. /v1/player/all
+    :param args: request args (MultiDict)
+    :return: cache key
+    :rtype: str
+    """
+    return f'{path}?{urlencode(sorted(args.items(multi=True)))}'
+
+
+def body_etag(body):
+    """
+    :param body: response body
+    :return: strong ETag of the body, identical bodies get identical tags whatever the data version
+    :rtype: str
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class LRUBackend(object):
+    """
+    In process store of rendered responses, least recently used entries are evicted past max_entries or max_bytes
+    """
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> CachedResponse, most recently used last
+        self.size = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        if len(entry.body) > self.max_bytes:
+            return
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+
+            self.entries[key] = entry
+            self.size += len(entry.body)
+            while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.body)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self.lock:
+            return {'entries': len(self.entries), 'bytes': self.size, 'evictions': self.evictions}
+
+
+class RedisBackend(object):
+    """
+    Store of rendered responses shared by every API worker, entries expire after ttl seconds
+    Entries of older data versions are never read again so the ttl only bounds how long they take up memory
+    """
+    def __init__(self, client, prefix='trackr:response:', ttl=24 * 60 * 60):
+        """
+        :param client: redis.Redis like client, anything implementing get / set(ex=) / scan_iter / delete
+        :param prefix: namespace of the cache keys
+        :param ttl: seconds an entry is kept
+        """
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if not value:
+            return None
+
+        entry = orjson.loads(value)
+        return CachedResponse(**{**entry, 'body': entry['body'].encode('utf-8')})
+
+    def set(self, key, entry):
+        value = orjson.dumps({**entry._asdict(), 'body': entry.body.decode('utf-8')})
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + '*'):
+            self.client.delete(key)
+
+    def stats(self):
+        return {'prefix': self.prefix}
+
+
+class ResponseCache(object):
+    """
+    Cache of rendered API responses keyed on the data version, the normalised route and its query args
+    Ingest writes bump the data version (DBInterface.bump_data_version), the new version changes every key so
+    responses rendered from older data are never served again and age out of the backend
+    """
+    def __init__(self, backend, version_source, version_ttl=5):
+        """
+        :param backend: LRUBackend | RedisBackend
+        :param version_source: callable returning the current data version e.g. DBInterface.get_data_version
+        :param version_ttl: seconds the data version is reused before it is read again
+        """
+        self.backend = backend
+        self.version_source = version_source
+        self.version_ttl = version_ttl
+        self.version_read_at = 0
+        self.data_version = None
+        self.lock = Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'not_modified': 0}
+
+    @classmethod
+    def from_env(cls, version_source):
+        """
+        Build the cache configured by API_CACHE_BACKEND (lru, redis or off), API_CACHE_MAX_ENTRIES,
+        API_CACHE_MAX_BYTES, API_CACHE_VERSION_TTL (seconds) and REDIS_URL for the redis backend
+        :param version_source: callable returning the current data version
+        :return: ResponseCache or None when caching is turned off
+        """
+        backend_name = os.getenv('API_CACHE_BACKEND', 'lru')
+        if backend_name == 'off':
+            return None
+
+        if backend_name == 'redis':
+            if redis is None:
+                raise RuntimeError('API_CACHE_BACKEND=redis needs the redis package installed')
+            backend = RedisBackend(client=redis.Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0')))
+        else:
+            backend = LRUBackend(max_entries=int(os.getenv('API_CACHE_MAX_ENTRIES', 1024)),
+                                 max_bytes=int(os.getenv('API_CACHE_MAX_BYTES', 64 * 1024 * 1024)))
+
+        return cls(backend=backend, version_source=version_source,
+                   version_ttl=float(os.getenv('API_CACHE_VERSION_TTL', 5)))
+
+    def version(self):
+        """
+        :return: data version, read from the version source at most once every version_ttl seconds
+        :rtype: int
+        """
+        with self.lock:
+            if self.data_version is None or time() - self.version_read_at >= self.version_ttl:
+                self.data_version = self.version_source()
+                self.version_read_at = time()
+            return self.data_version
+
+    def key(self, path, args):
+        return f'{self.version()}:{response_key(path, args)}'
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        with self.lock:
+            self.counters['hits' if entry else 'misses'] += 1
+        return entry
+
+    def store(self, key, response):
+        """
+        Keep a rendered response
+        :param key: cache key
+        :param response: successful Flask response
+        :return: the cached entry
+        :rtype: CachedResponse
+        """
+        body = response.get_data()
+        entry = CachedResponse(body=body, etag=body_etag(body), mimetype=response.mimetype,
+                               link=response.headers.get('Link'))
+        self.backend.set(key, entry)
+        return entry
+
+    def stats(self):
+        """
+        :return: hit / miss / 304 counters, the data version in use and the backend stats
+        :rtype: dict
+        """
+        with self.lock:
+            return {**self.counters, 'version': self.data_version, **self.backend.stats()}
+
+
+def cached_view(view):
+    """
+    Serve a GET endpoint from the ResponseCache in app.config['response_cache'], when there is one
+    Only successful responses are cached, every response carries an ETag and a matching If-None-Match gets a 304
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = current_app.config.get('response_cache')
+        if cache is None:
+            return view(*args, **kwargs)
+
+        key = cache.key(request.path, request.args)
+        entry = cache.get(key)
+        if entry is None:
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            entry = cache.store(key, response)
+
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+        if entry.link:
+            response.headers['Link'] = entry.link
+        response.set_etag(entry.etag)
+        response.headers['Cache-Control'] = 'no-cache'  # Clients may keep it but must revalidate
+        response.make_conditional(request)
+        if response.status_code == 304:
+            with cache.lock:
+                cache.counters['not_modified'] += 1
+
+        return response
+
+    return wrapper
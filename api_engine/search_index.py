@@ -0,0 +1,123 @@
+from collections import Counter, defaultdict
+from threading import Lock
+from time import time
+
+from ingest_engine.cons import Player, Search as SEARCH
+from ingest_engine.player_resolver import normalize_name
+
+# Document fields matched against the query, besides the name
+ALIAS_FIELDS = [Player.FANTASY_WEB_NAME]
+
+
+def trigrams(text):
+    """
+    pg_trgm style trigrams: every word of the normalized text padded with two spaces in front and one behind
+    :param text: raw name
+    :return: trigrams of the text
+    :rtype: set
+    """
+    grams = set()
+    for word in normalize_name(text).split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex(object):
+    """
+    In memory trigram index over the names of players, teams and competitions
+    A document scores the share of the query trigrams found in its name (or aliases), so a partial name e.g. salah
+    scores 1 against Mohamed Salah and misspellings still share most of their trigrams
+    """
+    def __init__(self, documents=()):
+        """
+        :param documents: records with at least SEARCH.TYPE, id and name, as returned by DBInterface.search_documents
+        """
+        self.documents = []
+        self.grams = []
+        self.postings = defaultdict(list)  # trigram -> document positions
+        for document in documents:
+            self.add(document)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, document):
+        grams = set()
+        for field in [Player.NAME] + ALIAS_FIELDS:
+            grams |= trigrams(document.get(field))
+
+        position = len(self.documents)
+        self.documents.append(document)
+        self.grams.append(grams)
+        for gram in grams:
+            self.postings[gram].append(position)
+
+    def search(self, query, kinds=None, limit=10, threshold=0.3):
+        """
+        Ranked fuzzy matches of query
+        :param query: name, or part of a name, to look for
+        :param kinds: document types to return e.g. [SEARCH.PLAYER], every type by default
+        :param limit: number of matches returned
+        :param threshold: minimum share of the query trigrams a match has to contain
+        :return: best matches first, each document with its SEARCH.SCORE
+        :rtype: list
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scored = []
+        for position, count in shared.items():
+            score = count / len(query_grams)
+            document = self.documents[position]
+            if score < threshold or (kinds and document[SEARCH.TYPE] not in kinds):
+                continue
+
+            # Equal scores go to the closest name, i.e. the one with the fewest trigrams not in the query
+            similarity = count / len(query_grams | self.grams[position])
+            scored.append((score, similarity, position))
+
+        scored.sort(key=lambda match: (-match[0], -match[1], match[2]))
+        return [{**self.documents[position], SEARCH.SCORE: round(score, 3)} for score, _, position in scored[:limit]]
+
+
+class VersionedSearchIndex(object):
+    """
+    SearchIndex rebuilt from the DB whenever the ingest data version moves
+    """
+    def __init__(self, loader, version_source, version_ttl=5):
+        """
+        :param loader: callable returning the documents to index e.g. DBInterface.search_documents
+        :param version_source: callable returning the current data version e.g. DBInterface.get_data_version
+        :param version_ttl: seconds the data version is reused before it is read again
+        """
+        self.loader = loader
+        self.version_source = version_source
+        self.version_ttl = version_ttl
+        self.version_read_at = 0
+        self.data_version = None
+        self.index = None
+        self.lock = Lock()
+
+    def current(self):
+        """
+        :return: index of the current data version, built on first use and after every ingest
+        :rtype: SearchIndex
+        """
+        with self.lock:
+            if self.index is None or time() - self.version_read_at >= self.version_ttl:
+                version = self.version_source()
+                self.version_read_at = time()
+                if self.index is None or version != self.data_version:
+                    self.index = SearchIndex(self.loader())
+                    self.data_version = version
+
+            return self.index
+
+    def search(self, query, kinds=None, limit=10):
+        return self.current().search(query, kinds=kinds, limit=limit)
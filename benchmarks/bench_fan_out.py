@@ -0,0 +1,65 @@
+"""
+Wall clock of the per player fantasy fan-out, sequential vs threaded, against a local stub HTTP server
+Every stub response is delayed to mimic the upstream API latency
+
+    python -m benchmarks.bench_fan_out
+"""
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+
+import orjson
+
+from ingest_engine.api_integration import fan_out
+from ingest_engine.fantasy_api import Fantasy
+
+LATENCY = 0.05  # seconds per stub response
+PLAYERS = 30  # roughly one squad
+TEAMS = 20
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(LATENCY)
+        body = orjson.dumps({'history': [], 'history_past': [], 'fixtures': []})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(fantasy, workers):
+    """
+    Request player data for every player of every team, teams and players both fanned out
+    :param fantasy: Fantasy client pointed at the stub
+    :param workers: thread count, 1 is the old sequential behaviour
+    :return: elapsed seconds
+    """
+    def request_team(f_team_id):
+        player_ids = [{'player_id': f_team_id * 100 + i} for i in range(PLAYERS)]
+        return fan_out(fantasy.request_player_data, player_ids, workers=workers)
+
+    start = time.perf_counter()
+    fan_out(request_team, [{'f_team_id': f_team_id} for f_team_id in range(1, TEAMS + 1)], workers=workers)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    fantasy = Fantasy()
+    fantasy.uri = f'http://127.0.0.1:{server.server_address[1]}/'
+    print(f'{TEAMS} teams x {PLAYERS} players, {LATENCY * 1000:.0f}ms per request')
+
+    sequential = run(fantasy=fantasy, workers=1)
+    print(f'workers=1   {sequential:8.2f}s')
+    for workers in [4, 8, 16]:
+        elapsed = run(fantasy=fantasy, workers=workers)
+        print(f'workers={workers:<3} {elapsed:8.2f}s  ({sequential / elapsed:.1f}x)')
+
+    server.shutdown()
@@ -0,0 +1,89 @@
+"""
+DBInterface.get_player, the old single outer join materializing every player week vs the two phase page query,
+over a seeded schema of several seasons of week stats. Needs a Postgres to seed, the data goes to its own schema
+
+    POSTGRES_CONNECTION_STR=postgresql://... python -m benchmarks.bench_get_player
+"""
+import os
+import time
+
+from sqlalchemy import create_engine, text
+
+from api_engine.api_service import get_vals
+from db_engine.db_driver import db, Player, FantasyWeekStats
+from db_engine.db_filters import PlayerFilters
+from db_engine.db_interface import DBInterface, to_json
+from ingest_engine.cons import Player as PLAYER
+
+SCHEMA = 'bench_get_player'
+PLAYERS = 3000
+SEASONS = [201617, 201718, 201819, 201920]
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Attacker']
+
+
+def seed(engine):
+    """
+    (Re)create the benchmark schema with PLAYERS players and 38 weeks of stats for each of SEASONS
+    """
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+
+    db.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO player (id, name, team, fd_id, position) "
+                          "SELECT i, 'Player ' || i, 'Team ' || i % 20, i, "
+                          f"(ARRAY{POSITIONS})[i % 4 + 1] FROM generate_series(1, {PLAYERS}) i"))
+        conn.execute(text("INSERT INTO fantasy_week_stats (player_id, season, game_week, fantasy_week_points) "
+                          "SELECT p, s, w, (p + w) % 15 FROM generate_series(1, :players) p, "
+                          "unnest(CAST(:seasons AS integer[])) s, generate_series(1, 38) w"),
+                     {'players': PLAYERS, 'seasons': SEASONS})
+        conn.execute(text('ANALYZE'))
+
+
+def legacy_get_player(db_interface, limit, filters):
+    """
+    get_player as it was before the two phase query, filters on player columns only
+    """
+    player_query = db_interface.db.session \
+        .query(Player, FantasyWeekStats) \
+        .outerjoin(FantasyWeekStats, Player.id == FantasyWeekStats.player_id)
+    db_filters = [Player.__table__.c[column] == values[0] for column, values in filters._asdict().items() if values]
+
+    player_week_stat_map = {}
+    for player, week_stat in player_query.filter(*db_filters).all():
+        if player not in player_week_stat_map:
+            player_week_stat_map[player] = []
+        if week_stat:
+            player_week_stat_map[player].append(week_stat)
+
+    return to_json(player_week_stat_map, aggregator_name=PLAYER.WEEK_STATS, limit=limit)
+
+
+def timed(func, **kwargs):
+    start = time.perf_counter()
+    result = func(**kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    engine = create_engine(os.getenv('POSTGRES_CONNECTION_STR'),
+                           connect_args={'options': f'-csearch_path={SCHEMA}'})
+    seed(engine)
+    db_interface = DBInterface(db=engine)
+    print(f'{PLAYERS} players, {PLAYERS * len(SEASONS) * 38} week stats')
+    print(f'{"filter":>20} {"limit":>6} {"outer join":>11} {"two phase":>10}')
+
+    for query_string, limit in [('position=Midfielder', 10), ('position=Midfielder', 50), ('position=Goalkeeper', 200)]:
+        column, value = query_string.split('=')
+        filters = PlayerFilters(**{column: get_vals(value)})
+        legacy, legacy_result = timed(legacy_get_player, db_interface=db_interface, limit=limit, filters=filters)
+        db_interface.db.session.expunge_all()
+        two_phase, (result, _) = timed(db_interface.get_player, limit=limit, filters=filters)
+        db_interface.db.session.expunge_all()
+        assert [p['id'] for p in result] == sorted(p['id'] for p in legacy_result)[:limit]
+        print(f'{query_string:>20} {limit:>6} {legacy:>10.3f}s {two_phase:>9.3f}s  ({legacy / two_phase:.0f}x)')
+
+    db_interface.db.session.close()
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
@@ -0,0 +1,70 @@
+"""
+Loading every historical gameweek CSV, the old per row dict loop with list prepends vs the vectorized loader
+Only the utf-8 seasons are loaded since the old loader can't read the latin-1 2018-19 files
+
+    python -m benchmarks.bench_historical_ingest
+"""
+import os
+import time
+from glob import glob
+
+import pandas as pd
+
+from ingest_engine.cons import Player
+from ingest_engine.fantasy_api import load_historical_gameweeks, HISTORICAL_FANTASY_PATH, GAMEWEEK_CSV_COLUMNS
+
+SEASONS = ['2016-17', '2017-18']
+
+
+def legacy_gameweek_csv(csv_file, season):
+    """
+    ingest_historical_gameweek_csv as it was before it was vectorized
+    """
+    player_data = []
+    gw_df = pd.read_csv(csv_file, encoding='utf-8')
+    columns_to_drop = ['bonus', 'fixture', 'id', 'kickoff_time', 'ea_index',
+                       'kickoff_time_formatted', 'loaned_in', 'loaned_out',
+                       'team_a_score', 'team_h_score']
+
+    for column in columns_to_drop:
+        gw_df.drop(column, axis=1, inplace=True)
+
+    gw_df.columns = tuple(GAMEWEEK_CSV_COLUMNS.values())
+    gw_df = gw_df.transpose().to_dict()
+
+    for player in gw_df.values():
+        name = player[Player.NAME].split("_")
+        player[Player.NAME] = " ".join(name)
+        player[Player.FIRST_NAME] = name[0]
+        player[Player.LAST_NAME] = name[1]
+        player[Player.FANTASY_WEEK_ID] = int(f'{season}{str(player[Player.FANTASY_WEEK]).zfill(2)}')
+        player_data.append(player)
+
+    return player_data
+
+
+def legacy_load():
+    gameweek_data = []
+    for season in SEASONS:
+        for csv_file in glob(os.path.join(HISTORICAL_FANTASY_PATH, season, 'gws', 'gw*.csv')):
+            gameweek_data = legacy_gameweek_csv(csv_file=csv_file, season=season.replace('-', '')) + gameweek_data
+    return gameweek_data
+
+
+def timed(func, **kwargs):
+    start = time.perf_counter()
+    result = func(**kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    legacy, legacy_rows = timed(legacy_load)
+    vectorized, gw_df = timed(load_historical_gameweeks, seasons=SEASONS)
+    assert len(legacy_rows) == len(gw_df)
+
+    print(f'{len(gw_df)} player gameweeks from {", ".join(SEASONS)}')
+    print(f'legacy      {legacy:8.2f}s')
+    print(f'vectorized  {vectorized:8.2f}s  ({legacy / vectorized:.1f}x)')
+
+    everything, gw_df = timed(load_historical_gameweeks)
+    print(f'all seasons {everything:8.2f}s  ({len(gw_df)} rows, {gw_df.memory_usage(deep=True).sum() / 1e6:.1f}MB)')
@@ -0,0 +1,125 @@
+"""
+Compare the row by row DBInterface.insert_player against the set based DBInterface.bulk_insert_player
+Runs against a throwaway local Postgres given by POSTGRES_TEST_CONNECTION_STR, all tables are truncated!
+
+    POSTGRES_TEST_CONNECTION_STR=postgresql://localhost/trackr_test python -m benchmarks.bench_insert_player
+"""
+import os
+import time
+
+os.environ.setdefault('POSTGRES_CONNECTION_STR', os.getenv('POSTGRES_TEST_CONNECTION_STR', ''))
+
+from sqlalchemy import create_engine, text
+
+from db_engine.db_driver import db, Player
+from db_engine.db_interface import DBInterface
+from db_engine.migrations import apply_migrations
+from ingest_engine.cons import Player as PLAYER, Match as MATCH, MatchEvent as MATCH_EVENT
+
+PLAYERS = 600
+GAME_WEEKS = 38
+
+
+def build_fantasy_players(n_players, n_weeks):
+    """
+    Synthetic fantasy records, a third match on full name, a third only on web_name + last name, a third not at all
+    :param n_players: number of fantasy records
+    :param n_weeks: match history entries per record
+    :return: fantasy player records
+    :rtype: list
+    """
+    players = []
+    for i in range(n_players):
+        first_name, last_name = f'First{i}', f'Last{i}'
+        web_name = first_name if i % 3 != 1 else f'Web{i}'
+        if i % 3 == 2:
+            first_name, last_name, web_name = f'Unknown{i}', f'Nobody{i}', f'Nobody{i}'
+
+        history = []
+        for week in range(1, n_weeks + 1):
+            history.append({
+                MATCH.FANTASY_GAME_WEEK: week,
+                MATCH.FANTASY_MATCH_ID: week * 100 + i % 10,
+                PLAYER.PLAYED_AT_HOME: week % 2 == 0,
+                PLAYER.FANTASY_WEEK_POINTS: week % 7,
+                PLAYER.FANTASY_SEASON_VALUE: 50,
+                PLAYER.FANTASY_TRANSFERS_BALANCE: 0,
+                PLAYER.FANTASY_SELECTION_COUNT: 1000,
+                PLAYER.FANTASY_WEEK_TRANSFERS_IN: 10,
+                PLAYER.FANTASY_WEEK_TRANSFERS_OUT: 10,
+                PLAYER.MINUTES_PLAYED: 90,
+                PLAYER.NUMBER_OF_GOALS: 0,
+                PLAYER.ASSISTS: 0,
+                MATCH_EVENT.CLEAN_SHEET: False,
+                PLAYER.GOALS_CONCEDED: 1,
+                PLAYER.OWN_GOALS: 0,
+                PLAYER.PENALTIES_SAVED: 0,
+                PLAYER.PENALTIES_MISSED: 0,
+                PLAYER.YELLOW_CARDS: 0,
+                PLAYER.RED_CARDS: 0,
+                PLAYER.SAVES: 0,
+                PLAYER.FANTASY_WEEK_BONUS: 0,
+                PLAYER.FANTASY_INFLUENCE: 1.0,
+                PLAYER.FANTASY_CREATIVITY: 1.0,
+                PLAYER.FANTASY_THREAT: 1.0,
+                PLAYER.FANTASY_ICT_INDEX: 1.0,
+            })
+
+        players.append({
+            PLAYER.NAME: f'{first_name} {last_name}',
+            PLAYER.FIRST_NAME: first_name,
+            PLAYER.LAST_NAME: last_name,
+            PLAYER.FANTASY_WEB_NAME: web_name,
+            PLAYER.FANTASY_ID: i,
+            PLAYER.SEASON_MATCH_HISTORY: history,
+        })
+
+    return players
+
+
+def seed(engine, n_players):
+    """
+    Recreate the schema and insert the DB side of the players
+    :param engine: SQLAlchemy engine
+    :param n_players: number of players to insert
+    """
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    apply_migrations(engine=engine)
+    with engine.begin() as conn:
+        conn.execute(Player.__table__.insert(), [
+            {'name': f'First{i} Last{i}' if i % 3 == 0 else f'Web{i} Last{i}', 'team': 'Team', 'fd_id': i}
+            for i in range(n_players)
+        ])
+
+
+def reset_stats(engine):
+    with engine.begin() as conn:
+        conn.execute(text('TRUNCATE match_stats, fantasy_week_stats'))
+        conn.execute(text('UPDATE player SET content_hash = NULL'))
+
+
+def timed(label, func, **kwargs):
+    start = time.perf_counter()
+    func(**kwargs)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<20} {elapsed:8.2f}s')
+    return elapsed
+
+
+if __name__ == '__main__':
+    engine = create_engine(os.environ['POSTGRES_TEST_CONNECTION_STR'])
+    seed(engine=engine, n_players=PLAYERS)
+    records = build_fantasy_players(n_players=PLAYERS, n_weeks=GAME_WEEKS)
+    print(f'{PLAYERS} players x {GAME_WEEKS} game weeks')
+
+    reset_stats(engine=engine)
+    row_by_row = timed('insert_player', DBInterface(db=engine).insert_player, record=records)
+
+    reset_stats(engine=engine)
+    bulk = timed('bulk_insert_player', DBInterface(db=engine).bulk_insert_player, record=records)
+
+    print(f'speedup              {row_by_row / bulk:8.1f}x')
+
+    # Same records again, every player is skipped on its content hash
+    timed('unchanged re-run', DBInterface(db=engine).bulk_insert_player, record=records)
@@ -0,0 +1,114 @@
+"""
+DBInterface.get_leaderboard latency over a seeded schema of several seasons of match and week stats:
+windows read from PlayerAggregate, windows summed from the raw stats, and the client side sum of every stat row
+a consumer had to pull before. Needs a Postgres to seed, the data goes to its own schema
+
+    POSTGRES_CONNECTION_STR=postgresql://... python -m benchmarks.bench_leaderboard
+"""
+import os
+import statistics
+import time
+from collections import Counter
+
+from sqlalchemy import create_engine, text
+
+from db_engine.db_driver import db, Match, MatchStats
+from db_engine.db_filters import LeaderboardFilters
+from db_engine.db_interface import DBInterface
+
+SCHEMA = 'bench_leaderboard'
+PLAYERS = 3000
+SEASONS = [201617, 201718, 201819, 201920]
+POSITIONS = ['Goalkeeper', 'Defender', 'Midfielder', 'Attacker']
+RUNS = 20
+
+
+def seed(engine):
+    """
+    (Re)create the benchmark schema with PLAYERS players, each with a fixture and a game week of stats for all 38
+    game weeks of SEASONS
+    """
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+
+    db.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO player (id, name, team, fd_id, position, fantasy_price) "
+                          "SELECT i, 'Player ' || i, 'Team ' || i % 20, i, "
+                          f"(ARRAY{POSITIONS})[i % 4 + 1], 4 + i % 90 / 10.0 FROM generate_series(1, {PLAYERS}) i"))
+        conn.execute(text("INSERT INTO match (id, match_fd_id, fls_match_id, fls_competition_id, home_team_fls_id, "
+                          "away_team_fls_id, fantasy_game_week, fantasy_match_id) "
+                          "SELECT s * 1000 + w * 10 + f, s * 1000 + w * 10 + f, s * 1000 + w * 10 + f, 2, f, f + 10, "
+                          "w, s * 1000 + w * 10 + f FROM unnest(CAST(:seasons AS integer[])) s, "
+                          "generate_series(1, 38) w, generate_series(0, 9) f"), {'seasons': SEASONS})
+        conn.execute(text("INSERT INTO match_stats (match_id, player_id, season, fantasy_match_id, goals_scored, "
+                          "assists, minutes_played, fantasy_threat, fantasy_ict_index) "
+                          "SELECT s * 1000 + w * 10 + p % 10, p, s, w * 10 + p % 10, (p * w) % 7 / 5, "
+                          "(p + w) % 9 / 7, 90, (p * w + s) % 97, (p + w * s) % 53 "
+                          "FROM generate_series(1, :players) p, unnest(CAST(:seasons AS integer[])) s, "
+                          "generate_series(1, 38) w"), {'players': PLAYERS, 'seasons': SEASONS})
+        conn.execute(text("INSERT INTO fantasy_week_stats (player_id, season, game_week, fantasy_week_points) "
+                          "SELECT p, s, w, (p * w + s) % 15 FROM generate_series(1, :players) p, "
+                          "unnest(CAST(:seasons AS integer[])) s, generate_series(1, 38) w"),
+                     {'players': PLAYERS, 'seasons': SEASONS})
+        conn.execute(text('ANALYZE'))
+
+
+def client_side_leaderboard(db_interface, stat, season, weeks, limit):
+    """
+    Top players the way a consumer had to get them before: every stat row of the window, summed and sorted locally
+    """
+    rows = db_interface.db.session.query(MatchStats.player_id, MatchStats.__table__.c[stat])\
+        .join(Match, Match.id == MatchStats.match_id)\
+        .filter(MatchStats.season == season, Match.fantasy_game_week > 38 - weeks)
+    totals = Counter()
+    for player_id, value in rows:
+        totals[player_id] += value or 0
+
+    return sorted(totals.items(), key=lambda total: (-total[1], total[0]))[:limit]
+
+
+def median_time(func, **kwargs):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = func(**kwargs)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+if __name__ == '__main__':
+    engine = create_engine(os.getenv('POSTGRES_CONNECTION_STR'),
+                           connect_args={'options': f'-csearch_path={SCHEMA}'})
+    seed(engine)
+    db_interface = DBInterface(db=engine)
+    start = time.perf_counter()
+    rows = db_interface.refresh_player_aggregates(seasons=SEASONS)
+    db_interface.db.session.commit()
+    print(f'{PLAYERS} players x {len(SEASONS)} seasons x 38 weeks, {PLAYERS * len(SEASONS) * 38} match / week stats')
+    print(f'PlayerAggregate refresh: {rows} rows in {time.perf_counter() - start:.2f}s')
+    print(f'{"stat":>16} {"weeks":>5} {"filters":>40} {"source":>10} {"median":>9}')
+
+    for stat, weeks, filters in [('fantasy_points', 0, LeaderboardFilters()),
+                                 ('fantasy_threat', 5, LeaderboardFilters()),
+                                 ('fantasy_threat', 5, LeaderboardFilters(position=['Midfielder'],
+                                                                          fantasy_price=['$lt:8'])),
+                                 ('fantasy_threat', 6, LeaderboardFilters()),
+                                 ('goals_scored', 10, LeaderboardFilters(position=['Attacker']))]:
+        source = 'aggregate' if weeks in [0, 3, 5] else 'raw'
+        elapsed, result = median_time(db_interface.get_leaderboard, stat=stat, season=SEASONS[-1], weeks=weeks,
+                                      filters=filters, limit=20)
+        label = ','.join(f'{field}={values[0]}' for field, values in filters._asdict().items() if values) or '-'
+        print(f'{stat:>16} {weeks:>5} {label:>40} {source:>10} {elapsed * 1000:>7.1f}ms')
+
+    # Same top 20 as summing every row of the window client side
+    elapsed, expected = median_time(client_side_leaderboard, db_interface=db_interface, stat='fantasy_threat',
+                                    season=SEASONS[-1], weeks=5, limit=20)
+    result = db_interface.get_leaderboard(stat='fantasy_threat', season=SEASONS[-1], weeks=5, limit=20)
+    assert [(entry['player_id'], entry['fantasy_threat']) for entry in result] == expected
+    print(f'{"fantasy_threat":>16} {5:>5} {"-":>40} {"client":>10} {elapsed * 1000:>7.1f}ms')
+
+    db_interface.db.session.close()
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
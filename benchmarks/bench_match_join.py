@@ -0,0 +1,94 @@
+"""
+Fixture join of Driver.request_match, old nested loops vs the hash indexed join, over synthetic fixture lists
+spanning several competitions of 20 teams each (380 fixtures per competition)
+
+    python -m benchmarks.bench_match_join
+"""
+import time
+from datetime import datetime as dt, timedelta
+
+from ingest_engine.cons import Match
+from ingest_engine.ingest_driver import Driver
+
+TEAMS = 20
+
+
+def synthetic_fixtures(competitions):
+    """
+    Build matching football-data, FLS and fantasy fixtures for a double round robin in every competition
+    :param competitions: number of competitions
+    :return: fd fixtures, fls fixtures, fantasy fixtures and the fantasy team mapper
+    """
+    fd_matches, fls_matches, f_matches, team_mapper = [], [], [], {}
+    start = dt(2019, 8, 9, 19)
+    for comp in range(competitions):
+        team_ids = [comp * TEAMS + team for team in range(TEAMS)]
+        for team_id in team_ids:
+            team_mapper[team_id] = f'Club {team_id} United'
+
+        for home in team_ids:
+            for away in team_ids:
+                if home == away:
+                    continue
+                kickoff = dt.strftime(start + timedelta(minutes=len(fd_matches) % 5000), '%Y-%m-%dT%H:%M:%SZ')
+                score = {Match.FULL_TIME_HOME_SCORE: home % 4, Match.FULL_TIME_AWAY_SCORE: away % 3}
+                fd_matches.append({Match.MATCH_UTC_DATE: kickoff, Match.HOME_TEAM: f'Club {home} United FC',
+                                   Match.AWAY_TEAM: f'Club {away} United FC', **score})
+                fls_matches.append({Match.HOME_TEAM: f'Club {home} United', Match.AWAY_TEAM: f'Club {away} United',
+                                    Match.FLS_MATCH_ID: len(fls_matches), **score})
+                f_matches.append({Match.START_TIME: kickoff, Match.FANTASY_HOME_TEAM_ID: home,
+                                  Match.FANTASY_AWAY_TEAM_ID: away, **score})
+
+    return fd_matches, fls_matches, f_matches, team_mapper
+
+
+def legacy_join(driver, fd_matches, fls_matches, fantasy_matches):
+    """
+    The join as it was before FixtureIndex, minus the per candidate request_match_details call
+    """
+    joined = []
+    for match in fd_matches:
+        match_start_datetime = dt.strptime(match[Match.MATCH_UTC_DATE], '%Y-%m-%dT%H:%M:%SZ')
+        match_start_datetime = dt.strftime(match_start_datetime, '%Y-%d-%mT%H:%M:%SZ')
+        home_team = match[Match.HOME_TEAM]
+        away_team = match[Match.AWAY_TEAM]
+        home_score = match[Match.FULL_TIME_HOME_SCORE]
+        away_score = match[Match.FULL_TIME_AWAY_SCORE]
+        for fls_match in fls_matches:
+            if fls_match[Match.HOME_TEAM] in home_team and fls_match[Match.AWAY_TEAM] in away_team and \
+                    home_score == fls_match[Match.FULL_TIME_HOME_SCORE] and \
+                    away_score == fls_match[Match.FULL_TIME_AWAY_SCORE]:
+                for f_match in fantasy_matches:
+                    f_home_team = driver.fantasy.name_to_id(f_match[Match.FANTASY_HOME_TEAM_ID])
+                    f_away_team = driver.fantasy.name_to_id(f_match[Match.FANTASY_AWAY_TEAM_ID])
+                    parsed_date = dt.strftime(dt.strptime(f_match[Match.START_TIME], '%Y-%m-%dT%H:%M:%SZ'),
+                                              '%Y-%d-%mT%H:%M:%SZ')
+                    if parsed_date == match_start_datetime:
+                        if f_home_team in home_team and f_away_team in away_team and \
+                                home_score == f_match[Match.FULL_TIME_HOME_SCORE] and \
+                                away_score == f_match[Match.FULL_TIME_AWAY_SCORE]:
+                            joined.append((match, fls_match, f_match))
+    return joined
+
+
+def timed(func, **kwargs):
+    start = time.perf_counter()
+    result = func(**kwargs)
+    return time.perf_counter() - start, result
+
+
+if __name__ == '__main__':
+    driver = Driver()
+    print(f'{"competitions":>12} {"fixtures":>9} {"nested":>10} {"indexed":>10}')
+    for competitions in [1, 2, 5, 10]:
+        fd_matches, fls_matches, f_matches, driver.fantasy.team_mapper = synthetic_fixtures(competitions)
+        kwargs = {'fd_matches': fd_matches, 'fls_matches': fls_matches, 'fantasy_matches': f_matches}
+        indexed, joined = timed(driver.join_matches, **kwargs)
+        assert len(joined) == len(fd_matches)
+
+        if competitions <= 2:  # nested loops take minutes beyond this
+            nested, legacy_joined = timed(legacy_join, driver=driver, **kwargs)
+            assert len(legacy_joined) == len(joined)
+            print(f'{competitions:>12} {len(fd_matches):>9} {nested:>9.2f}s {indexed:>9.3f}s  ({nested / indexed:.0f}x)')
+        else:
+            print(f'{competitions:>12} {len(fd_matches):>9} {"-":>10} {indexed:>9.3f}s')
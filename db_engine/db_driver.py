@@ -6,7 +6,7 @@ import logging
 from ingest_engine.ingest_driver import Driver, str_comparator
 from ingest_engine.cons import Competition as COMP, \
     Standings as STANDINGS, Team as TEAM, Match as MATCH, Player as PLAYER, MatchEvent as MATCH_EVENT, \
-    FantasyGameWeek as FANTASY_GAME_WEEK
+    FantasyGameWeek as FANTASY_GAME_WEEK, Crosswalk as CROSSWALK, CURRENT_SEASON
 
 logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
 
@@ -47,6 +47,7 @@ class Competition(db.Model):
 
 
 class Standings(db.Model):
+    __table_args__ = (db.Index('standings_competition_match_day_idx', 'competition_id', 'match_day'),)
     id = db.Column(STANDINGS.ID, db.Integer, primary_key=True)
     # standings_entries = db.relationship('StandingsEntry', backpopulates="standings")
     standings_entries = db.relationship('StandingsEntry', backref='standings', lazy='dynamic')
@@ -59,6 +60,7 @@ class Standings(db.Model):
 
 
 class StandingsEntry(db.Model):
+    __table_args__ = (db.Index('standings_entry_standings_id_idx', 'standings_id'),)
     id = db.Column(db.Integer, primary_key=True)
     standings_id = db.Column(db.Integer, db.ForeignKey('standings.id'), nullable=False)
     position = db.Column(db.Integer, unique=False, nullable=False)
@@ -72,9 +74,25 @@ class StandingsEntry(db.Model):
     goals_for = db.Column(db.Integer, unique=False, nullable=False)
     goals_against = db.Column(db.Integer, unique=False, nullable=False)
     goals_difference = db.Column(db.Integer, unique=False, nullable=False)
+    content_hash = db.Column(db.String(32), unique=False, nullable=True)
+
+
+class LatestStandings(db.Model):
+    """
+    Summary of the most recent standings of each competition and standings type (TOTAL / HOME / AWAY) with their table
+    entries rendered as in the API response, refreshed by DBInterface.update_standings
+    """
+    __table_args__ = (db.Index('latest_standings_fd_competition_id_idx', 'fd_competition_id'),)
+    competition_id = db.Column(db.Integer, db.ForeignKey('competition.id'), primary_key=True)
+    type = db.Column(db.String(20), primary_key=True)
+    fd_competition_id = db.Column(db.Integer, unique=False, nullable=False)
+    standings_id = db.Column(db.Integer, db.ForeignKey('standings.id'), nullable=False)
+    match_day = db.Column(db.Integer, unique=False, nullable=True)
+    standings = db.Column(db.JSON, unique=False, nullable=False)
 
 
 class Match(db.Model):
+    __table_args__ = (db.Index('match_fantasy_game_week_idx', 'fantasy_game_week'),)
     id = db.Column(db.Integer, primary_key=True)
     stats = db.relationship('MatchStats', backref='match')
     match_fd_id = db.Column(db.Integer, unique=True, nullable=False)
@@ -133,6 +151,7 @@ class Match(db.Model):
     f_away_team_code = db.Column(db.Integer, unique=False, nullable=True)
     f_home_team_id = db.Column(db.Integer, unique=False, nullable=True)
     f_away_team_id = db.Column(db.Integer, unique=False, nullable=True)
+    content_hash = db.Column(db.String(32), unique=False, nullable=True)
 
 
 class Player(db.Model):
@@ -187,11 +206,16 @@ class Player(db.Model):
     fantasy_selection_percentage = db.Column(db.Integer, unique=False, nullable=True)
     fantasy_form = db.Column(db.Integer, unique=False, nullable=True)
     fantasy_special = db.Column(db.Boolean, unique=False, nullable=True)
+    content_hash = db.Column(db.String(32), unique=False, nullable=True)
 
 class MatchStats(db.Model):
+    __table_args__ = (db.UniqueConstraint('player_id', 'season', 'fantasy_match_id',
+                                          name='match_stats_player_season_fixture_uq'),
+                      db.Index('match_stats_match_id_idx', 'match_id'))
     id = db.Column(db.Integer, primary_key=True)
     match_id = db.Column(db.Integer, db.ForeignKey('match.id'), nullable=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=True)
+    season = db.Column(db.Integer, unique=False, nullable=False)  # e.g. 201920, fantasy ids restart every season
     fantasy_match_id = db.Column(db.Integer, unique=False, nullable=True)
     goals_scored = db.Column(db.Integer, unique=False, nullable=True)
     goals_conceded = db.Column(db.Integer, unique=False, nullable=True)
@@ -214,8 +238,12 @@ class MatchStats(db.Model):
 
 
 class FantasyWeekStats(db.Model):
+    __table_args__ = (db.UniqueConstraint('player_id', 'season', 'game_week',
+                                          name='fantasy_week_stats_player_season_week_uq'),
+                      db.Index('fantasy_week_stats_season_game_week_idx', 'season', 'game_week'))
     id = db.Column(FANTASY_GAME_WEEK.ID, db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    season = db.Column(db.Integer, unique=False, nullable=False)  # e.g. 201920
     game_week = db.Column(db.Integer, unique=False, nullable=True)
     season_value = db.Column(db.Integer, unique=False, nullable=True)  # Fantasy value
     fantasy_week_points = db.Column(db.Integer, unique=False, nullable=True)
@@ -226,6 +254,34 @@ class FantasyWeekStats(db.Model):
     fantasy_week_bonus = db.Column(db.Integer, unique=False, nullable=True)
 
 
+class PlayerAggregate(db.Model):
+    """
+    Totals of a player's FantasyWeekStats and MatchStats over a season (weeks = 0) or over its last few game weeks,
+    kept up to date by DBInterface.refresh_player_aggregates
+    """
+    __table_args__ = (db.Index('player_aggregate_season_weeks_points_idx', 'season', 'weeks', 'fantasy_points'),)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    season = db.Column(db.Integer, primary_key=True)
+    weeks = db.Column(db.Integer, primary_key=True)
+    last_game_week = db.Column(db.Integer, unique=False, nullable=False)
+    game_weeks = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    appearances = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    fantasy_points = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    bonus = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    minutes_played = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    goals_scored = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    assists = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    clean_sheets = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    goals_conceded = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    yellow_cards = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    red_cards = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    saves = db.Column(db.Integer, unique=False, nullable=False, server_default='0')
+    fantasy_influence = db.Column(db.Float, unique=False, nullable=False, server_default='0')
+    fantasy_creativity = db.Column(db.Float, unique=False, nullable=False, server_default='0')
+    fantasy_threat = db.Column(db.Float, unique=False, nullable=False, server_default='0')
+    fantasy_ict_index = db.Column(db.Float, unique=False, nullable=False, server_default='0')
+
+
 class Team(db.Model):
     id = db.Column(TEAM.ID, db.Integer, primary_key=True)
     competitions = db.relationship('Competition', secondary=comp_team_table, lazy='subquery',
@@ -259,6 +315,43 @@ class Team(db.Model):
     fantasy_defence_home_strength = db.Column(db.Integer, unique=False, nullable=False)
     fantasy_defence_away_strength = db.Column(db.Integer, unique=False, nullable=False)
     fantasy_week_strength = db.Column(db.Integer, unique=False, nullable=False)
+    content_hash = db.Column(db.String(32), unique=False, nullable=True)
+
+
+class Crosswalk(db.Model):
+    """
+    Source (fd / fls / fantasy) team and competition ids mapped onto the canonical football-data id
+    """
+    __table_args__ = (db.UniqueConstraint(CROSSWALK.ENTITY_TYPE, CROSSWALK.SOURCE, CROSSWALK.SOURCE_ID,
+                                          name='crosswalk_source_uq'),)
+    id = db.Column(CROSSWALK.ID, db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(20), unique=False, nullable=False)
+    source = db.Column(db.String(20), unique=False, nullable=False)
+    source_id = db.Column(db.Integer, unique=False, nullable=False)
+    canonical_id = db.Column(db.Integer, unique=False, nullable=False)
+    name = db.Column(db.String(120), unique=False, nullable=True)
+    score = db.Column(db.Float, unique=False, nullable=True)  # Fuzzy match score the mapping was accepted with
+
+
+class IngestState(db.Model):
+    """
+    Per source watermarks of the weekly ingest, each run only requests what changed past them
+    """
+    source = db.Column(db.String(20), primary_key=True)
+    last_kickoff = db.Column(db.DateTime, unique=False, nullable=True)
+    last_news = db.Column(db.DateTime, unique=False, nullable=True)
+    last_match_day = db.Column(db.Integer, unique=False, nullable=True)
+    updated_at = db.Column(db.DateTime, unique=False, nullable=False)
+
+
+class DataVersion(db.Model):
+    """
+    Single row counter bumped by every ingest write, cached API responses are only valid for the version they were
+    rendered at
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, unique=False, nullable=False)
+    updated_at = db.Column(db.DateTime, unique=False, nullable=False)
 
 
 # db.create_all()
@@ -445,6 +538,7 @@ def ingest_teams(fls_comp_id, fd_comp_id, season):
                         week_list = []
                         for week in full_player[PLAYER.SEASON_MATCH_HISTORY]:
                             week_stats = FantasyWeekStats(
+                                season=CURRENT_SEASON,
                                 game_week=week_count,
                                 season_value=week[PLAYER.FANTASY_SEASON_VALUE],
                                 week_points=week[PLAYER.FANTASY_WEEK_POINTS],
@@ -459,6 +553,7 @@ def ingest_teams(fls_comp_id, fd_comp_id, season):
                         if PLAYER.FANTASY_WEEK in full_player:
                             current_week = full_player[PLAYER.FANTASY_WEEK]
                             current_week_stats = FantasyWeekStats()
+                            current_week_stats.season = CURRENT_SEASON
                             current_week_stats.game_week = current_week
                             current_week_stats.season_value = full_player[PLAYER.FANTASY_SEASON_VALUE]
                             current_week_stats.week_points = full_player[PLAYER.FANTASY_WEEK_POINTS]
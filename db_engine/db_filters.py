@@ -6,7 +6,8 @@ from ingest_engine.cons import\
     Match as MATCH, \
     Player as PLAYER, \
     FantasyGameWeek as FANTASY_GAME_WEEK, \
-    MatchEvent as MATCH_EVENT
+    MatchEvent as MATCH_EVENT, \
+    PlayerAggregate as PLAYER_AGGREGATE
 
 from api_engine.api_cons import DB_QUERY_FIELD
 """
@@ -211,3 +212,36 @@ player_filter_field = [PLAYER.ID,
 
 
 PlayerFilters = namedtuple('player_filters', player_filter_field, defaults=(None,) * len(player_filter_field))
+
+player_aggregate_filter_field = [PLAYER_AGGREGATE.PLAYER_ID,
+                                 PLAYER_AGGREGATE.SEASON,
+                                 PLAYER_AGGREGATE.WEEKS,
+                                 PLAYER_AGGREGATE.GAME_WEEKS,
+                                 PLAYER_AGGREGATE.APPEARANCES,
+                                 PLAYER_AGGREGATE.FANTASY_POINTS,
+                                 PLAYER_AGGREGATE.BONUS,
+                                 PLAYER_AGGREGATE.MINUTES_PLAYED,
+                                 PLAYER_AGGREGATE.GOALS_SCORED,
+                                 PLAYER_AGGREGATE.ASSISTS,
+                                 PLAYER_AGGREGATE.CLEAN_SHEETS,
+                                 PLAYER_AGGREGATE.GOALS_CONCEDED,
+                                 PLAYER_AGGREGATE.YELLOW_CARDS,
+                                 PLAYER_AGGREGATE.RED_CARDS,
+                                 PLAYER_AGGREGATE.SAVES,
+                                 PLAYER_AGGREGATE.FANTASY_INFLUENCE,
+                                 PLAYER_AGGREGATE.FANTASY_CREATIVITY,
+                                 PLAYER_AGGREGATE.FANTASY_THREAT,
+                                 PLAYER_AGGREGATE.FANTASY_ICT_INDEX,
+                                 PLAYER.NAME,
+                                 PLAYER.TEAM,
+                                 PLAYER.POSITION]
+
+PlayerAggregateFilters = namedtuple('player_aggregate_filters', player_aggregate_filter_field,
+                                    defaults=(None,) * len(player_aggregate_filter_field))
+
+leaderboard_filter_field = [PLAYER.POSITION,
+                            PLAYER.TEAM,
+                            PLAYER.FANTASY_PRICE]
+
+LeaderboardFilters = namedtuple('leaderboard_filters', leaderboard_filter_field,
+                                defaults=(None,) * len(leaderboard_filter_field))
@@ -1,15 +1,328 @@
 from typing import Union
+from collections import Counter, defaultdict
+import base64
+import io
 import logging
+import time
+from datetime import datetime
+from threading import Lock
+import orjson
 import unidecode as unidecode
-from sqlalchemy import or_, func, engine
+from sqlalchemy import or_, func, engine, tuple_, inspect, literal
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import sessionmaker
 
-from db_engine.db_driver import Competition, Team, Standings, StandingsEntry, Match, Player, MatchStats, FantasyWeekStats
+from db_engine.db_driver import Competition, Team, Standings, StandingsEntry, Match, Player, MatchStats, \
+    FantasyWeekStats, Crosswalk, DataVersion, LatestStandings, PlayerAggregate, IngestState
+from ingest_engine.player_resolver import PlayerResolver
+from ingest_engine.crosswalk import CrosswalkResolver
+from ingest_engine.standings_engine import StandingsEngine, STANDINGS_TYPES
+from ingest_engine.content_hash import content_hash
 from ingest_engine.cons import IGNORE, Team as TEAM, Standings as STANDINGS, Competition as COMPETITION, Match as MATCH,\
-    Player as PLAYER, MatchEvent as MATCH_EVENT
+    Player as PLAYER, MatchEvent as MATCH_EVENT, Crosswalk as CROSSWALK, Season as SEASON, CURRENT_SEASON, \
+    GAME_WEEKS_PER_SEASON, PlayerAggregate as PLAYER_AGGREGATE, IngestState as INGEST_STATE, Search as SEARCH, \
+    FootballDataApiFilters as fdf
+from db_engine.db_filters import PlayerAggregateFilters, LeaderboardFilters
 
 logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
 
+# Player table column -> fantasy record field, refreshed every time a fantasy player is matched to a DB player
+FANTASY_PLAYER_FIELDS = {
+    'fantasy_id': PLAYER.FANTASY_ID,
+    'fantasy_code': PLAYER.FANTASY_CODE,
+    'fantasy_team_code': PLAYER.FANTASY_TEAM_CODE,
+    'fantasy_team_id': PLAYER.FANTASY_TEAM_ID,
+    'first_name': PLAYER.FIRST_NAME,
+    'last_name': PLAYER.LAST_NAME,
+    'number_of_goals': PLAYER.NUMBER_OF_GOALS,
+    'fantasy_news': PLAYER.FANTASY_NEWS,
+    'fantasy_news_timestamp': PLAYER.FANTASY_NEWS_TIMESTAMP,
+    'photo_url': PLAYER.FANTASY_PHOTO_URL,
+    'fantasy_overall_price_rise': PLAYER.FANTASY_OVERALL_PRICE_RISE,
+    'fantasy_overall_price_fall': PLAYER.FANTASY_OVERALL_PRICE_FALL,
+    'fantasy_week_price_rise': PLAYER.FANTASY_WEEK_PRICE_RISE,
+    'fantasy_week_price_fall': PLAYER.FANTASY_WEEK_PRICE_FALL,
+    'fantasy_overall_transfers_in': PLAYER.FANTASY_OVERALL_TRANSFERS_IN,
+    'fantasy_overall_transfers_out': PLAYER.FANTASY_OVERALL_TRANSFERS_OUT,
+    'fantasy_overall_points': PLAYER.FANTASY_OVERALL_POINTS,
+    'fantasy_point_average': PLAYER.FANTASY_POINT_AVERAGE,
+    'fantasy_total_bonus': PLAYER.FANTASY_TOTAL_BONUS,
+    'fantasy_price': PLAYER.FANTASY_PRICE,
+    'chance_of_playing_this_week': PLAYER.FANTASY_CHANCE_OF_PLAYING_THIS_WEEK,
+    'chance_of_playing_next_week': PLAYER.FANTASY_CHANCE_OF_PLAYING_NEXT_WEEK,
+    'fantasy_dream_team_member': PLAYER.FANTASY_DREAM_TEAM_MEMBER,
+    'fantasy_dream_team_count': PLAYER.FANTASY_DREAM_TEAM_COUNT,
+    'fantasy_selection_percentage': PLAYER.FANTASY_SELECTION_PERCENTAGE,
+    'fantasy_form': PLAYER.FANTASY_FORM,
+    'fantasy_special': PLAYER.FANTASY_SPECIAL,
+}
+
+# MatchStats column -> historical gameweek frame field (load_historical_gameweeks with BACKFILL_CSV_COLUMNS)
+HISTORICAL_MATCH_STATS_FIELDS = {
+    'player_id': PLAYER.ID,
+    'season': SEASON.NAME,
+    'fantasy_match_id': MATCH.FANTASY_MATCH_ID,
+    'goals_scored': PLAYER.NUMBER_OF_GOALS,
+    'goals_conceded': PLAYER.GOALS_CONCEDED,
+    'assists': PLAYER.ASSISTS,
+    'own_goals': PLAYER.OWN_GOALS,
+    'penalties_saved': PLAYER.PENALTIES_SAVED,
+    'penalties_missed': PLAYER.PENALTIES_MISSED,
+    'yellow_cards': PLAYER.YELLOW_CARDS,
+    'red_cards': PLAYER.RED_CARDS,
+    'saves': PLAYER.SAVES,
+    'bonus': PLAYER.FANTASY_WEEK_BONUS,
+    'clean_sheet': MATCH_EVENT.CLEAN_SHEET,
+    'fantasy_influence': PLAYER.FANTASY_INFLUENCE,
+    'fantasy_creativity': PLAYER.FANTASY_CREATIVITY,
+    'fantasy_threat': PLAYER.FANTASY_THREAT,
+    'fantasy_ict_index': PLAYER.FANTASY_ICT_INDEX,
+    'played_at_home': PLAYER.PLAYED_AT_HOME,
+    'minutes_played': PLAYER.MINUTES_PLAYED,
+}
+
+# FantasyWeekStats column -> historical gameweek frame field, the CSV total_points are the points of that gameweek
+# fantasy_week_bonus holds the bonus points (0-3) of the game week for both the CSVs and the live element summaries
+HISTORICAL_WEEK_STATS_FIELDS = {
+    'player_id': PLAYER.ID,
+    'season': SEASON.NAME,
+    'game_week': PLAYER.FANTASY_WEEK,
+    'season_value': PLAYER.FANTASY_WEEK_VALUE,
+    'fantasy_week_points': PLAYER.FANTASY_OVERALL_POINTS,
+    'fantasy_transfers_balance': PLAYER.FANTASY_TRANSFERS_BALANCE,
+    'fantasy_selection_count': PLAYER.FANTASY_SELECTION_COUNT,
+    'fantasy_week_transfers_in': PLAYER.FANTASY_WEEK_TRANSFERS_IN,
+    'fantasy_week_transfers_out': PLAYER.FANTASY_WEEK_TRANSFERS_OUT,
+    'fantasy_week_bonus': PLAYER.FANTASY_WEEK_BONUS,
+}
+
+# PlayerAggregate column -> aggregate of the FantasyWeekStats / MatchStats rows of a player in the window
+PLAYER_AGGREGATE_WEEK_COLUMNS = {
+    PLAYER_AGGREGATE.GAME_WEEKS: func.count(),
+    PLAYER_AGGREGATE.FANTASY_POINTS: func.coalesce(func.sum(FantasyWeekStats.fantasy_week_points), 0),
+}
+PLAYER_AGGREGATE_MATCH_COLUMNS = {
+    PLAYER_AGGREGATE.APPEARANCES: func.count().filter(MatchStats.minutes_played > 0),
+    PLAYER_AGGREGATE.MINUTES_PLAYED: func.coalesce(func.sum(MatchStats.minutes_played), 0),
+    PLAYER_AGGREGATE.BONUS: func.coalesce(func.sum(MatchStats.bonus), 0),
+    PLAYER_AGGREGATE.GOALS_SCORED: func.coalesce(func.sum(MatchStats.goals_scored), 0),
+    PLAYER_AGGREGATE.ASSISTS: func.coalesce(func.sum(MatchStats.assists), 0),
+    PLAYER_AGGREGATE.CLEAN_SHEETS: func.count().filter(MatchStats.clean_sheet.is_(True)),
+    PLAYER_AGGREGATE.GOALS_CONCEDED: func.coalesce(func.sum(MatchStats.goals_conceded), 0),
+    PLAYER_AGGREGATE.YELLOW_CARDS: func.coalesce(func.sum(MatchStats.yellow_cards), 0),
+    PLAYER_AGGREGATE.RED_CARDS: func.coalesce(func.sum(MatchStats.red_cards), 0),
+    PLAYER_AGGREGATE.SAVES: func.coalesce(func.sum(MatchStats.saves), 0),
+    PLAYER_AGGREGATE.FANTASY_INFLUENCE: func.coalesce(func.sum(MatchStats.fantasy_influence), 0),
+    PLAYER_AGGREGATE.FANTASY_CREATIVITY: func.coalesce(func.sum(MatchStats.fantasy_creativity), 0),
+    PLAYER_AGGREGATE.FANTASY_THREAT: func.coalesce(func.sum(MatchStats.fantasy_threat), 0),
+    PLAYER_AGGREGATE.FANTASY_ICT_INDEX: func.coalesce(func.sum(MatchStats.fantasy_ict_index), 0),
+}
+# Other numeric MatchStats columns a leaderboard can rank on, summed from the raw stats as no aggregate keeps them
+LEADERBOARD_MATCH_COLUMNS = {
+    name: func.coalesce(func.sum(column), 0) for name, column in MatchStats.__table__.c.items()
+    if name not in PLAYER_AGGREGATE_MATCH_COLUMNS and not column.foreign_keys and not column.primary_key and
+    name not in ['season', 'fantasy_match_id'] and column.type.python_type in (int, float)
+}
+
+# Player fields returned with every PlayerAggregate record
+PLAYER_AGGREGATE_PLAYER_FIELDS = [PLAYER.NAME, PLAYER.FANTASY_WEB_NAME, PLAYER.TEAM, PLAYER.POSITION]
+LEADERBOARD_PLAYER_FIELDS = PLAYER_AGGREGATE_PLAYER_FIELDS + [PLAYER.FANTASY_PRICE]
+LEADERBOARD_RANK = 'rank'
+
+# Unique ORDER BY of each paginated table, the keyset of the last row of a page is the cursor to the next page.
+# Kick off times can be missing, those matches sort first
+KEYSETS = {
+    Team: (Team.id,),
+    Match: (func.coalesce(Match.start_time, datetime.min), Match.id),
+    MatchStats: (MatchStats.id,),
+    Player: (Player.id,),
+}
+
+
+def encode_cursor(keyset_values):
+    """
+    :param keyset_values: keyset of the last row of a page
+    :return: opaque url safe cursor
+    :rtype: str
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(list(keyset_values))).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    :param cursor: cursor from encode_cursor
+    :return: keyset values the next page starts after
+    :rtype: list
+    :raises InvalidCursor: when the cursor was not made by encode_cursor
+    """
+    try:
+        keyset_values = orjson.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor(f'Invalid cursor {cursor}') from e
+
+    if not isinstance(keyset_values, list) or not keyset_values:
+        raise InvalidCursor(f'Invalid cursor {cursor}')
+    return keyset_values
+
+
+def seek(query, keyset, cursor=None):
+    """
+    Restrict a query to the rows after a cursor, in keyset order
+    :param query: query of the paginated entity
+    :param keyset: unique ordering of the entity e.g. KEYSETS[Match]
+    :param cursor: cursor returned with the previous page, query unchanged when None
+    :return: filtered query
+    """
+    if not cursor:
+        return query
+
+    keyset_values = decode_cursor(cursor)
+    if len(keyset_values) != len(keyset):
+        raise InvalidCursor(f'Invalid cursor {cursor}')
+    return query.filter(tuple_(*keyset) > tuple_(*keyset_values))
+
+
+def keyset_paginate(query, keyset, limit, cursor=None):
+    """
+    Keyset pagination: order by the keyset, seek past the cursor with a row value comparison and fetch a single row
+    more than the page to know whether there is a next page
+    :param query: query of a single entity
+    :param keyset: unique ordering of the entity e.g. KEYSETS[Match]
+    :param limit: page size
+    :param cursor: cursor returned with the previous page, first page when None
+    :return: rows of the page, without the keyset columns, and the cursor of the next page (None on the last page)
+    :rtype: tuple
+    """
+    rows = seek(query, keyset=keyset, cursor=cursor).add_columns(*keyset).order_by(*keyset).limit(limit + 1).all()
+    width = len(rows[0]) - len(keyset) if rows else 0
+    next_cursor = encode_cursor(rows[limit - 1][width:]) if len(rows) > limit else None
+    return [tuple(row[:width]) for row in rows[:limit]], next_cursor
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+class InvalidSort(ValueError):
+    pass
+
+
+# Ingest bookkeeping columns, never part of the records served
+INTERNAL_COLUMNS = {PLAYER.CONTENT_HASH}
+
+
+def model_columns(model):
+    """
+    :param model: SQLAlchemy model
+    :return: attribute name -> column of every column of the model bar INTERNAL_COLUMNS, in table order
+    :rtype: dict
+    """
+    return {attribute.key: getattr(model, attribute.key) for attribute in inspect(model).column_attrs
+            if attribute.key not in INTERNAL_COLUMNS}
+
+
+# Computed once, responses are built from plain column rows rather than from ORM instances
+MODEL_COLUMNS = {model: model_columns(model) for model in [Team, Match, MatchStats, Player, FantasyWeekStats, Standings,
+                                                            StandingsEntry, PlayerAggregate]}
+
+
+def projection(model, fields=None):
+    """
+    Columns to select for the requested fields of a model
+    :param model: SQLAlchemy model
+    :param fields: field names to return, every column when None and none at all when empty
+    :return: field names and their columns
+    :rtype: tuple
+    :raises InvalidFields: when a field is not a column of the model
+    """
+    columns = MODEL_COLUMNS[model]
+    if fields is None:
+        return list(columns), list(columns.values())
+
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise InvalidFields(f'Unknown fields {unknown}')
+
+    return list(fields), [columns[field] for field in fields]
+
+
+def to_records(names, rows, as_list=False):
+    """
+    Column rows to dicts, the counterpart of clean_output for projected queries
+    :param names: field name of each column of the rows
+    :param rows: query rows
+    :param as_list: format output as list even when there is a single row
+    :return: record or list of records
+    """
+    records = [dict(zip(names, row)) for row in rows]
+    if not as_list and len(records) == 1:
+        return records[0]
+
+    return records
+
+
+def match_stats_row(player_id, match, match_ids, season=CURRENT_SEASON):
+    """
+    Build a MatchStats row from a fantasy match history entry
+    :param player_id: DB id of the player the stats belong to
+    :param match: fantasy match history entry
+    :param match_ids: fantasy_match_id -> Match.id for matches already in the DB
+    :param season: season code of the entry e.g. 201920
+    :return: column -> value mapping
+    :rtype: dict
+    """
+    return {
+        'player_id': player_id,
+        'season': season,
+        'match_id': match_ids.get(match[MATCH.FANTASY_MATCH_ID]),
+        'fantasy_match_id': match[MATCH.FANTASY_MATCH_ID],
+        'goals_scored': match[PLAYER.NUMBER_OF_GOALS],
+        'goals_conceded': match[PLAYER.GOALS_CONCEDED],
+        'assists': match[PLAYER.ASSISTS],
+        'own_goals': match[PLAYER.OWN_GOALS],
+        'penalties_saved': match[PLAYER.PENALTIES_SAVED],
+        'penalties_missed': match[PLAYER.PENALTIES_MISSED],
+        'yellow_cards': match[PLAYER.YELLOW_CARDS],
+        'red_cards': match[PLAYER.RED_CARDS],
+        'saves': match[PLAYER.SAVES],
+        'bonus': match[PLAYER.FANTASY_WEEK_BONUS],
+        'clean_sheet': match[MATCH_EVENT.CLEAN_SHEET],
+        'fantasy_influence': match[PLAYER.FANTASY_INFLUENCE],
+        'fantasy_creativity': match[PLAYER.FANTASY_CREATIVITY],
+        'fantasy_threat': match[PLAYER.FANTASY_THREAT],
+        'fantasy_ict_index': match[PLAYER.FANTASY_ICT_INDEX],
+        'played_at_home': match[PLAYER.PLAYED_AT_HOME],
+        'minutes_played': match[PLAYER.MINUTES_PLAYED],
+    }
+
+
+def week_stats_row(player_id, match, season=CURRENT_SEASON):
+    """
+    Build a FantasyWeekStats row from a fantasy match history entry
+    :param player_id: DB id of the player the stats belong to
+    :param match: fantasy match history entry
+    :param season: season code of the entry e.g. 201920
+    :return: column -> value mapping
+    :rtype: dict
+    """
+    return {
+        'player_id': player_id,
+        'season': season,
+        'game_week': match[MATCH.FANTASY_GAME_WEEK],
+        'season_value': match[PLAYER.FANTASY_SEASON_VALUE],
+        'fantasy_week_points': match[PLAYER.FANTASY_WEEK_POINTS],
+        'fantasy_transfers_balance': match[PLAYER.FANTASY_TRANSFERS_BALANCE],
+        'fantasy_selection_count': match[PLAYER.FANTASY_SELECTION_COUNT],
+        'fantasy_week_transfers_in': match[PLAYER.FANTASY_WEEK_TRANSFERS_IN],
+        'fantasy_week_transfers_out': match[PLAYER.FANTASY_WEEK_TRANSFERS_OUT],
+        'fantasy_week_bonus': match[PLAYER.FANTASY_WEEK_BONUS],
+    }
+
+
 def col_exists(table, col):
     """
     Check if column exists inside table
@@ -63,7 +376,7 @@ def to_json(result_map, aggregator_name, limit=10):
             dict_result = k.__dict__
             dict_result.pop(IGNORE.INSTANCE_STATE, None)
             if aggregator_name == PLAYER.WEEK_STATS:
-                dict_result[aggregator_name] = clean_output(v, as_list=True, limit=38)
+                dict_result[aggregator_name] = clean_output(v, as_list=True, limit=GAME_WEEKS_PER_SEASON)
             else:
                 dict_result[aggregator_name] = clean_output(v, as_list=True, limit=limit)
             list_dict_result.append(dict_result)
@@ -101,6 +414,10 @@ class DBInterface(object):
 
     def __init__(self, db):
         self.db = db
+        self.player_resolver = None
+        self.ingest_changes = defaultdict(Counter)  # entity -> changed / unchanged rows written since start up
+        self.standings_engines = {}  # (football-data competition id, season start date) -> StandingsEngine
+        self.standings_lock = Lock()
         # When using create_engine() directly, not via Flask
         if isinstance(db, engine.base.Engine):
             pg_session = sessionmaker(bind=db)
@@ -122,6 +439,74 @@ class DBInterface(object):
 
             self.db.session.commit()
 
+    def bump_data_version(self):
+        """
+        Mark the data served by the API as changed, invalidating every cached API response
+        Runs in the caller's transaction so the version only moves once the write it covers is committed
+        """
+        self.db.session.execute(
+            insert(DataVersion)
+            .values(id=1, version=1, updated_at=func.now())
+            .on_conflict_do_update(index_elements=['id'],
+                                   set_={'version': DataVersion.version + 1, 'updated_at': func.now()}))
+
+    def log_changes(self, entity, changed, total):
+        """
+        Count and log the rows an insert / update path actually wrote, the others were unchanged and skipped
+        :param entity: name of the records e.g. Matches
+        :param changed: records inserted or updated
+        :param total: records received
+        """
+        self.ingest_changes[entity].update({'changed': changed, 'unchanged': total - changed})
+        logging.info(f'{entity} - {changed}/{total} changed, {total - changed} unchanged skipped')
+
+    def get_data_version(self) -> int:
+        """
+        :return: current data version, 0 before the first ingest write
+        """
+        return self.db.session.query(DataVersion.version).filter(DataVersion.id == 1).scalar() or 0
+
+    def get_watermarks(self):
+        """
+        Ingest watermarks of every source, a source without a stored state starts from what the DB already holds
+        :return: source -> {last_kickoff, last_news, last_match_day}
+        :rtype: dict
+        """
+        watermarks = {
+            # Only matches with a score, fixtures of the current week are stored before they are played
+            INGEST_STATE.MATCHES: {
+                INGEST_STATE.LAST_KICKOFF: self.db.session.query(func.max(Match.start_time))
+                .filter(Match.ft_home_score.isnot(None)).scalar()
+            },
+            INGEST_STATE.PLAYERS: {
+                INGEST_STATE.LAST_NEWS: self.db.session.query(func.max(Player.fantasy_news_timestamp)).scalar()
+            },
+            INGEST_STATE.STANDINGS: {
+                INGEST_STATE.LAST_MATCH_DAY: self.db.session.query(func.max(Standings.match_day)).scalar()
+            }
+        }
+        for state in self.db.session.query(IngestState):
+            watermarks[state.source] = {
+                INGEST_STATE.LAST_KICKOFF: state.last_kickoff,
+                INGEST_STATE.LAST_NEWS: state.last_news,
+                INGEST_STATE.LAST_MATCH_DAY: state.last_match_day
+            }
+
+        return watermarks
+
+    def set_watermark(self, source, **watermarks):
+        """
+        Move the watermarks of a source forward, only once the data they cover has been committed
+        :param source: IngestState source e.g. matches
+        :param watermarks: columns to set e.g. last_kickoff=datetime(2019, 8, 9, 19)
+        """
+        values = {**watermarks, INGEST_STATE.UPDATED_AT: func.now()}
+        self.db.session.execute(
+            insert(IngestState)
+            .values(source=source, **values)
+            .on_conflict_do_update(index_elements=[INGEST_STATE.SOURCE], set_=values))
+        self.db.session.commit()
+
     def get_last_game_week(self, filters=None, table=Standings) -> int:
         """
         Get the latest game week
@@ -172,17 +557,21 @@ class DBInterface(object):
 
         return clean_output(query_result, limit=limit)
 
-    def get_team(self, limit: int=10,  multi=False, filters=None):
+    def get_team(self, limit: int=10,  multi=False, filters=None, cursor=None, fields=None):
         """
         Query DB for team record
         :param limit: Optional limit for number of teams to retrieve
         :param multi: Perform OR query on filters, SQL OR otherwise SQL AND
         :param filters: namedtuple with all available filter fields
-        :return: matched (if any) team records
+        :param cursor: cursor of the page to retrieve, first page by default
+        :param fields: team fields to return, all of them by default
+        :return: matched (if any) team records and the cursor of the next page
+        :rtype: tuple
         """
 
         db_filters = []
-        team_query = self.db.session.query(Team)
+        names, columns = projection(Team, fields)
+        team_query = self.db.session.query(*columns)
         active_filters = [(f, v) for f, v in filters._asdict().items() if v]
 
         for filter_ in active_filters:
@@ -200,76 +589,124 @@ class DBInterface(object):
         else:
             query_result = team_query.filter(*db_filters)
 
-        return clean_output(query_result, limit=limit)
+        teams, next_cursor = keyset_paginate(query_result, keyset=KEYSETS[Team], limit=limit, cursor=cursor)
+        return to_records(names, teams), next_cursor
 
     def insert_team(self, record: Union[list, dict]):
         """
-        Insert team record into DB
-        :return:
+        Insert team record into DB, teams already stored are updated when their content hash changed
+        Unchanged teams, squad included, are skipped
+        :return: Number of teams inserted or updated
+        :rtype: int
         """
         if isinstance(record, dict):
             record = [record]
 
+        stored_hashes = dict(self.db.session.query(Team.fantasy_id, Team.content_hash)
+                             .filter(Team.fantasy_id.in_([team.get(TEAM.FANTASY_ID) for team in record])))
+        changed = 0
+        self.load_player_resolver()
         for team in record:
+            team[TEAM.CONTENT_HASH] = team.get(TEAM.CONTENT_HASH) or content_hash(team)
+            fantasy_id = team.get(TEAM.FANTASY_ID)
+            if stored_hashes.get(fantasy_id) == team[TEAM.CONTENT_HASH]:
+                continue
+
+            changed += 1
             for player in team.get(TEAM.SQUAD):
                 player[PLAYER.TEAM] = team[TEAM.NAME]
                 player[PLAYER.TEAM_FD_ID] = team[TEAM.FOOTBALL_DATA_ID]
                 self.insert_basic_player(fd_id=player[PLAYER.FOOTBALL_DATA_API_ID], record=player)
             team.pop(TEAM.ACTIVE_COMPETITIONS)  # for now ignore
             team.pop(TEAM.SQUAD)
-            team_query = self.db.session.query(Team).filter(Team.fantasy_id == team.get(TEAM.FANTASY_ID))
-            if not team_query.count():
+            if fantasy_id in stored_hashes:
+                self.db.session.query(Team).filter(Team.fantasy_id == fantasy_id).update(team)
+            else:
                 self.db.session.add(Team(**team))
 
+        self.log_changes('Teams', changed=changed, total=len(record))
+        if changed:
+            self.bump_data_version()
         self.db.session.commit()
+        return changed
 
-    def get_player(self, limit: int = 10,  multi=False, filters=None):
+    def get_player(self, limit: int = 10,  multi=False, filters=None, cursor=None, fields=None):
         """
         Query DB for player record
         :param limit: Optional limit for number of teams to retrieve
         :param multi: Perform OR query on filters, SQL OR otherwise SQL AND
         :param filters: namedtuple with all available filter fields
-        :return: matched (if any) team records
+        :param cursor: cursor of the page to retrieve, first page by default
+        :param fields: player fields to return, all of them and week_stats by default
+        :return: matched (if any) team records and the cursor of the next page
+        :rtype: tuple
         """
 
-        db_filters = []
-        player_query = self.db.session\
-            .query(Player, FantasyWeekStats)\
-            .outerjoin(FantasyWeekStats, Player.id == FantasyWeekStats.player_id)
-
+        player_filters = []
+        week_filters = []
         active_filters = [(f, v) for f, v in filters._asdict().items() if v]
 
         for filter_ in active_filters:
             for filter_val in filter_[1]:
 
                 if filter_[0] in [PLAYER.NAME, PLAYER.TEAM, PLAYER.COUNTRY_OF_BIRTH, PLAYER.NATIONALITY]:
-                    db_filters.append(Player.name.ilike(f"%{filter_val}%"))
+                    player_filters.append(Player.__table__.c[filter_[0]].ilike(f"%{filter_val}%"))
 
-                else:
-                    active_table = Player.__table__
-                    if col_exists(table=Player, col=filter_[0]):
-                        active_table = Player.__table__
+                elif not col_exists(table=Player, col=filter_[0]) and col_exists(table=FantasyWeekStats,
+                                                                                   col=filter_[0]):
+                    week_filters.append(filter_parse(query_str=filter_val, table=FantasyWeekStats.__table__,
+                                                     column=filter_[0]))
 
-                    elif col_exists(table=FantasyWeekStats, col=filter_[0]):
-                        active_table = FantasyWeekStats.__table__
+                else:
+                    player_filters.append(filter_parse(query_str=filter_val, table=Player.__table__,
+                                                       column=filter_[0]))
 
-                    db_filters.append(filter_parse(query_str=filter_val, table=active_table, column=filter_[0]))
+        # A player matches a week stats filter when any of their weeks does, that week is then the only one returned
+        def has_week(*conditions):
+            return self.db.session.query(FantasyWeekStats)\
+                .filter(FantasyWeekStats.player_id == Player.id, *conditions).exists()
 
         if multi:
-            query_result = player_query.filter(or_(*db_filters)).all()
+            match_filters = [or_(*player_filters, *([has_week(or_(*week_filters))] if week_filters else []))]
+            week_row_filters = [or_(*player_filters, *week_filters)]
+            if not player_filters and not week_filters:
+                match_filters = week_row_filters = []
         else:
-            query_result = player_query.filter(*db_filters).all()
-
-        player_week_stat_map = {}
-        for player, week_stat in query_result:
-            if player not in player_week_stat_map:
-                player_week_stat_map[player] = []
-
-            if week_stat:
-                player_week_stat_map[player].append(week_stat)
-
-        result = to_json(player_week_stat_map, aggregator_name=PLAYER.WEEK_STATS)
-        return result
+            match_filters = player_filters + ([has_week(*week_filters)] if week_filters else [])
+            week_row_filters = player_filters + week_filters
+
+        # Two phases: a page of player ids (LIMIT in SQL), then the players and week stats of that page only
+        page, next_cursor = keyset_paginate(self.db.session.query(Player.id).filter(*match_filters),
+                                            keyset=KEYSETS[Player], limit=limit, cursor=cursor)
+        page = [player_id for player_id, in page]
+        if not page:
+            return [], next_cursor
+
+        with_week_stats = fields is None or PLAYER.WEEK_STATS in fields
+        # ?fields=week_stats alone selects no Player column, the ids only key the week stats
+        names, columns = projection(Player, None if fields is None else
+                                    [field for field in fields if field != PLAYER.WEEK_STATS])
+        players = {}
+        for player_id, *row in self.db.session.query(Player.id, *columns)\
+                .filter(Player.id.in_(page))\
+                .order_by(*KEYSETS[Player]):
+            players[player_id] = dict(zip(names, row))
+            if with_week_stats:
+                players[player_id][PLAYER.WEEK_STATS] = []
+
+        if with_week_stats:
+            week_names, week_columns = projection(FantasyWeekStats)
+            week_stats = self.db.session.query(FantasyWeekStats.player_id, *week_columns)\
+                .join(Player, Player.id == FantasyWeekStats.player_id)\
+                .filter(FantasyWeekStats.player_id.in_(page), *week_row_filters)\
+                .order_by(FantasyWeekStats.player_id, FantasyWeekStats.season.desc(), FantasyWeekStats.game_week)
+
+            for player_id, *row in week_stats:
+                if len(players[player_id][PLAYER.WEEK_STATS]) < GAME_WEEKS_PER_SEASON:  # A season worth of weeks
+                    players[player_id][PLAYER.WEEK_STATS].append(dict(zip(week_names, row)))
+
+        result = list(players.values())
+        return (result[0] if len(result) == 1 else result), next_cursor
 
     def insert_player(self, record: Union[list, dict]):
         """
@@ -279,91 +716,31 @@ class DBInterface(object):
         if isinstance(record, dict):
             record = [record]
 
-        for player in record:
+        resolver = self.load_player_resolver()
+        resolved = [(player.get(PLAYER.ID) or resolver.resolve(player), player) for player in record]
+        stored_hashes = dict(self.db.session.query(Player.id, Player.content_hash)
+                             .filter(Player.id.in_([player_id for player_id, _ in resolved if player_id])))
+        player_ids = []
+        for player_id, player in resolved:
             fantasy_week_stats = None
             fantasy_stats = None
-            player_query = self.db.session.query(Player).filter(Player.name.ilike(player[PLAYER.NAME]))
-            if not player_query.count():
-                player_query = self.db.session.query(Player).filter(Player.name.ilike(player[PLAYER.FANTASY_WEB_NAME]))
-
-            if not player_query.count():
-                player_query = self.db.session.query(Player)\
-                    .filter(Player.name.ilike(f"{player[PLAYER.FANTASY_WEB_NAME]} {player[PLAYER.LAST_NAME]}"))
-
-            if not player_query.count():  # Try to match with just first and last name
-                player_query = self.db.session\
-                    .query(Player) \
-                    .filter(Player.name.ilike(
-                     f"{player[PLAYER.FIRST_NAME].split(' ')[0]} {player[PLAYER.LAST_NAME].split(' ')[-1]}"))
-
-            if not player_query.count():  # Try to match with (first) first name and (first) last name
-                player_query = self.db.session\
-                    .query(Player) \
-                    .filter(Player.name.ilike(
-                     f"{player[PLAYER.FIRST_NAME].split(' ')[0]} {player[PLAYER.LAST_NAME].split(' ')[0]}"))
-
-            if not player_query.count():  # Try to match with (last) first name and (first) last name
-                player_query = self.db.session \
-                    .query(Player) \
-                    .filter(Player.name.ilike(
-                    f"{player[PLAYER.FIRST_NAME].split(' ')[-1]} {player[PLAYER.LAST_NAME].split(' ')[0]}"))
-
-            if not player_query.count():  # Try to match with just web_name and (last) last name
-                player_query = self.db.session\
-                    .query(Player) \
-                    .filter(Player.name.ilike(
-                     f"{player[PLAYER.FANTASY_WEB_NAME]} {player[PLAYER.LAST_NAME].split(' ')[-1]}"))
-
-            if not player_query.count():  # Try to match with first_name and (first) last name
-                player_query = self.db.session\
-                    .query(Player) \
-                    .filter(Player.name.ilike(
-                     f"{player[PLAYER.FIRST_NAME]} {player[PLAYER.LAST_NAME].split(' ')[0]}"))
-
-            if not player_query.count():  # Try to match with just web_name and (first) last name
-                player_query = self.db.session\
-                    .query(Player) \
-                    .filter(Player.name.ilike(
-                     f"{player[PLAYER.FANTASY_WEB_NAME]} {player[PLAYER.LAST_NAME].split(' ')[0]}"))
-
-            if player_query.count():
-                player_record = player_query.first()
-                player_record.fantasy_id = player.get(PLAYER.FANTASY_ID, None)
-                player_record.fantasy_code = player.get(PLAYER.FANTASY_CODE, None)
-                player_record.fantasy_team_code = player.get(PLAYER.FANTASY_TEAM_CODE, None)
-                player_record.fantasy_team_id = player.get(PLAYER.FANTASY_TEAM_ID, None)
-                player_record.first_name = player.get(PLAYER.FIRST_NAME, None)
-                player_record.last_name = player.get(PLAYER.LAST_NAME, None)
-                player_record.number_of_goals = player.get(PLAYER.NUMBER_OF_GOALS, None)
-                player_record.fantasy_news = player.get(PLAYER.FANTASY_NEWS, None)
-                player_record.fantasy_news_timestamp = player.get(PLAYER.FANTASY_NEWS_TIMESTAMP, None)
-                player_record.photo_url = player.get(PLAYER.FANTASY_PHOTO_URL, None)
-                player_record.fantasy_overall_price_rise = player.get(PLAYER.FANTASY_OVERALL_PRICE_RISE, None)
-                player_record.fantasy_overall_price_fall = player.get(PLAYER.FANTASY_OVERALL_PRICE_FALL, None)
-                player_record.fantasy_week_price_rise = player.get(PLAYER.FANTASY_WEEK_PRICE_RISE, None)
-                player_record.fantasy_week_price_fall = player.get(PLAYER.FANTASY_WEEK_PRICE_FALL, None)
-                player_record.fantasy_overall_transfers_in = player.get(PLAYER.FANTASY_OVERALL_TRANSFERS_IN, None)
-                player_record.fantasy_overall_transfers_out = player.get(PLAYER.FANTASY_OVERALL_TRANSFERS_OUT, None)
-                player_record.fantasy_overall_points = player.get(PLAYER.FANTASY_OVERALL_POINTS, None)
-                player_record.fantasy_point_average = player.get(PLAYER.FANTASY_POINT_AVERAGE, None)
-                player_record.fantasy_total_bonus = player.get(PLAYER.FANTASY_TOTAL_BONUS, None)
-                player_record.fantasy_price = player.get(PLAYER.FANTASY_PRICE, None)
-                player_record.chance_of_playing_this_week = player.get(PLAYER.FANTASY_CHANCE_OF_PLAYING_THIS_WEEK, None)
-                player_record.chance_of_playing_next_week = player.get(PLAYER.FANTASY_CHANCE_OF_PLAYING_NEXT_WEEK, None)
-                player_record.fantasy_dream_team_member = player.get(PLAYER.FANTASY_DREAM_TEAM_MEMBER, None)
-                player_record.fantasy_dream_team_count = player.get(PLAYER.FANTASY_DREAM_TEAM_COUNT, None)
-                player_record.fantasy_selection_percentage = player.get(PLAYER.FANTASY_SELECTION_PERCENTAGE, None)
-                player_record.fantasy_form = player.get(PLAYER.FANTASY_FORM, None)
-                player_record.fantasy_special = player.get(PLAYER.FANTASY_SPECIAL, None)
-                player_record.bps = player.get(PLAYER.FANTASY_TOTAL_BONUS, None)
+            player_hash = player.get(PLAYER.CONTENT_HASH) or content_hash(player)
+            if player_id and stored_hashes.get(player_id) != player_hash:
+                player_ids.append(player_id)
+                player_record = self.db.session.query(Player).get(player_id)
+                player_record.content_hash = player_hash
+                for column, field in FANTASY_PLAYER_FIELDS.items():
+                    setattr(player_record, column, player.get(field, None))
 
                 for match in player.get(PLAYER.SEASON_MATCH_HISTORY, []):
                     match_stat_query = self.db.session.query(MatchStats).\
                         filter(MatchStats.player_id == player_record.id).\
+                        filter(MatchStats.season == CURRENT_SEASON).\
                         filter(MatchStats.fantasy_match_id == match[MATCH.FANTASY_MATCH_ID])
 
                     if not match_stat_query.count():
                         fantasy_stats = MatchStats()
+                        fantasy_stats.season = CURRENT_SEASON
                         fantasy_stats.fantasy_match_id = match[MATCH.FANTASY_MATCH_ID]
                         fantasy_stats.goals_scored = match[PLAYER.NUMBER_OF_GOALS]
                         fantasy_stats.goals_conceded = match[PLAYER.GOALS_CONCEDED]
@@ -384,10 +761,12 @@ class DBInterface(object):
 
                     week_stat_query = self.db.session.query(FantasyWeekStats). \
                         filter(FantasyWeekStats.player_id == player_record.id). \
+                        filter(FantasyWeekStats.season == CURRENT_SEASON). \
                         filter(FantasyWeekStats.game_week == match[MATCH.FANTASY_GAME_WEEK])
 
                     if not week_stat_query.count():
                         fantasy_week_stats = FantasyWeekStats()
+                        fantasy_week_stats.season = CURRENT_SEASON
                         fantasy_week_stats.game_week = match[MATCH.FANTASY_GAME_WEEK]
                         fantasy_week_stats.season_value = match[PLAYER.FANTASY_SEASON_VALUE]
                         fantasy_week_stats.fantasy_week_points = match[PLAYER.FANTASY_WEEK_POINTS]
@@ -411,6 +790,411 @@ class DBInterface(object):
 
                 self.db.session.commit()
 
+        self.log_changes('Players', changed=len(player_ids), total=len(record))
+        self.refresh_player_aggregates(player_ids=player_ids)
+        if player_ids:
+            self.bump_data_version()
+        self.db.session.commit()
+
+    def load_player_resolver(self):
+        """
+        Load every player once into an in-memory identity index used by the insert paths
+        :return: PlayerResolver over all players in the DB
+        :rtype: PlayerResolver
+        """
+        players = self.db.session.query(Player.id, Player.name, Player.first_name, Player.last_name, Player.fd_id)
+        self.player_resolver = PlayerResolver(players=[{
+            PLAYER.ID: player_id,
+            PLAYER.NAME: name,
+            PLAYER.FIRST_NAME: first_name,
+            PLAYER.LAST_NAME: last_name,
+            PLAYER.FOOTBALL_DATA_API_ID: fd_id,
+        } for player_id, name, first_name, last_name, fd_id in players.order_by(Player.id)])
+
+        return self.player_resolver
+
+    def search_documents(self):
+        """
+        Every searchable name, indexed by the API search endpoint
+        :return: player, team and competition records tagged with their SEARCH.TYPE
+        :rtype: list
+        """
+        players = self.db.session.query(Player.id, Player.name, Player.web_name, Player.team, Player.position)
+        teams = self.db.session.query(Team.id, Team.name)
+        competitions = self.db.session.query(Competition.id, Competition.name)
+
+        return [{SEARCH.TYPE: SEARCH.PLAYER, PLAYER.ID: player_id, PLAYER.NAME: name, PLAYER.FANTASY_WEB_NAME: web_name,
+                 PLAYER.TEAM: team, PLAYER.POSITION: position}
+                for player_id, name, web_name, team, position in players.order_by(Player.id)] + \
+               [{SEARCH.TYPE: SEARCH.TEAM, TEAM.ID: team_id, TEAM.NAME: name}
+                for team_id, name in teams.order_by(Team.id)] + \
+               [{SEARCH.TYPE: SEARCH.COMPETITION, COMPETITION.ID: competition_id, COMPETITION.NAME: name}
+                for competition_id, name in competitions.order_by(Competition.id)]
+
+    def load_crosswalk(self):
+        """
+        Load the persisted team / competition id crosswalk
+        :return: CrosswalkResolver over every stored mapping
+        :rtype: CrosswalkResolver
+        """
+        entries = self.db.session.query(Crosswalk.entity_type, Crosswalk.source, Crosswalk.source_id,
+                                        Crosswalk.canonical_id)
+        return CrosswalkResolver(entries=[{
+            CROSSWALK.ENTITY_TYPE: entity_type,
+            CROSSWALK.SOURCE: source,
+            CROSSWALK.SOURCE_ID: source_id,
+            CROSSWALK.CANONICAL_ID: canonical_id
+        } for entity_type, source, source_id, canonical_id in entries])
+
+    def save_crosswalk(self, crosswalk: CrosswalkResolver):
+        """
+        Persist the mappings a CrosswalkResolver reconciled since it was loaded
+        :param crosswalk: resolver holding new mappings
+        :return: Number of mappings written
+        :rtype: int
+        """
+        if not crosswalk.new_entries:
+            return 0
+
+        statement = insert(Crosswalk).values(crosswalk.new_entries)\
+            .on_conflict_do_nothing(index_elements=[CROSSWALK.ENTITY_TYPE, CROSSWALK.SOURCE, CROSSWALK.SOURCE_ID])
+        inserted = self.db.session.execute(statement).rowcount
+        self.db.session.commit()
+        crosswalk.new_entries = []
+        return inserted
+
+    def bulk_insert_player(self, record: Union[list, dict]):
+        """
+        Set based equivalent of insert_player for whole ingest batches:
+         - player identity is resolved in memory by a PlayerResolver (or already set by the Driver)
+         - matched players whose content hash is unchanged since the last ingest are skipped
+         - changed players are updated with a single executemany UPDATE
+         - MatchStats and FantasyWeekStats rows are upserted, points and bonus settle after a game week is ingested
+        :param record: fantasy player records as returned by Driver.request_player_details
+        :return: Number of players matched and updated
+        :rtype: int
+        """
+        if isinstance(record, dict):
+            record = [record]
+
+        resolver = self.load_player_resolver()
+        match_ids = dict(self.db.session
+                         .query(Match.fantasy_match_id, Match.id)
+                         .filter(Match.fantasy_match_id.isnot(None)))
+
+        resolved = [(player.get(PLAYER.ID) or resolver.resolve(player), player) for player in record]
+        resolved = [(player_id, player) for player_id, player in resolved if player_id]
+        stored_hashes = dict(self.db.session.query(Player.id, Player.content_hash)
+                             .filter(Player.id.in_([player_id for player_id, _ in resolved])))
+
+        player_updates = {}
+        match_stat_rows = []
+        week_stat_rows = []
+        for player_id, player in resolved:
+            player_hash = player.get(PLAYER.CONTENT_HASH) or content_hash(player)
+            if stored_hashes.get(player_id) == player_hash:
+                continue
+
+            player_update = {column: player.get(field, None) for column, field in FANTASY_PLAYER_FIELDS.items()}
+            player_update['id'] = player_id
+            player_update['content_hash'] = player_hash
+            player_updates[player_id] = player_update
+
+            for match in player.get(PLAYER.SEASON_MATCH_HISTORY, []):
+                match_stat_rows.append(match_stats_row(player_id=player_id, match=match, match_ids=match_ids))
+                week_stat_rows.append(week_stats_row(player_id=player_id, match=match))
+
+        if player_updates:
+            self.db.session.bulk_update_mappings(Player, list(player_updates.values()))
+
+        if match_stat_rows:
+            statement = insert(MatchStats)
+            self.db.session.execute(statement.on_conflict_do_update(
+                index_elements=['player_id', 'season', 'fantasy_match_id'],
+                set_={column: statement.excluded[column] for column in match_stat_rows[0]
+                      if column not in ['player_id', 'season', 'fantasy_match_id']}),
+                match_stat_rows)
+
+        if week_stat_rows:
+            statement = insert(FantasyWeekStats)
+            self.db.session.execute(statement.on_conflict_do_update(
+                index_elements=['player_id', 'season', 'game_week'],
+                set_={column: statement.excluded[column] for column in list(HISTORICAL_WEEK_STATS_FIELDS)[3:]}),
+                week_stat_rows)
+
+        self.refresh_player_aggregates(player_ids=list(player_updates))
+        if player_updates:
+            self.bump_data_version()
+        self.db.session.commit()
+        logging.info(f'Players - {len(resolved)}/{len(record)} matched, {len(match_stat_rows)} match stats, '
+                     f'{len(week_stat_rows)} week stats upserted')
+        self.log_changes('Players', changed=len(player_updates), total=len(resolved))
+        logging.info(f'Players - resolver stats {resolver.stats()}')
+
+        return len(player_updates)
+
+    def copy_rows(self, table, frame):
+        """
+        Load a frame into a table with COPY FROM STDIN through a temporary staging table, rows clashing with a unique
+        constraint of the table are skipped (INSERT ... SELECT ... ON CONFLICT DO NOTHING)
+        Runs inside the session transaction, the caller commits
+        :param table: SQLAlchemy model whose table the rows are loaded into
+        :param frame: frame whose columns are named after table columns
+        :return: Number of rows inserted
+        :rtype: int
+        """
+        table_name = table.__table__.name
+        columns = ', '.join(frame.columns)
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        cursor = self.db.session.connection().connection.cursor()
+        try:
+            cursor.execute(f'CREATE TEMP TABLE {table_name}_stage AS '
+                           f'SELECT {columns} FROM {table_name} WITH NO DATA')
+            cursor.copy_expert(f'COPY {table_name}_stage ({columns}) FROM STDIN WITH (FORMAT csv)', buffer)
+            cursor.execute(f'INSERT INTO {table_name} ({columns}) SELECT {columns} FROM {table_name}_stage '
+                           f'ON CONFLICT DO NOTHING')
+            inserted = cursor.rowcount
+            cursor.execute(f'DROP TABLE {table_name}_stage')
+        finally:
+            cursor.close()
+
+        return inserted
+
+    def backfill_fantasy_history(self, gw_df, chunk_size=50000):
+        """
+        Load historical gameweek rows into MatchStats and FantasyWeekStats
+         - players are resolved once per (season, fantasy id) by a PlayerResolver, unresolved players are skipped
+         - rows are streamed in chunks through copy_rows, re-running the backfill only adds missing rows
+        :param gw_df: frame from load_historical_gameweeks(columns=BACKFILL_CSV_COLUMNS)
+        :param chunk_size: rows sent per COPY
+        :return: resolved / unresolved players, rows copied and inserted per table and rows per second
+        :rtype: dict
+        """
+        start = time.perf_counter()
+        resolver = self.load_player_resolver()
+
+        players = gw_df.drop_duplicates([SEASON.NAME, PLAYER.FANTASY_ID])
+        player_ids = {
+            (season, fantasy_id): resolver.resolve(player) for season, fantasy_id, player in zip(
+                players[SEASON.NAME], players[PLAYER.FANTASY_ID],
+                players[[PLAYER.NAME, PLAYER.FIRST_NAME, PLAYER.LAST_NAME]].to_dict('records'))
+        }
+        gw_df = gw_df.assign(**{
+            PLAYER.ID: [player_ids[key] for key in zip(gw_df[SEASON.NAME], gw_df[PLAYER.FANTASY_ID])],
+            MATCH_EVENT.CLEAN_SHEET: gw_df[PLAYER.CLEAN_SHEETS] > 0,
+        })
+        gw_df = gw_df[gw_df[PLAYER.ID].notna()].astype({PLAYER.ID: 'int64'})
+
+        match_stats = gw_df[list(HISTORICAL_MATCH_STATS_FIELDS.values())]\
+            .set_axis(list(HISTORICAL_MATCH_STATS_FIELDS), axis=1)\
+            .drop_duplicates(['player_id', 'season', 'fantasy_match_id'])
+
+        # Double gameweeks have one row per fixture, week stats hold the gameweek totals
+        week_stats = gw_df[list(HISTORICAL_WEEK_STATS_FIELDS.values())]\
+            .set_axis(list(HISTORICAL_WEEK_STATS_FIELDS), axis=1)\
+            .groupby(['player_id', 'season', 'game_week'], as_index=False)\
+            .agg({**{column: 'first' for column in list(HISTORICAL_WEEK_STATS_FIELDS)[3:]},
+                  'fantasy_week_points': 'sum', 'fantasy_week_bonus': 'sum'})
+
+        stats = {
+            'players': len(player_ids),
+            'unresolved_players': sum(player_id is None for player_id in player_ids.values()),
+            'match_stats': len(match_stats),
+            'week_stats': len(week_stats),
+            'match_stats_inserted': 0,
+            'week_stats_inserted': 0,
+        }
+        for table, frame, counter in [(MatchStats, match_stats, 'match_stats_inserted'),
+                                      (FantasyWeekStats, week_stats, 'week_stats_inserted')]:
+            for offset in range(0, len(frame), chunk_size):
+                stats[counter] += self.copy_rows(table=table, frame=frame.iloc[offset:offset + chunk_size])
+
+        stats['aggregates'] = self.refresh_player_aggregates(seasons=[int(season) for season in
+                                                                      gw_df[SEASON.NAME].unique()])
+        self.bump_data_version()
+        self.db.session.commit()
+        elapsed = time.perf_counter() - start
+        stats['seconds'] = round(elapsed, 2)
+        stats['rows_per_second'] = round((stats['match_stats'] + stats['week_stats']) / elapsed) if elapsed else 0
+        logging.info(f'Backfill - {stats}')
+        logging.info(f'Backfill - resolver stats {resolver.stats()}')
+        return stats
+
+    def refresh_player_aggregates(self, seasons=(CURRENT_SEASON,), player_ids=None):
+        """
+        Recompute the PlayerAggregate rows (season totals and every rolling window) of players whose stats changed
+        Rolling windows end at the last game week of the season, once it moves every player of the season is refreshed.
+        Match stats only count towards rolling windows once their fixture is in the DB, the game week comes from Match
+        Runs in the caller's transaction
+        :param seasons: season codes whose aggregates are refreshed e.g. [201920]
+        :param player_ids: DB ids of the players whose stats changed, every player when None
+        :return: Number of aggregate rows upserted
+        :rtype: int
+        """
+        upserted = 0
+        keys = [PLAYER_AGGREGATE.PLAYER_ID, PLAYER_AGGREGATE.SEASON, PLAYER_AGGREGATE.WEEKS,
+                PLAYER_AGGREGATE.LAST_GAME_WEEK]
+        for season in seasons:
+            last_game_week = self.db.session.query(func.max(FantasyWeekStats.game_week))\
+                .filter(FantasyWeekStats.season == season).scalar()
+            if last_game_week is None:
+                continue
+
+            refreshed = player_ids
+            if self.db.session.query(func.max(PlayerAggregate.last_game_week))\
+                    .filter(PlayerAggregate.season == season).scalar() != last_game_week:
+                refreshed = None
+            elif refreshed is not None and not refreshed:
+                continue
+
+            for weeks in [PLAYER_AGGREGATE.SEASON_WEEKS] + PLAYER_AGGREGATE.ROLLING_WEEKS:
+                aggregate_filters = [PlayerAggregate.season == season, PlayerAggregate.weeks == weeks]
+                week_filters = [FantasyWeekStats.season == season]
+                match_filters = [MatchStats.season == season, MatchStats.player_id.isnot(None)]
+                if weeks != PLAYER_AGGREGATE.SEASON_WEEKS:
+                    week_filters.append(FantasyWeekStats.game_week > last_game_week - weeks)
+                    match_filters.append(Match.fantasy_game_week > last_game_week - weeks)
+
+                if refreshed is not None:
+                    aggregate_filters.append(PlayerAggregate.player_id.in_(refreshed))
+                    week_filters.append(FantasyWeekStats.player_id.in_(refreshed))
+                    match_filters.append(MatchStats.player_id.in_(refreshed))
+
+                self.db.session.query(PlayerAggregate).filter(*aggregate_filters).delete(synchronize_session=False)
+                window = [literal(season), literal(weeks), literal(last_game_week)]
+                week_rows = self.db.session\
+                    .query(FantasyWeekStats.player_id, *window, *PLAYER_AGGREGATE_WEEK_COLUMNS.values())\
+                    .filter(*week_filters)\
+                    .group_by(FantasyWeekStats.player_id)
+                upserted += self.db.session.execute(insert(PlayerAggregate).from_select(
+                    keys + list(PLAYER_AGGREGATE_WEEK_COLUMNS), week_rows.statement)).rowcount
+
+                match_rows = self.db.session\
+                    .query(MatchStats.player_id, *window, *PLAYER_AGGREGATE_MATCH_COLUMNS.values())\
+                    .outerjoin(Match, Match.id == MatchStats.match_id)\
+                    .filter(*match_filters)\
+                    .group_by(MatchStats.player_id)
+                statement = insert(PlayerAggregate).from_select(keys + list(PLAYER_AGGREGATE_MATCH_COLUMNS),
+                                                                match_rows.statement)
+                upserted += self.db.session.execute(statement.on_conflict_do_update(
+                    index_elements=keys[:3],
+                    set_={column: statement.excluded[column] for column in PLAYER_AGGREGATE_MATCH_COLUMNS})).rowcount
+
+        return upserted
+
+    def get_player_aggregates(self, limit: int = 10, filters=None, sort=None, cursor=None, fields=None) -> tuple:
+        """
+        Players ranked on their precomputed PlayerAggregate totals, current season totals unless filtered otherwise
+        :param limit: page size
+        :param filters: PlayerAggregateFilters, aggregate fields take $lt: / $gt: / $lte: / $gte: comparisons and
+        name / team / position partial names, e.g. weeks=5 for the totals of the last 5 game weeks
+        :param sort: field to rank on, - prefixed for descending order, -fantasy_points by default
+        :param cursor: cursor returned with the previous page
+        :param fields: aggregate fields to return, every field when None
+        :return: aggregate records with the player name, web name, team and position, and the next page cursor
+        :rtype: tuple
+        :raises InvalidSort: when the sort is not an aggregate field
+        :raises InvalidFields: when a requested field is not an aggregate field
+        """
+        sort = sort or f'-{PLAYER_AGGREGATE.FANTASY_POINTS}'
+        sort_column = MODEL_COLUMNS[PlayerAggregate].get(sort.lstrip('-'))
+        if sort_column is None:
+            raise InvalidSort(f'Unknown sort field {sort}')
+
+        active_filters = {field: values for field, values in (filters or PlayerAggregateFilters())._asdict().items()
+                          if values}
+        active_filters.setdefault(PLAYER_AGGREGATE.SEASON, [CURRENT_SEASON])
+        active_filters.setdefault(PLAYER_AGGREGATE.WEEKS, [PLAYER_AGGREGATE.SEASON_WEEKS])
+        aggregate_filters = []
+        for field, values in active_filters.items():
+            for filter_val in values:
+                if field in [PLAYER.NAME, PLAYER.TEAM, PLAYER.POSITION]:
+                    aggregate_filters.append(Player.__table__.c[field].ilike(f"%{filter_val}%"))
+                else:
+                    aggregate_filters.append(filter_parse(query_str=filter_val, table=PlayerAggregate.__table__,
+                                                          column=field))
+
+        names, columns = projection(PlayerAggregate, fields)
+        player_columns = [Player.__table__.c[field] for field in PLAYER_AGGREGATE_PLAYER_FIELDS]
+        query = self.db.session.query(*columns, *player_columns)\
+            .select_from(PlayerAggregate)\
+            .join(Player, Player.id == PlayerAggregate.player_id)\
+            .filter(*aggregate_filters)
+
+        # Labelled, the descending key would otherwise shadow the projected column of the same name
+        sort_key = (-sort_column if sort.startswith('-') else sort_column).label('sort_key')
+        keyset = (sort_key, PlayerAggregate.player_id)
+        rows, next_cursor = keyset_paginate(query, keyset=keyset, limit=limit, cursor=cursor)
+        return to_records(names + PLAYER_AGGREGATE_PLAYER_FIELDS, rows, as_list=True), next_cursor
+
+    def get_leaderboard(self, stat, season=CURRENT_SEASON, weeks=PLAYER_AGGREGATE.SEASON_WEEKS, filters=None,
+                        limit=20):
+        """
+        Top players on a stat total over a season or its last game weeks, ranked in SQL with window functions
+        Windows kept in PlayerAggregate are read from it, any other number of weeks or a MatchStats column without
+        an aggregate (e.g. own_goals) is summed from the raw stats
+        :param stat: PlayerAggregate total or numeric MatchStats column to rank on e.g. fantasy_threat, own_goals
+        :param season: season code e.g. 201920
+        :param weeks: number of most recent game weeks of the season, SEASON_WEEKS for the whole season
+        :param filters: LeaderboardFilters, position / team are partial names, fantasy_price takes $lt: / $gt: etc.
+        :param limit: number of players returned (K)
+        :return: leaderboard records with the rank (equal totals share a rank), player details and stat total
+        :rtype: list
+        :raises InvalidSort: when stat is neither a PlayerAggregate total nor a numeric MatchStats column
+        """
+        aggregate_columns = {**PLAYER_AGGREGATE_WEEK_COLUMNS, **PLAYER_AGGREGATE_MATCH_COLUMNS}
+        match_columns = {**PLAYER_AGGREGATE_MATCH_COLUMNS, **LEADERBOARD_MATCH_COLUMNS}
+        if stat not in aggregate_columns and stat not in match_columns:
+            raise InvalidSort(f'Unknown leaderboard stat {stat}')
+
+        if stat in aggregate_columns and weeks in [PLAYER_AGGREGATE.SEASON_WEEKS] + PLAYER_AGGREGATE.ROLLING_WEEKS:
+            totals = self.db.session\
+                .query(PlayerAggregate.player_id.label('player_id'), PlayerAggregate.__table__.c[stat].label('total'))\
+                .filter(PlayerAggregate.season == season, PlayerAggregate.weeks == weeks)
+        else:
+            last_game_week = self.db.session.query(func.max(FantasyWeekStats.game_week))\
+                .filter(FantasyWeekStats.season == season).scalar() or 0
+            # SEASON_WEEKS sums every game week of the season
+            first_game_week = last_game_week - weeks if weeks != PLAYER_AGGREGATE.SEASON_WEEKS else 0
+            if stat in PLAYER_AGGREGATE_WEEK_COLUMNS:
+                totals = self.db.session\
+                    .query(FantasyWeekStats.player_id.label('player_id'), aggregate_columns[stat].label('total'))\
+                    .filter(FantasyWeekStats.season == season, FantasyWeekStats.game_week > first_game_week)\
+                    .group_by(FantasyWeekStats.player_id)
+            else:
+                totals = self.db.session\
+                    .query(MatchStats.player_id.label('player_id'), match_columns[stat].label('total'))\
+                    .join(Match, Match.id == MatchStats.match_id)\
+                    .filter(MatchStats.season == season, Match.fantasy_game_week > first_game_week)\
+                    .group_by(MatchStats.player_id)
+
+        totals = totals.subquery()
+        player_filters = []
+        for field, values in (filters or LeaderboardFilters())._asdict().items():
+            for filter_val in values or []:
+                if field in [PLAYER.POSITION, PLAYER.TEAM]:
+                    player_filters.append(Player.__table__.c[field].ilike(f"%{filter_val}%"))
+                else:
+                    player_filters.append(filter_parse(query_str=filter_val, table=Player.__table__, column=field))
+
+        player_columns = [Player.__table__.c[field] for field in LEADERBOARD_PLAYER_FIELDS]
+        ranked = self.db.session\
+            .query(func.rank().over(order_by=totals.c.total.desc()).label(LEADERBOARD_RANK),
+                   func.row_number().over(order_by=(totals.c.total.desc(), totals.c.player_id)).label('row_number'),
+                   totals.c.player_id, *player_columns, totals.c.total)\
+            .join(Player, Player.id == totals.c.player_id)\
+            .filter(*player_filters)\
+            .subquery()
+
+        rows = self.db.session.query(*[column for name, column in ranked.c.items() if name != 'row_number'])\
+            .filter(ranked.c.row_number <= limit)\
+            .order_by(ranked.c.row_number)
+        return to_records([LEADERBOARD_RANK, PLAYER_AGGREGATE.PLAYER_ID] + LEADERBOARD_PLAYER_FIELDS + [stat], rows,
+                          as_list=True)
+
     def get_standings(self, limit=20, multi=False, filters=None):
         """
         Query DB for standings records
@@ -455,7 +1239,8 @@ class DBInterface(object):
                 .order_by(Standings.match_day.desc()).limit(60).all()
         else:
             # no standings will have more than 100 entries
-            stan_query = stan_query.filter(*db_filters).order_by(Standings.match_day.desc()).limit(60).all()
+            stan_query = stan_query.filter(comp_filter, *db_filters)\
+                .order_by(Standings.match_day.desc()).limit(60).all()
         standings_map = {}
 
         # Reformatting dict to get standings in list per comp as "standing_entries" field
@@ -472,6 +1257,7 @@ class DBInterface(object):
     def update_standings(self, match_day, record):
         """
         Update standings for the given match_day
+        Standings of a match day already stored only have the entries whose content hash changed updated
         :param match_day: match_day for standings
         :param
         :return: DB record updated
@@ -483,6 +1269,11 @@ class DBInterface(object):
             .filter(Standings.match_day == match_day)\
             .filter(Standings.competition_id == comp.id)
 
+        entries = [(stan[STANDINGS.TYPE], entry) for stan in record['standings']
+                   for entry in stan.get(STANDINGS.TABLE, [])]
+        for _, entry in entries:
+            entry[STANDINGS.CONTENT_HASH] = entry.get(STANDINGS.CONTENT_HASH) or content_hash(entry)
+
         if not stan_query.count():
             for stan in record['standings']:
                 table = stan.pop(STANDINGS.TABLE, [])
@@ -495,22 +1286,207 @@ class DBInterface(object):
                 comp.standings.append(db_standing)
 
             self.db.session.add(comp)
+            self.refresh_latest_standings(competition_id=comp.id)
+            self.bump_data_version()
             self.db.session.commit()
+            self.log_changes('Standings entries', changed=len(entries), total=len(entries))
 
             return True
 
-        return False
+        # Entries are paired with the stored ones on standings type and team
+        stored = {(standings_type, fd_team_id): (entry_id, entry_hash)
+                  for standings_type, fd_team_id, entry_id, entry_hash in self.db.session
+                  .query(Standings.type, StandingsEntry.fd_team_id, StandingsEntry.id, StandingsEntry.content_hash)
+                  .join(StandingsEntry, StandingsEntry.standings_id == Standings.id)
+                  .filter(Standings.match_day == match_day, Standings.competition_id == comp.id)}
+        updates = []
+        for standings_type, entry in entries:
+            entry_id, entry_hash = stored.get((standings_type, entry[STANDINGS.FOOTBALL_DATA_TEAM_ID]), (None, None))
+            if entry_id and entry_hash != entry[STANDINGS.CONTENT_HASH]:
+                updates.append({**entry, STANDINGS.ID: entry_id})
+
+        if updates:
+            self.db.session.bulk_update_mappings(StandingsEntry, updates)
+            self.bump_data_version()
+
+        # The summary is refreshed either way so databases predating it get built on the next run
+        self.refresh_latest_standings(competition_id=comp.id)
+        self.db.session.commit()
+        self.log_changes('Standings entries', changed=len(updates), total=len(entries))
+        return bool(updates)
 
-    def get_match(self, limit: int = 10, multi: bool = False, filters=None) -> dict:
+    def refresh_latest_standings(self, competition_id):
+        """
+        Rebuild the LatestStandings rows of a competition from its most recent standings of each type
+        Runs in the caller's transaction
+        :param competition_id: Competition.id whose summary is refreshed
+        :return: number of standings types refreshed
+        :rtype: int
+        """
+        fd_competition_id = self.db.session.query(Competition.fd_api_id)\
+            .filter(Competition.id == competition_id).scalar()
+        names, columns = projection(Standings)
+        latest = self.db.session.query(*columns)\
+            .filter(Standings.competition_id == competition_id, Standings.type.isnot(None))\
+            .order_by(Standings.type, Standings.match_day.desc().nullslast(), Standings.id.desc())\
+            .distinct(Standings.type).all()
+        if not latest:
+            return 0
+
+        latest = to_records(names, latest, as_list=True)
+        tables = {standing[STANDINGS.ID]: [] for standing in latest}
+        entry_names, entry_columns = projection(StandingsEntry)
+        for entry in to_records(entry_names, self.db.session.query(*entry_columns)
+                                .filter(StandingsEntry.standings_id.in_(list(tables)))
+                                .order_by(StandingsEntry.standings_id, StandingsEntry.position), as_list=True):
+            tables[entry[STANDINGS.STANDINGS_ID]].append(entry)
+
+        statement = insert(LatestStandings).values([{
+            'competition_id': competition_id,
+            'type': standing[STANDINGS.TYPE],
+            'fd_competition_id': fd_competition_id,
+            'standings_id': standing[STANDINGS.ID],
+            'match_day': standing[STANDINGS.MATCH_DAY],
+            'standings': {**standing, STANDINGS.TABLE: tables[standing[STANDINGS.ID]]},
+        } for standing in latest])
+        self.db.session.execute(statement.on_conflict_do_update(
+            index_elements=['competition_id', 'type'],
+            set_={column: statement.excluded[column] for column in
+                  ['fd_competition_id', 'standings_id', 'match_day', 'standings']}))
+
+        return len(latest)
+
+    def get_latest_standings(self, fd_competition_id, limit=20):
+        """
+        Latest standings of each type of a competition, read from the LatestStandings summary
+        Same records as get_standings without filters, with a single indexed lookup
+        :param fd_competition_id: football-data id of the competition e.g. 2021
+        :param limit: table entries returned per standings type
+        :return: standings records with their table, a single record when there's only one type
+        """
+        latest = [{**standing, STANDINGS.TABLE: standing[STANDINGS.TABLE][:limit]} for standing, in self.db.session
+                  .query(LatestStandings.standings)
+                  .filter(LatestStandings.fd_competition_id == fd_competition_id)
+                  .order_by(LatestStandings.standings_id)]
+
+        return latest[0] if len(latest) == 1 else latest[:limit]
+
+    def load_standings_engine(self, fd_competition_id=2021, season_start_date=None):
+        """
+        StandingsEngine of a competition season, kept up to date with the finished matches in the DB
+        The engine is built once, later calls only read and add the matches it hasn't seen yet
+        :param fd_competition_id: football-data id of the competition e.g. 2021
+        :param season_start_date: start date of the season, the latest season with matches by default
+        :return: engine holding every finished match of the season
+        :rtype: StandingsEngine
+        """
+        fls_competition_id = self.db.session.query(Competition.fls_api_id)\
+            .filter(Competition.fd_api_id == fd_competition_id).scalar()
+        if season_start_date is None:
+            season_start_date = self.db.session.query(func.max(Match.season_start_date))\
+                .filter(Match.fls_competition_id == fls_competition_id).scalar()
+
+        with self.standings_lock:
+            standings_engine = self.standings_engines.setdefault((fd_competition_id, season_start_date),
+                                                                 StandingsEngine())
+            names, columns = projection(Match, [MATCH.ID, MATCH.MATCHDAY, MATCH.HOME_TEAM, MATCH.AWAY_TEAM,
+                                                MATCH.HOME_TEAM_FLS_ID, MATCH.AWAY_TEAM_FLS_ID,
+                                                MATCH.FULL_TIME_HOME_SCORE, MATCH.FULL_TIME_AWAY_SCORE])
+            matches = self.db.session.query(*columns)\
+                .filter(Match.fls_competition_id == fls_competition_id,
+                        Match.season_start_date == season_start_date,
+                        # Scores of matches in play are stored as they go, the engine never takes a match back
+                        Match.status == fdf.STATUS_FINISHED,
+                        Match.ft_home_score.isnot(None), Match.ft_away_score.isnot(None))
+            if standings_engine.match_ids:
+                matches = matches.filter(Match.id.notin_(standings_engine.match_ids))
+
+            new_matches = to_records(names, matches.order_by(Match.match_day, Match.id), as_list=True)
+            crosswalk = self.load_crosswalk() if new_matches else None
+            for match in new_matches:
+                standings_engine.add_match(
+                    match,
+                    home_fd_id=crosswalk.canonical_id(CROSSWALK.TEAM, CROSSWALK.FLS, match[MATCH.HOME_TEAM_FLS_ID]),
+                    away_fd_id=crosswalk.canonical_id(CROSSWALK.TEAM, CROSSWALK.FLS, match[MATCH.AWAY_TEAM_FLS_ID]))
+
+            return standings_engine
+
+    def validate_standings(self, fd_competition_id=2021, season_start_date=None):
+        """
+        Check the tables derived from match results against the latest stored football-data standings
+        :param fd_competition_id: football-data id of the competition e.g. 2021
+        :param season_start_date: start date of the season the snapshots belong to, the latest one by default
+        :return: standings type -> teams whose derived row differs from the snapshot (see StandingsEngine.validate)
+        :rtype: dict
+        """
+        standings_engine = self.load_standings_engine(fd_competition_id=fd_competition_id,
+                                                      season_start_date=season_start_date)
+        mismatches = {}
+        for standings_type, match_day, standings in self.db.session\
+                .query(LatestStandings.type, LatestStandings.match_day, LatestStandings.standings)\
+                .filter(LatestStandings.fd_competition_id == fd_competition_id):
+            mismatches[standings_type] = standings_engine.validate(standings[STANDINGS.TABLE], match_day=match_day,
+                                                                   standings_type=standings_type)
+
+        return mismatches
+
+    def update_standings_engines(self):
+        """
+        Add the finished matches stored since they were loaded to every loaded StandingsEngine
+        :return: number of matches added
+        :rtype: int
+        """
+        with self.standings_lock:
+            keys = list(self.standings_engines)
+
+        added = 0
+        for fd_competition_id, season_start_date in keys:
+            standings_engine = self.standings_engines[(fd_competition_id, season_start_date)]
+            before = len(standings_engine)
+            self.load_standings_engine(fd_competition_id=fd_competition_id, season_start_date=season_start_date)
+            added += len(standings_engine) - before
+
+        return added
+
+    def get_derived_standings(self, fd_competition_id=2021, match_day=None, standings_type=None, limit=20):
+        """
+        Tables derived from the stored match results, at any match day of the latest season
+        :param fd_competition_id: football-data id of the competition e.g. 2021
+        :param match_day: table after this match day, the latest one by default
+        :param standings_type: TOTAL | HOME | AWAY, all three by default
+        :param limit: number of table entries per standings type
+        :return: standings of each type with their table, same format as get_latest_standings
+        :rtype: Union[dict, list]
+        :raises ValueError: when standings_type is not one of TOTAL, HOME or AWAY
+        """
+        if standings_type is not None and standings_type not in STANDINGS_TYPES:
+            raise ValueError(f'Invalid standings type {standings_type}')
+
+        standings_engine = self.load_standings_engine(fd_competition_id=fd_competition_id)
+        if not len(standings_engine):
+            return []
+
+        derived = [{
+            STANDINGS.TYPE: derived_type,
+            STANDINGS.MATCH_DAY: match_day or standings_engine.last_match_day,
+            STANDINGS.TABLE: standings_engine.table(match_day=match_day, standings_type=derived_type)[:limit]
+        } for derived_type in ([standings_type] if standings_type else STANDINGS_TYPES)]
+
+        return derived[0] if len(derived) == 1 else derived
+
+    def get_match(self, limit: int = 10, multi: bool = False, filters=None, cursor=None, fields=None) -> tuple:
         """
         Query DB for match record
         :param multi: Perform OR query on filters, SQL OR otherwise SQL AND
         :param filters: namedtuple with all available filter fields
         :param limit: Result set size
-        :return: matched (if any) match records
+        :param cursor: cursor of the page to retrieve, first page by default
+        :param fields: match fields to return, all of them by default
+        :return: matched (if any) match records, ordered by kick off, and the cursor of the next page
         """
         db_filters = []
-        match_query = self.db.session.query(Match)
+        names, columns = projection(Match, fields)
+        match_query = self.db.session.query(*columns)
         active_filters = [(f, v) for f, v in filters._asdict().items() if v]
 
         for filter_ in active_filters:
@@ -531,19 +1507,26 @@ class DBInterface(object):
         else:
             query_result = match_query.filter(*db_filters)
 
-        return clean_output(query_result, limit=limit)
+        matches, next_cursor = keyset_paginate(query_result, keyset=KEYSETS[Match], limit=limit, cursor=cursor)
+        return to_records(names, matches), next_cursor
 
     def insert_match(self, record: Union[list, dict]):
         """
-        Insert record into DB
-        :return:
+        Insert record into DB, matches already stored are updated when their content hash changed e.g. once played
+        :return: Number of matches inserted or updated
+        :rtype: int
         """
         if isinstance(record, dict):
             record = [record]
 
+        stored_hashes = dict(self.db.session.query(Match.match_fd_id, Match.content_hash)
+                             .filter(Match.match_fd_id.in_([match[MATCH.FOOTBALL_DATA_ID] for match in record])))
+        changed = 0
         for match in record:
-            match_query = self.db.session.query(Match).filter(Match.match_fd_id == match[MATCH.FOOTBALL_DATA_ID])
-            if not match_query.count():
+            match[MATCH.CONTENT_HASH] = match.get(MATCH.CONTENT_HASH) or content_hash(match)
+            fd_id = match[MATCH.FOOTBALL_DATA_ID]
+            if stored_hashes.get(fd_id) != match[MATCH.CONTENT_HASH]:
+                changed += 1
                 match.pop(MATCH.GOALS_SCORED, None)
                 match.pop(MATCH.EVENTS, None)
                 match.pop(MATCH.ASSISTS, None)
@@ -557,20 +1540,32 @@ class DBInterface(object):
                 match.pop(MATCH.RED_CARDS, None)
                 match.pop(MATCH.SAVES, None)
                 match.pop(MATCH.PREVIOUS_ENCOUNTERS, None)
-                self.db.session.add(Match(**match))
+                if fd_id in stored_hashes:
+                    self.db.session.query(Match).filter(Match.match_fd_id == fd_id).update(match)
+                else:
+                    self.db.session.add(Match(**match))
 
+        self.log_changes('Matches', changed=changed, total=len(record))
+        if changed:
+            self.bump_data_version()
         self.db.session.commit()
+        if changed:
+            self.update_standings_engines()  # Derived tables follow new results match by match
+        return changed
 
-    def get_stats(self, limit: int = 10, multi: bool = False, filters=None) -> dict:
+    def get_stats(self, limit: int = 10, multi: bool = False, filters=None, cursor=None, fields=None) -> tuple:
         """
         Query DB for stats record
         :param filters: namedtuple with all available filter fields
         :param multi: Whether to perform OR querying on filters
         :param limit: Result set size
-        :return: matched (if any) match stats records
+        :param cursor: cursor of the page to retrieve, first page by default
+        :param fields: match stats fields to return, all of them by default
+        :return: matched (if any) match stats records and the cursor of the next page
         """
         db_filters = []
-        stat_query = self.db.session.query(MatchStats)
+        names, columns = projection(MatchStats, fields)
+        stat_query = self.db.session.query(*columns)
         active_filters = [(f, v) for f, v in filters._asdict().items() if v]
 
         for filter_ in active_filters:
@@ -583,7 +1578,8 @@ class DBInterface(object):
         else:
             query_result = stat_query.filter(*db_filters)
 
-        return clean_output(query_result, limit=limit)
+        stats, next_cursor = keyset_paginate(query_result, keyset=KEYSETS[MatchStats], limit=limit, cursor=cursor)
+        return to_records(names, stats), next_cursor
 
     def insert_basic_player(self, fd_id, record: Union[list, dict]):
         """
@@ -592,10 +1588,13 @@ class DBInterface(object):
         :param record: Record to insert
         :return:
         """
-        player_query = self.db.session.query(Player).filter(Player.fd_id == fd_id)
-        if not player_query.count():  # If player exists
+        resolver = self.player_resolver or self.load_player_resolver()
+        if resolver.resolve_fd(fd_id) is None:  # If player does not exist yet
             record.pop(TEAM.SQUAD_ROLE)
-            self.db.session.add(Player(**record))
+            db_player = Player(**record)
+            self.db.session.add(db_player)
+            self.db.session.flush()
+            resolver.add({PLAYER.ID: db_player.id, PLAYER.NAME: db_player.name, PLAYER.FOOTBALL_DATA_API_ID: fd_id})
 
         self.db.session.commit()
 
@@ -0,0 +1,111 @@
+import logging
+
+from sqlalchemy import text, exc
+
+from db_engine.db_driver import db
+from ingest_engine.cons import CURRENT_SEASON
+
+logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
+
+"""
+apply_migrations first creates any missing table, db.create_all() never alters existing ones though.
+Any constraint or index added to an existing model in db_driver also needs an idempotent statement here so that
+databases created before the change pick it up.
+"""
+MIGRATIONS = [
+    # Stats are keyed by season as well, fantasy fixture ids and game weeks restart every season.
+    # Rows written before the column existed all come from the live (current season) API, they are only looked for
+    # until the column is made NOT NULL so later runs don't scan the tables
+    'ALTER TABLE match_stats ADD COLUMN IF NOT EXISTS season INTEGER',
+    f'UPDATE match_stats SET season = {CURRENT_SEASON} WHERE season IS NULL '
+    "AND EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'match_stats' "
+    "AND column_name = 'season' AND is_nullable = 'YES')",
+    'ALTER TABLE match_stats ALTER COLUMN season SET NOT NULL',
+    'ALTER TABLE fantasy_week_stats ADD COLUMN IF NOT EXISTS season INTEGER',
+    f'UPDATE fantasy_week_stats SET season = {CURRENT_SEASON} WHERE season IS NULL '
+    "AND EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = 'fantasy_week_stats' "
+    "AND column_name = 'season' AND is_nullable = 'YES')",
+    'ALTER TABLE fantasy_week_stats ALTER COLUMN season SET NOT NULL',
+    'ALTER TABLE match_stats DROP CONSTRAINT IF EXISTS match_stats_player_fixture_uq',
+    'DROP INDEX IF EXISTS match_stats_player_fixture_uq',
+    'ALTER TABLE fantasy_week_stats DROP CONSTRAINT IF EXISTS fantasy_week_stats_player_week_uq',
+    'DROP INDEX IF EXISTS fantasy_week_stats_player_week_uq',
+    # Conflict targets for the bulk (INSERT ... ON CONFLICT) player ingest and the historical backfill.
+    # Rows ingested more than once before the indexes existed would fail them, the first (min id) copy is kept
+    'DELETE FROM match_stats duplicate USING match_stats kept '
+    'WHERE duplicate.player_id = kept.player_id AND duplicate.season = kept.season '
+    'AND duplicate.fantasy_match_id = kept.fantasy_match_id AND duplicate.id > kept.id '
+    "AND to_regclass('match_stats_player_season_fixture_uq') IS NULL",
+    'DELETE FROM fantasy_week_stats duplicate USING fantasy_week_stats kept '
+    'WHERE duplicate.player_id = kept.player_id AND duplicate.season = kept.season '
+    'AND duplicate.game_week = kept.game_week AND duplicate.id > kept.id '
+    "AND to_regclass('fantasy_week_stats_player_season_week_uq') IS NULL",
+    'CREATE UNIQUE INDEX IF NOT EXISTS match_stats_player_season_fixture_uq '
+    'ON match_stats (player_id, season, fantasy_match_id)',
+    'CREATE UNIQUE INDEX IF NOT EXISTS fantasy_week_stats_player_season_week_uq '
+    'ON fantasy_week_stats (player_id, season, game_week)',
+    # Filter / ORDER BY columns of the DBInterface.get_* queries. Stats lookups by player (and game week or fixture)
+    # are already served by the leading player_id of the unique indexes above
+    'CREATE INDEX IF NOT EXISTS standings_competition_match_day_idx ON standings (competition_id, match_day)',
+    'CREATE INDEX IF NOT EXISTS standings_entry_standings_id_idx ON standings_entry (standings_id)',
+    'CREATE INDEX IF NOT EXISTS match_fantasy_game_week_idx ON match (fantasy_game_week)',
+    'CREATE INDEX IF NOT EXISTS match_stats_match_id_idx ON match_stats (match_id)',
+    # Last game week of a season, the end of the rolling PlayerAggregate windows
+    'CREATE INDEX IF NOT EXISTS fantasy_week_stats_season_game_week_idx ON fantasy_week_stats (season, game_week)',
+    # Hash of the ingested record each row was last written from, unchanged records are skipped on the next ingest
+    'ALTER TABLE player ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)',
+    'ALTER TABLE team ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)',
+    'ALTER TABLE match ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)',
+    'ALTER TABLE standings_entry ADD COLUMN IF NOT EXISTS content_hash VARCHAR(32)',
+    # Fantasy team mappings were keyed on the bootstrap id, renumbered every season, they are reconciled again on code
+    "DELETE FROM crosswalk WHERE entity_type = 'team' AND source = 'fantasy'",
+]
+
+# Trigram indexes serving the ilike '%...%' name filters, only applied where the pg_trgm extension can be created
+TRIGRAM_MIGRATIONS = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS player_name_trgm_idx ON player USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS team_name_trgm_idx ON team USING gin (name gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS match_home_team_trgm_idx ON match USING gin (home_team gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS match_away_team_trgm_idx ON match USING gin (away_team gin_trgm_ops)',
+    'CREATE INDEX IF NOT EXISTS standings_entry_team_name_trgm_idx '
+    'ON standings_entry USING gin (team_name gin_trgm_ops)',
+]
+
+
+def has_extension(conn, name):
+    """
+    :param conn: open connection
+    :param name: extension name e.g. pg_trgm
+    :return: whether the extension is installed in the database
+    :rtype: bool
+    """
+    return bool(conn.execute(text('SELECT 1 FROM pg_extension WHERE extname = :name'), {'name': name}).scalar())
+
+
+def apply_migrations(engine):
+    """
+    Create missing tables then run every migration statement against the database, all statements are safe to re-run
+    The trigram statements run in their own transaction, a server without pg_trgm or a role without the privilege to
+    create it only goes without the trigram indexes
+    :param engine: SQLAlchemy engine connected to the Postgres DB
+    :return: Number of statements executed
+    """
+    db.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for statement in MIGRATIONS:
+            conn.execute(text(statement))
+
+    applied = len(MIGRATIONS)
+    try:
+        with engine.begin() as conn:
+            for statement in TRIGRAM_MIGRATIONS:
+                conn.execute(text(statement))
+        applied += len(TRIGRAM_MIGRATIONS)
+
+    except exc.DBAPIError as e:
+        logging.warning(f'Migrations - pg_trgm could not be set up, ilike filters will scan without trigram indexes: '
+                        f'{str(e.orig).strip()}')
+
+    logging.info(f'Migrations - {applied} statements applied')
+    return applied
@@ -5,6 +5,8 @@ from flask_limiter.util import get_remote_address
 import os
 from db_engine.db_interface import DBInterface
 from api_engine.api_service import api_service
+from api_engine.response_cache import ResponseCache
+from api_engine.search_index import VersionedSearchIndex
 from api_engine.docs_service import docs_service
 from api_engine.ui_service import ui_service, www_ui_service
 
@@ -17,6 +19,9 @@ application.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(application)
 db_interface = DBInterface(db=db)
 application.config['db_interface'] = db_interface
+application.config['response_cache'] = ResponseCache.from_env(version_source=db_interface.get_data_version)
+application.config['search_index'] = VersionedSearchIndex(loader=db_interface.search_documents,
+                                                          version_source=db_interface.get_data_version)
 
 limiter = Limiter(
     application,
@@ -1,22 +1,175 @@
 import requests as re
 import orjson
+import os
+from concurrent.futures import ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from time import sleep, time
+
+from ingest_engine.http_cache import shared_http_cache
 SECOND = 1
 
+# Number of threads used when fanning out provider calls, 1 disables threading altogether
+DEFAULT_WORKERS = int(os.getenv('INGEST_WORKERS', 8))
+
+# Seconds a cached provider document stays valid, long enough to cover one ingest run
+DEFAULT_CACHE_TTL = int(os.getenv('INGEST_CACHE_TTL', 15 * 60))
+
+
+def fan_out(func, kwargs_list, workers=DEFAULT_WORKERS):
+    """
+    Call func once per kwargs entry using a bounded thread pool
+    Per provider limits are enforced by ApiIntegration.get, so the pool size only bounds the number of threads
+    :param func: callable performing the request e.g. Fantasy().request_player_data
+    :param kwargs_list: list of keyword arguments, one entry per call
+    :param workers: maximum threads in use
+    :return: results in the same order as kwargs_list
+    :rtype: list
+    """
+    if workers <= 1 or len(kwargs_list) <= 1:
+        return [func(**kwargs) for kwargs in kwargs_list]
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(kwargs_list))) as executor:
+        return list(executor.map(lambda kwargs: func(**kwargs), kwargs_list))
+
+
+class ResponseCache(object):
+    """
+    Run scoped cache of provider documents keyed by endpoint
+    Concurrent misses on the same key wait for the first loader instead of each downloading the document
+    Cached values are shared between callers and must not be mutated
+    """
+    def __init__(self, ttl=DEFAULT_CACHE_TTL):
+        self.ttl = ttl
+        self.entries = {}  # key -> (expiry timestamp, value)
+        self.key_locks = {}
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for key, calling loader to fill it when missing or expired
+        Empty results e.g. from a failed request are returned but not cached
+        :param key: cache key, usually the endpoint
+        :param loader: callable without arguments returning the value
+        :return: cached or freshly loaded value
+        """
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, Lock())
+
+        with key_lock:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry and entry[0] > time():
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+
+            value = loader()
+            if value:
+                with self.lock:
+                    self.entries[key] = (time() + self.ttl, value)
+
+            return value
+
+    def invalidate(self, key=None):
+        """
+        Drop a single entry or, if no key is given, the whole cache
+        :param key: cache key to drop
+        """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def stats(self):
+        """
+        :return: hit / miss counters and number of live entries
+        :rtype: dict
+        """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
 
 class ApiIntegration(object):
+    # Maximum in-flight requests to this provider across all threads
+    max_concurrency = 8
+    # Client side rate limiter shared with other processes calling this provider e.g. a TokenBucket, None for none
+    rate_limiter = None
 
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, http_cache=None):
+        """
+        :param api_key: provider api key sent as X-Auth-Token
+        :param http_cache: HttpCache to serve GETs through, defaults to the one configured by INGEST_HTTP_CACHE
+        """
         self.session = re.session()
+        adapter = re.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         if api_key:
             self.session.headers.update({'X-Auth-Token': api_key})
 
+        self.concurrency = BoundedSemaphore(self.max_concurrency)
+        self.back_off_lock = Lock()
+        self.blocked_until = 0
+        self.response_cache = ResponseCache()
+        self.http_cache = http_cache or shared_http_cache()
+
+    def back_off(self, seconds):
+        """
+        Hold every thread's next request to this provider for the given time e.g. after hitting a rate limit
+        :param seconds: time to wait before the next request
+        """
+        with self.back_off_lock:
+            self.blocked_until = max(self.blocked_until, time() + seconds)
+        if self.rate_limiter:
+            self.rate_limiter.penalize(seconds)
+
+    def get(self, url):
+        """
+        GET through the shared session, respecting the provider concurrency limit, rate limit and any active back off
+        When an http_cache is set, stored responses are replayed or revalidated instead
+        :param url: full url to request
+        :return: requests Response
+        """
+        wait_time = self.blocked_until - time()
+        if wait_time > 0:
+            sleep(wait_time)
+
+        throttle = self.rate_limiter.acquire if self.rate_limiter else None
+        with self.concurrency:
+            if self.http_cache:
+                return self.http_cache.get(session=self.session, url=url, throttle=throttle)
+            if throttle:
+                throttle()
+            return self.session.get(url)
+
+    def cached_get(self, built_uri):
+        """
+        perform_get through the response cache, for documents that do not change within an ingest run
+        :param built_uri: API Url to use in GET request
+        :return: Parsed results or {} if failed
+        """
+        return self.response_cache.get_or_load(built_uri, lambda: self.perform_get(built_uri=built_uri))
+
+    def perform_get_many(self, built_uris, workers=DEFAULT_WORKERS):
+        """
+        perform_get for several endpoints at once, in flight requests are still bounded by max_concurrency
+        :param built_uris: API Urls to use in GET requests
+        :param workers: maximum threads in use
+        :return: Parsed results in the same order as built_uris
+        :rtype: list
+        """
+        return fan_out(self.perform_get, [{'built_uri': built_uri} for built_uri in built_uris], workers=workers)
+
     def perform_get(self, built_uri):
         """
         Performs GET request dealing with any issues arising specific to this API
         :param built_uri: API Url to use in GET request
         :return: Parsed results or {} if failed
         """
-        request = self.session.get(built_uri)
+        request = self.get(built_uri)
         try:
             result = orjson.loads(request.text)
 
@@ -26,4 +179,3 @@ class ApiIntegration(object):
         except orjson.JSONDecodeError:
             result = {}
         return result
-
@@ -0,0 +1,221 @@
+import asyncio
+import os
+from contextvars import ContextVar
+from threading import Lock
+from time import time
+from weakref import WeakKeyDictionary
+
+import aiohttp
+import requests as re
+
+from ingest_engine.api_integration import DEFAULT_WORKERS
+from ingest_engine.fantasy_api import Fantasy
+from ingest_engine.fastest_live_scores_api import FastestLiveScores
+from ingest_engine.football_data import FootballData
+from ingest_engine.http_cache import build_response
+
+# Seconds before a provider call is given up on, and an idle pooled connection is closed
+DEFAULT_TIMEOUT = int(os.getenv('INGEST_TIMEOUT', 30))
+DEFAULT_KEEPALIVE = int(os.getenv('INGEST_KEEPALIVE', 30))
+
+# Downloads of the same url within one call, e.g. on repeated 429s, before the call goes on without it
+FETCH_ATTEMPTS = 3
+
+# (url -> downloaded Response, urls read by the current run) of the request_* call replayed in the current task
+replay_state = ContextVar('replay_state', default=None)
+
+
+class FetchRequired(Exception):
+    """
+    Raised out of a replayed request_* call when it asks for documents that haven't been downloaded yet
+    """
+    def __init__(self, *urls):
+        super().__init__(*urls)
+        self.urls = urls
+
+
+class AsyncApiIntegration(object):
+    """
+    Mixin running the request_* methods of an ApiIntegration provider on an asyncio event loop
+    A call is replayed until it completes: each GET it makes that hasn't been downloaded yet stops it, the document
+    is fetched through a pooled aiohttp client, then the call runs again with it. Parsing stays in the sync
+    request_* methods, which are unchanged and still go through requests when called directly
+    Rate limits, back offs and per host connection limits are awaited instead of slept on
+    """
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, keepalive_timeout=DEFAULT_KEEPALIVE, **kwargs):
+        """
+        :param timeout: seconds before a request is given up on
+        :param keepalive_timeout: seconds an idle connection is kept open for the next request
+        """
+        super().__init__(*args, **kwargs)
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.clients = WeakKeyDictionary()  # event loop -> aiohttp ClientSession
+        self.clients_lock = Lock()
+
+    def __getattr__(self, name):
+        # request_team_async(...) -> call(request_team, ...)
+        if name.startswith('request_') and name.endswith('_async'):
+            method = getattr(self, name[:-len('_async')])
+            return lambda *args, **kwargs: self.call(method, *args, **kwargs)
+        raise AttributeError(name)
+
+    def request_url(self, built_uri):
+        """
+        :param built_uri: uri passed to perform_get
+        :return: url perform_get requests for it
+        :rtype: str
+        """
+        return built_uri
+
+    def client(self):
+        """
+        :return: pooled client of the running event loop, opened on first use
+        :rtype: aiohttp.ClientSession
+        """
+        loop = asyncio.get_running_loop()
+        with self.clients_lock:
+            client = self.clients.get(loop)
+            if client is None or client.closed:
+                defaults = re.utils.default_headers()
+                headers = {header: value for header, value in self.session.headers.items() if header not in defaults}
+                connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrency,
+                                                 keepalive_timeout=self.keepalive_timeout)
+                client = aiohttp.ClientSession(connector=connector,
+                                               timeout=aiohttp.ClientTimeout(total=self.timeout), headers=headers)
+                self.clients[loop] = client
+
+            return client
+
+    async def close(self):
+        """
+        Close the client of the running event loop
+        """
+        with self.clients_lock:
+            client = self.clients.pop(asyncio.get_running_loop(), None)
+        if client:
+            await client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def get(self, url):
+        state = replay_state.get()
+        if state is None:
+            return super().get(url)
+
+        responses, read = state
+        # A second GET of the same url within a run is a retry e.g. after a 429, and needs a fresh download
+        if url not in responses or url in read:
+            raise FetchRequired(url)
+        read.add(url)
+        return responses[url]
+
+    def perform_get(self, built_uri):
+        # Stop before the provider's own handling, so per call limits e.g. @limits only count completed calls
+        state = replay_state.get()
+        if state is not None and self.request_url(built_uri) not in state[0]:
+            raise FetchRequired(self.request_url(built_uri))
+        return super().perform_get(built_uri)
+
+    def perform_get_many(self, built_uris, workers=DEFAULT_WORKERS):
+        """
+        perform_get for several endpoints at once, downloaded together on the event loop
+        :param built_uris: API Urls to use in GET requests
+        :param workers: unused, kept for compatibility with ApiIntegration.perform_get_many
+        :return: Parsed results in the same order as built_uris
+        :rtype: list
+        """
+        state = replay_state.get()
+        if state is None:
+            return async_fan_out(self.perform_get_many, [{'built_uris': built_uris}])[0]
+
+        missing = [url for url in dict.fromkeys(map(self.request_url, built_uris)) if url not in state[0]]
+        if missing:
+            raise FetchRequired(*missing)
+        return [self.perform_get(built_uri=built_uri) for built_uri in built_uris]
+
+    async def get_async(self, url):
+        """
+        GET through the pooled client, awaiting any active back off and the provider rate limit
+        When an http_cache is set, stored responses are replayed or revalidated instead, as in ApiIntegration.get
+        :param url: full url to request
+        :return: requests Response, a 504 with an empty document when the provider couldn't be reached
+        """
+        entry, headers = None, {}
+        if self.http_cache:
+            cached, headers, entry = self.http_cache.before_request(url)
+            if cached is not None:
+                return cached
+
+        wait_time = self.blocked_until - time()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        if self.rate_limiter:
+            await asyncio.sleep(self.rate_limiter.reserve())
+
+        try:
+            async with self.client().get(url, headers=headers) as response:
+                response = build_response(url, response.status, await response.read(), dict(response.headers))
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return build_response(url, 504, b'{}')
+
+        return self.http_cache.after_request(url, entry, response) if self.http_cache else response
+
+    async def call(self, method, *args, **kwargs):
+        """
+        Run a request_* method of this provider, downloading its documents without blocking the event loop
+        :param method: bound request_* method e.g. fantasy.request_player_data
+        :return: result of the method
+        """
+        responses, read = {}, set()
+        fetches = {}
+        token = replay_state.set((responses, read))
+        try:
+            while True:
+                try:
+                    return method(*args, **kwargs)
+                except FetchRequired as fetch:
+                    read.clear()
+                    for url in fetch.urls:
+                        fetches[url] = fetches.get(url, 0) + 1
+                        if fetches[url] > FETCH_ATTEMPTS:
+                            responses[url] = build_response(url, 504, b'{}')
+
+                    urls = [url for url in fetch.urls if fetches[url] <= FETCH_ATTEMPTS]
+                    responses.update(zip(urls, await asyncio.gather(*[self.get_async(url) for url in urls])))
+        finally:
+            replay_state.reset(token)
+
+
+def async_fan_out(func, kwargs_list):
+    """
+    Drop in for fan_out on an AsyncApiIntegration provider: every call overlaps on one event loop
+    :param func: bound request_* method of the provider e.g. AsyncFantasy().request_player_data
+    :param kwargs_list: list of keyword arguments, one entry per call
+    :return: results in the same order as kwargs_list
+    :rtype: list
+    """
+    api = func.__self__
+
+    async def run():
+        async with api:
+            return await asyncio.gather(*[api.call(func, **kwargs) for kwargs in kwargs_list])
+
+    return asyncio.run(run())
+
+
+class AsyncFootballData(AsyncApiIntegration, FootballData):
+    def request_url(self, built_uri):
+        return self.uri + built_uri
+
+
+class AsyncFastestLiveScores(AsyncApiIntegration, FastestLiveScores):
+    pass
+
+
+class AsyncFantasy(AsyncApiIntegration, Fantasy):
+    pass
@@ -0,0 +1,32 @@
+import os
+import sys
+import logging
+
+from sqlalchemy import create_engine
+
+from db_engine.db_interface import DBInterface
+from db_engine.migrations import apply_migrations
+from ingest_engine.fantasy_api import load_historical_gameweeks, historical_seasons, BACKFILL_CSV_COLUMNS
+
+logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
+
+
+def backfill_historical(db_interface, seasons=None):
+    """
+    Load the historical fantasy gameweeks into MatchStats and FantasyWeekStats
+    :param db_interface: DBInterface connected to the Postgres DB
+    :param seasons: season directories to load e.g. ['2016-17'], all of them by default
+    :return: backfill counters, see DBInterface.backfill_fantasy_history
+    :rtype: dict
+    """
+    seasons = seasons or historical_seasons()
+    gw_df = load_historical_gameweeks(seasons=seasons, columns=BACKFILL_CSV_COLUMNS)
+    logging.info(f'Backfill - {len(gw_df)} gameweek rows loaded from {", ".join(seasons)}')
+    return db_interface.backfill_fantasy_history(gw_df=gw_df)
+
+
+if __name__ == "__main__":
+    # python -m ingest_engine.backfill_historical [2016-17 2017-18 ...]
+    db = create_engine(os.getenv('POSTGRES_CREDS'))
+    apply_migrations(engine=db)
+    backfill_historical(db_interface=DBInterface(db=db), seasons=sys.argv[1:])
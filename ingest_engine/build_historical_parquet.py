@@ -0,0 +1,9 @@
+import logging
+
+from ingest_engine.fantasy_api import build_historical_parquet
+
+logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
+
+
+if __name__ == "__main__":
+    build_historical_parquet()
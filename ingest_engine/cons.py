@@ -50,6 +50,7 @@ class FLSApiFilters:
 
 class Match:
     ID = 'id'
+    CONTENT_HASH = 'content_hash'
     FOOTBALL_DATA_ID = 'match_fd_id'
     SEASON_FOOTBALL_DATA_ID = 'season_football_data_id'
     SEASON_START_DATE = 'season_start_date'
@@ -144,6 +145,7 @@ class MatchEvent:
 
 class Team:
     ID = 'id'
+    CONTENT_HASH = 'content_hash'
     FOOTBALL_DATA_ID = 'team_fd_id'
     COUNTRY = 'country'
     NAME = 'name'
@@ -177,6 +179,7 @@ class Team:
 
 class Standings:
     ID = 'id'
+    CONTENT_HASH = 'content_hash'
     COMPETITION_ID = 'competition_id'
     STANDINGS_ID = 'standings_id'
     COMPETITION_NAME = 'competition_name'
@@ -202,6 +205,7 @@ class Standings:
 
 class Player:
     ID = 'id'
+    CONTENT_HASH = 'content_hash'
     NAME = 'name'
     FIRST_NAME = 'first_name'
     LAST_NAME = 'last_name'
@@ -320,6 +324,73 @@ class Competition:
 
 
 
+class Crosswalk:
+    ID = 'id'
+    ENTITY_TYPE = 'entity_type'
+    SOURCE = 'source'
+    SOURCE_ID = 'source_id'
+    CANONICAL_ID = 'canonical_id'  # football-data id of the entity, every source is joined against football-data
+    NAME = 'name'
+    SCORE = 'score'
+
+    # Entity types
+    TEAM = 'team'
+    COMPETITION = 'competition'
+
+    # Sources
+    FOOTBALL_DATA = 'fd'
+    FLS = 'fls'
+    FANTASY = 'fantasy_code'  # Fantasy teams are keyed on their code, the bootstrap id is renumbered every season
+
+
+class IngestState:
+    SOURCE = 'source'
+    LAST_KICKOFF = 'last_kickoff'  # Kickoff of the latest finished fixture the source has been ingested up to
+    LAST_NEWS = 'last_news'  # Latest fantasy_news_timestamp ingested
+    LAST_MATCH_DAY = 'last_match_day'  # Match day of the latest standings stored
+    UPDATED_AT = 'updated_at'
+
+    # Sources
+    MATCHES = 'matches'
+    PLAYERS = 'players'
+    STANDINGS = 'standings'
+
+
+class PlayerAggregate:
+    PLAYER_ID = 'player_id'
+    SEASON = 'season'
+    WEEKS = 'weeks'  # Number of most recent game weeks summed, SEASON_WEEKS for the whole season
+    LAST_GAME_WEEK = 'last_game_week'
+    GAME_WEEKS = 'game_weeks'
+    APPEARANCES = 'appearances'
+    FANTASY_POINTS = 'fantasy_points'
+    BONUS = 'bonus'
+    MINUTES_PLAYED = 'minutes_played'
+    GOALS_SCORED = 'goals_scored'
+    ASSISTS = 'assists'
+    CLEAN_SHEETS = 'clean_sheets'
+    GOALS_CONCEDED = 'goals_conceded'
+    YELLOW_CARDS = 'yellow_cards'
+    RED_CARDS = 'red_cards'
+    SAVES = 'saves'
+    FANTASY_INFLUENCE = 'fantasy_influence'
+    FANTASY_CREATIVITY = 'fantasy_creativity'
+    FANTASY_THREAT = 'fantasy_threat'
+    FANTASY_ICT_INDEX = 'fantasy_ict_index'
+
+    SEASON_WEEKS = 0
+    ROLLING_WEEKS = [3, 5]
+
+
+class Search:
+    TYPE = 'type'
+    SCORE = 'score'
+    PLAYER = 'player'
+    TEAM = 'team'
+    COMPETITION = 'competition'
+    TYPES = [PLAYER, TEAM, COMPETITION]
+
+
 class Season:
     CURRENT_MATCH_DAY = 'current_match_day'
     START_DATE = 'start_date'
@@ -412,6 +483,12 @@ class API_FANTASY_PLAYER:
     CURRENT_WEEK = 'current-event'
 
 
+# Season.NAME code of the season the live fantasy API serves, historical seasons come from historical_fantasy/
+CURRENT_SEASON = 201920
+
+# Fantasy game weeks of a Premier League season, 20 teams playing each other home and away
+GAME_WEEKS_PER_SEASON = 38
+
 # ----- Mappers ------
 FLS_STATES_MAPPER = {
     0: "fixture",
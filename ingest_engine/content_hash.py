@@ -0,0 +1,33 @@
+import hashlib
+
+import orjson
+
+from ingest_engine.cons import Player
+
+# Left out of the hash: the hash itself and the DB id records may or may not have been tagged with by a resolver
+IGNORED_FIELDS = {Player.CONTENT_HASH, Player.ID}
+
+
+def content_hash(record):
+    """
+    Stable hash of a normalized record, independent of key order
+    :param record: record as returned by the Driver e.g. a player, team, match or standings entry
+    :return: 32 hex characters, equal for records with equal content
+    :rtype: str
+    """
+    content = {field: value for field, value in record.items() if field not in IGNORED_FIELDS}
+    serialized = orjson.dumps(content, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return hashlib.blake2b(serialized, digest_size=16).hexdigest()
+
+
+def tag_content_hash(records):
+    """
+    Set the content hash of every record, in place
+    :param records: Driver records
+    :return: the same records
+    :rtype: list
+    """
+    for record in records:
+        record[Player.CONTENT_HASH] = content_hash(record)
+
+    return records
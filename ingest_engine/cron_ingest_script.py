@@ -1,10 +1,13 @@
 import os
+import sys
 
 from sqlalchemy import create_engine
 
 from db_engine.db_interface import DBInterface
-from db_engine.db_driver import Match
+from db_engine.migrations import apply_migrations
+from ingest_engine.cons import IngestState, Player
 from ingest_engine.ingest_driver import Driver
+from ingest_engine.ingest_plan import IngestPlan
 import logging
 
 logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
@@ -12,12 +15,36 @@ logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
 
 class WeeklyIngest(object):
 
-    def __init__(self, db):
+    def __init__(self, db, dry_run=False):
+        """
+        :param db: SQLAlchemy engine
+        :param dry_run: only log the planned fetch set and its estimated call count, nothing is requested or written
+        """
         self.db_interface = DBInterface(db=db)
         self.api_ingest = Driver()
         self.logger = logging.getLogger(__name__)
+        self.dry_run = dry_run
+        self.plan = None
+
+    def plan_ingest(self):
+        """
+        Work out what changed since the stored watermarks, from the fantasy fixtures and bootstrap documents
+        :return: IngestPlan
+        """
+        self.plan = IngestPlan(fixtures=self.api_ingest.fantasy.request_matches(),
+                               players=self.api_ingest.fantasy.request_base_information()['players'],
+                               watermarks=self.db_interface.get_watermarks())
+        for line in self.plan.describe():
+            self.logger.info(f'Plan - {line}')
+
+        return self.plan
 
     def ingest_standings(self):
+        plan = self.plan or self.plan_ingest()
+        if not plan.standings:
+            self.logger.info('Standings - no fixture finished since the last update, skipped')
+            return
+
         standings = self.api_ingest.request_standings(competition_id=2021)
         latest_game_week = standings['standings'][0]['match_day']
         update = self.db_interface.update_standings(match_day=latest_game_week, record=standings)
@@ -27,34 +54,63 @@ class WeeklyIngest(object):
         else:
             self.logger.info('Standings - nothing to update')
 
+        self.db_interface.set_watermark(IngestState.STANDINGS, last_kickoff=plan.last_kickoff,
+                                        last_match_day=latest_game_week)
+
     def ingest_matches(self):
         season = '2019-2020'
         comp_fd_id = 2021
         comp_fls_id = 2
-        latest_game_week = self.db_interface.get_last_game_week(table=Match)
-        if latest_game_week < 38:
-            latest_game_week += 1
-
-        matches = self.api_ingest.request_match(fls_comp_id=comp_fls_id,
-                                                fd_comp_id=comp_fd_id,
-                                                game_week=latest_game_week,
-                                                season=season,
-                                                limit=None
-                                                )
-        self.db_interface.insert_match(record=matches)
-        self.logger.info('Matches - Insert requested')
+        plan = self.plan or self.plan_ingest()
+        # Every game week with a newly finished fixture, the watermark only moves once all of them are stored
+        for game_week in plan.game_weeks:
+            matches = self.api_ingest.request_match(fls_comp_id=comp_fls_id,
+                                                    fd_comp_id=comp_fd_id,
+                                                    game_week=game_week,
+                                                    season=season,
+                                                    limit=None
+                                                    )
+            changed = self.db_interface.insert_match(record=matches)
+            self.logger.info(f'Matches - game week {game_week} insert requested, {changed}/{len(matches)} changed')
+
+        self.db_interface.set_watermark(IngestState.MATCHES, last_kickoff=plan.last_kickoff)
 
     def ingest_players(self):
-        for f_id in list(range(1, 21)):
-            players = self.api_ingest.request_player_details(f_team_id=f_id)
-            self.db_interface.insert_player(record=players)
+        plan = self.plan or self.plan_ingest()
+        if plan.players:
+            self.api_ingest.player_resolver = self.db_interface.load_player_resolver()
+            players = self.api_ingest.request_player_details_by_id(
+                f_player_ids=[player[Player.FANTASY_ID] for player in plan.players])
+            changed = self.db_interface.bulk_insert_player(record=players)
+            self.logger.info(f'Players - Insert requested, {changed}/{len(players)} changed, '
+                             f'resolver stats {self.api_ingest.player_resolver.stats()}')
+
+        self.db_interface.set_watermark(IngestState.PLAYERS, last_kickoff=plan.last_kickoff, last_news=plan.last_news)
+
+    def run(self):
+        """
+        Plan the run then, unless it is a dry run, ingest standings, matches and players changed since the watermarks
+        :return: IngestPlan carried out
+        """
+        plan = self.plan_ingest()
+        if self.dry_run:
+            return plan
+
+        self.ingest_standings()
+        self.ingest_matches()
+        self.ingest_players()
+        self.log_cache_stats()
+        return plan
 
-        self.logger.info('Players - Insert requested')
+    def log_cache_stats(self):
+        for provider, stats in self.api_ingest.cache_stats().items():
+            self.logger.info(f'Response cache - {provider}: {stats}')
+        for provider, stats in self.api_ingest.rate_limit_stats().items():
+            self.logger.info(f'Rate limit - {provider}: {stats}')
 
 
 if __name__ == "__main__":
+    # python -m ingest_engine.cron_ingest_script [--dry-run]
     db = create_engine(os.getenv('POSTGRES_CREDS'))
-    ingest = WeeklyIngest(db=db)
-    ingest.ingest_standings()
-    ingest.ingest_matches()
-    ingest.ingest_players()
+    apply_migrations(engine=db)
+    WeeklyIngest(db=db, dry_run='--dry-run' in sys.argv[1:]).run()
@@ -0,0 +1,97 @@
+from ingest_engine.cons import Crosswalk
+
+
+class CrosswalkResolver(object):
+    """
+    In memory crosswalk from each source's team / competition ids to a canonical (football-data) id
+    Known ids are plain dict lookups, only ids missing from the crosswalk go through the fuzzy name matcher and
+    every new match is kept in new_entries until it is persisted
+    """
+    def __init__(self, entries=()):
+        """
+        :param entries: crosswalk records, as loaded from the crosswalk table
+        """
+        self.to_canonical = {}  # (entity type, source, source id) -> canonical id
+        self.from_canonical = {}  # (entity type, source, canonical id) -> source id
+        self.new_entries = []
+        self.counters = {'mapped': 0, 'reconciled': 0, 'unmatched': 0}
+        for entry in entries:
+            self.add(entry, new=False)
+
+    def __len__(self):
+        return len(self.to_canonical)
+
+    def add(self, entry, new=True):
+        """
+        Register a mapping
+        :param entry: crosswalk record with entity type, source, source id and canonical id
+        :param new: whether the mapping still has to be persisted
+        """
+        entity_type, source = entry[Crosswalk.ENTITY_TYPE], entry[Crosswalk.SOURCE]
+        self.to_canonical[(entity_type, source, entry[Crosswalk.SOURCE_ID])] = entry[Crosswalk.CANONICAL_ID]
+        self.from_canonical[(entity_type, source, entry[Crosswalk.CANONICAL_ID])] = entry[Crosswalk.SOURCE_ID]
+        if new:
+            self.new_entries.append(entry)
+
+    def canonical_id(self, entity_type, source, source_id):
+        return self.to_canonical.get((entity_type, source, source_id))
+
+    def source_id(self, entity_type, source, canonical_id):
+        return self.from_canonical.get((entity_type, source, canonical_id))
+
+    def reconcile(self, entity_type, source, anchors, records, name, score, threshold=0.9):
+        """
+        Pair source records with anchor (football-data) records, each record pairs with at most one anchor
+        Records already in the crosswalk are paired by id, the rest are scored against the still unpaired anchors.
+        A mapped id is never re-paired, even when its canonical id isn't among the anchors, as persisted mappings are
+        kept by save_crosswalk
+        :param entity_type: Crosswalk.TEAM | Crosswalk.COMPETITION
+        :param source: source of the records e.g. Crosswalk.FLS
+        :param anchors: canonical id -> football-data record
+        :param records: source id -> source record
+        :param name: callable returning the name of a source record, stored alongside new mappings
+        :param score: callable(anchor, record) returning the similarity of the two
+        :param threshold: minimum score for a pair to be accepted
+        :return: canonical id -> paired source record
+        :rtype: dict
+        """
+        paired = {}
+        unmapped = {}
+        for source_id, record in records.items():
+            canonical_id = self.canonical_id(entity_type, source, source_id)
+            if canonical_id is None:
+                unmapped[source_id] = record
+            elif canonical_id in anchors:
+                paired[canonical_id] = record
+                self.counters['mapped'] += 1
+            else:
+                self.counters['unmatched'] += 1
+
+        for canonical_id, anchor in anchors.items():
+            if canonical_id in paired or not unmapped:
+                continue
+
+            best_score, best_id = max(((score(anchor, record), source_id) for source_id, record in unmapped.items()),
+                                      key=lambda scored: scored[0])
+            if best_score >= threshold:
+                record = unmapped.pop(best_id)
+                paired[canonical_id] = record
+                self.add({
+                    Crosswalk.ENTITY_TYPE: entity_type,
+                    Crosswalk.SOURCE: source,
+                    Crosswalk.SOURCE_ID: best_id,
+                    Crosswalk.CANONICAL_ID: canonical_id,
+                    Crosswalk.NAME: name(record),
+                    Crosswalk.SCORE: float(best_score)
+                })
+                self.counters['reconciled'] += 1
+
+        self.counters['unmatched'] += len(unmapped)
+        return paired
+
+    def stats(self):
+        """
+        :return: ids paired through the crosswalk, newly reconciled ids and ids left unmatched
+        :rtype: dict
+        """
+        return {**self.counters, 'entries': len(self), 'pending': len(self.new_entries)}
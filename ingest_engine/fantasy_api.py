@@ -1,10 +1,171 @@
+import os
+import logging
 from datetime import datetime
+from glob import glob
 
 from ingest_engine.cons import *
 from ingest_engine.cons import FANTASY_STATUS_MAPPER as st_mapper
 from ingest_engine.api_integration import ApiIntegration
+import numpy as np
+import orjson
 import pandas as pd
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # Historical reads fall back to the CSVs
+    pa = ds = pq = None
+
+
+
+# Gameweek CSV column -> field name, columns not listed here are not loaded
+GAMEWEEK_CSV_COLUMNS = {
+    'name': Player.NAME,
+    'assists': Player.ASSISTS,
+    'attempted_passes': Player.ATTEMPTED_PASSES,
+    'big_chances_created': Player.BIG_CHANCES_CREATED,
+    'big_chances_missed': Player.BIG_CHANCES_MISSED,
+    'bps': Player.FANTASY_TOTAL_BONUS,
+    'clean_sheets': Player.CLEAN_SHEETS,
+    'clearances_blocks_interceptions': Player.CLEARANCES_BLOCKS_INTERCEPTIONS,
+    'completed_passes': Player.COMPLETED_PASSES,
+    'creativity': Player.FANTASY_CREATIVITY,
+    'dribbles': Player.DRIBBLES,
+    'element': Player.FANTASY_ID,
+    'errors_leading_to_goal': Player.ERRORS_LEADING_TO_GOAL,
+    'errors_leading_to_goal_attempt': Player.ERRORS_LEADING_TO_GOAL_ATTEMPT,
+    'fouls': Player.FOULS,
+    'goals_conceded': Player.GOALS_CONCEDED,
+    'goals_scored': Player.NUMBER_OF_GOALS,
+    'ict_index': Player.FANTASY_ICT_INDEX,
+    'influence': Player.FANTASY_INFLUENCE,
+    'key_passes': Player.KEY_PASSES,
+    'minutes': Player.MINUTES_PLAYED,
+    'offside': Player.OFFSIDE,
+    'open_play_crosses': Player.OPEN_PLAY_CROSSES,
+    'opponent_team': Player.FANTASY_OPPONENT_TEAM_ID,
+    'own_goals': Player.OWN_GOALS,
+    'penalties_conceded': Player.PENALTIES_CONCEDED,
+    'penalties_missed': Player.PENALTIES_MISSED,
+    'penalties_saved': Player.PENALTIES_SAVED,
+    'recoveries': Player.RECOVERIES,
+    'red_cards': Player.RED_CARDS,
+    'round': Player.FANTASY_WEEK,
+    'saves': Player.SAVES,
+    'selected': Player.FANTASY_SELECTION_COUNT,
+    'tackled': Player.TACKLED,
+    'tackles': Player.TACKLES,
+    'target_missed': Player.TARGET_MISSED,
+    'threat': Player.FANTASY_THREAT,
+    'total_points': Player.FANTASY_OVERALL_POINTS,
+    'transfers_balance': Player.FANTASY_TRANSFERS_BALANCE,
+    'transfers_in': Player.FANTASY_WEEK_TRANSFERS_IN,
+    'transfers_out': Player.FANTASY_WEEK_TRANSFERS_OUT,
+    'value': Player.FANTASY_WEEK_VALUE,
+    'was_home': Player.PLAYED_AT_HOME,
+    'winning_goals': Player.WINNING_GOALS,
+    'yellow_cards': Player.YELLOW_CARDS,
+}
+
+# Extra columns the historical backfill needs to key MatchStats and FantasyWeekStats rows
+BACKFILL_CSV_COLUMNS = {
+    **GAMEWEEK_CSV_COLUMNS,
+    'fixture': Match.FANTASY_MATCH_ID,
+    'bonus': Player.FANTASY_WEEK_BONUS,
+}
+
+# Every loaded column is an integer count unless listed here
+# numpy dtype objects rather than strings, pandas resolves dtype strings again for every file read
+GAMEWEEK_CSV_DTYPES = {
+    **{column: np.int64 for column in BACKFILL_CSV_COLUMNS},
+    'name': object,
+    'creativity': np.float64,
+    'ict_index': np.float64,
+    'influence': np.float64,
+    'threat': np.float64,
+    'was_home': np.bool_,
+}
+
+HISTORICAL_FANTASY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                       'historical_fantasy')
+
+# Parquet copy of historical_fantasy, built with python -m ingest_engine.build_historical_parquet
+HISTORICAL_PARQUET_PATH = os.getenv('HISTORICAL_PARQUET_PATH', os.path.join(HISTORICAL_FANTASY_PATH, 'parquet'))
+PARQUET_MANIFEST = 'manifest.json'
+PARQUET_SCHEMA_VERSION = 2  # Bump whenever the cached columns change so older caches are treated as stale
+
+
+def read_gameweek_csv(csv_file, columns=GAMEWEEK_CSV_COLUMNS):
+    """
+    Read the columns of a historical gameweek CSV that are ingested, with their final names and dtypes
+    :param csv_file: CSV file with player information for a gameweek
+    :param columns: CSV column -> output column of the columns to read
+    :return: frame with one row per player
+    :rtype: pd.DataFrame
+    """
+    try:
+        gw_df = pd.read_csv(csv_file, encoding='utf-8', usecols=list(columns), dtype=GAMEWEEK_CSV_DTYPES)
+    except UnicodeDecodeError:  # 2018-19 gameweeks are latin-1 encoded
+        gw_df = pd.read_csv(csv_file, encoding='latin-1', usecols=list(columns), dtype=GAMEWEEK_CSV_DTYPES)
+
+    return gw_df[list(columns)].rename(columns=columns)
+
+
+def parse_gameweeks(gw_df, season):
+    """
+    Derive the name and gameweek id columns, using column wide string ops
+    :param gw_df: frame from read_gameweek_csv
+    :param season: season code e.g. 201617, or a Series with one code per row
+    :return: the same frame with name, first / last name and fantasy_week_id filled in
+    :rtype: pd.DataFrame
+    """
+    names = gw_df[Player.NAME].str.replace(r'_\d+$', '', regex=True)  # 2018-19 names end with _<element id>
+    name_parts = names.str.split('_', n=2, expand=True)
+    gw_df[Player.NAME] = names.str.replace('_', ' ', regex=False)
+    gw_df[Player.FIRST_NAME] = name_parts[0]
+    gw_df[Player.LAST_NAME] = name_parts[1]
+    gw_df[Player.FANTASY_WEEK_ID] = season * 100 + gw_df[Player.FANTASY_WEEK]
+    return gw_df
+
+
+def read_historical_gameweek_csv(csv_file, season):
+    """
+    Load a historical gameweek CSV into a typed frame, one row per player
+    :param csv_file: CSV file with player information for a gameweek
+    :param season: season description for historical ingest e.g. 201617 for 2016/2017
+    :return: frame with the same fields ingest_historical_gameweek_csv outputs
+    :rtype: pd.DataFrame
+    """
+    return parse_gameweeks(read_gameweek_csv(csv_file=csv_file), season=int(season))
+
+
+def load_historical_gameweeks(path=HISTORICAL_FANTASY_PATH, seasons=None, columns=GAMEWEEK_CSV_COLUMNS):
+    """
+    Load every historical gameweek CSV (<path>/<season>/gws/gw*.csv) into a single frame
+    Files are concatenated as read and parsed once as a whole
+    :param path: root of the historical fantasy data
+    :param seasons: season directories to load e.g. ['2016-17'], all of them by default
+    :param columns: CSV column -> output column of the columns to read, e.g. BACKFILL_CSV_COLUMNS
+    :return: frame with one row per player per gameweek and a season column e.g. 201617
+    :rtype: pd.DataFrame
+    """
+    if seasons is None:
+        seasons = sorted(season for season in os.listdir(path) if os.path.isdir(os.path.join(path, season, 'gws')))
 
+    frames = []
+    for season in seasons:
+        season_code = int(season.replace('-', ''))
+        for csv_file in sorted(glob(os.path.join(path, season, 'gws', 'gw*.csv'))):
+            gw_df = read_gameweek_csv(csv_file=csv_file, columns=columns)
+            gw_df[Season.NAME] = season_code
+            frames.append(gw_df)
+
+    if not frames:
+        return pd.DataFrame(columns=list(columns.values()) +
+                            [Season.NAME, Player.FIRST_NAME, Player.LAST_NAME, Player.FANTASY_WEEK_ID])
+
+    gw_df = pd.concat(frames, ignore_index=True)
+    return parse_gameweeks(gw_df, season=gw_df[Season.NAME])
 
 
 def ingest_historical_gameweek_csv(csv_file, season):
@@ -14,74 +175,43 @@ def ingest_historical_gameweek_csv(csv_file, season):
     :param season: season description for historical ingest e.g. 201617 for 2016/2017
     :return: parsed json file
     """
-    player_data = []
-    gw_df = pd.read_csv(csv_file, encoding='utf-8')
-    columns_to_drop = ['bonus', 'fixture', 'id', 'kickoff_time', 'ea_index',
-                       'kickoff_time_formatted', 'loaned_in', 'loaned_out',
-                       'team_a_score', 'team_h_score']
-
-    for column in columns_to_drop:
-        gw_df.drop(column, axis=1, inplace=True)
-
-    field_names = (
-        Player.NAME,
-        Player.ASSISTS,
-        Player.ATTEMPTED_PASSES,
-        Player.BIG_CHANCES_CREATED,
-        Player.BIG_CHANCES_MISSED,
-        Player.FANTASY_TOTAL_BONUS,
-        Player.CLEAN_SHEETS,
-        Player.CLEARANCES_BLOCKS_INTERCEPTIONS,
-        Player.COMPLETED_PASSES,
-        Player.FANTASY_CREATIVITY,
-        Player.DRIBBLES,
-        Player.FANTASY_ID,
-        Player.ERRORS_LEADING_TO_GOAL,
-        Player.ERRORS_LEADING_TO_GOAL_ATTEMPT,
-        Player.FOULS,
-        Player.GOALS_CONCEDED,
-        Player.NUMBER_OF_GOALS,
-        Player.FANTASY_ICT_INDEX,
-        Player.FANTASY_INFLUENCE,
-        Player.KEY_PASSES,
-        Player.MINUTES_PLAYED,
-        Player.OFFSIDE,
-        Player.OPEN_PLAY_CROSSES,
-        Player.FANTASY_OPPONENT_TEAM_ID,
-        Player.OWN_GOALS,
-        Player.PENALTIES_CONCEDED,
-        Player.PENALTIES_MISSED,
-        Player.PENALTIES_SAVED,
-        Player.RECOVERIES,
-        Player.RED_CARDS,
-        Player.FANTASY_WEEK,
-        Player.SAVES,
-        Player.FANTASY_SELECTION_COUNT,
-        Player.TACKLED,
-        Player.TACKLES,
-        Player.TARGET_MISSED,
-        Player.FANTASY_THREAT,
-        Player.FANTASY_OVERALL_POINTS,
-        Player.FANTASY_TRANSFERS_BALANCE,
-        Player.FANTASY_WEEK_TRANSFERS_IN,
-        Player.FANTASY_WEEK_TRANSFERS_OUT,
-        Player.FANTASY_WEEK_VALUE,
-        Player.PLAYED_AT_HOME,
-        Player.WINNING_GOALS,
-        Player.YELLOW_CARDS
-    )
-    gw_df.columns = field_names  # re-naming of columns
-    gw_df = gw_df.transpose().to_dict()
-
-    for player in gw_df.values():
-        name = player[Player.NAME].split("_")
-        player[Player.NAME] = " ".join(name)
-        player[Player.FIRST_NAME] = name[0]
-        player[Player.LAST_NAME] = name[1]
-        player[Player.FANTASY_WEEK_ID] = int(f'{season}{str(player[Player.FANTASY_WEEK]).zfill(2)}')
-        player_data.append(player)
-
-    return player_data
+    return read_historical_gameweek_csv(csv_file=csv_file, season=season).to_dict('records')
+
+
+# Season summary (cleaned_players.csv) column -> field name, bonus and now_cost aren't ingested
+BASE_CSV_COLUMNS = {
+    'first_name': Player.FIRST_NAME,
+    'second_name': Player.LAST_NAME,
+    'goals_scored': Player.NUMBER_OF_GOALS,
+    'assists': Player.ASSISTS,
+    'total_points': Player.FANTASY_OVERALL_POINTS,
+    'minutes': Player.MINUTES_PLAYED,
+    'goals_conceded': Player.GOALS_CONCEDED,
+    'creativity': Player.FANTASY_CREATIVITY,
+    'influence': Player.FANTASY_INFLUENCE,
+    'threat': Player.FANTASY_THREAT,
+    'bps': Player.FANTASY_TOTAL_BONUS,
+    'ict_index': Player.FANTASY_ICT_INDEX,
+    'clean_sheets': Player.CLEAN_SHEETS,
+    'red_cards': Player.RED_CARDS,
+    'yellow_cards': Player.YELLOW_CARDS,
+    'selected_by_percent': Player.FANTASY_SELECTION_PERCENTAGE,
+}
+
+
+def read_historical_base_csv(csv_file, season):
+    """
+    Load a season summary CSV into a frame, one row per player
+    :param csv_file: csv file with the base information
+    :param season: season indicator stored in the season column
+    :return: frame with the same fields ingest_historical_base_csv outputs
+    :rtype: pd.DataFrame
+    """
+    season_df = pd.read_csv(csv_file, encoding='utf-8', usecols=list(BASE_CSV_COLUMNS))
+    season_df = season_df[list(BASE_CSV_COLUMNS)].rename(columns=BASE_CSV_COLUMNS)
+    season_df[Season.NAME] = season
+    season_df[Player.NAME] = season_df[Player.FIRST_NAME] + ' ' + season_df[Player.LAST_NAME]
+    return season_df
 
 
 def ingest_historical_base_csv(csv_file, season):
@@ -91,50 +221,173 @@ def ingest_historical_base_csv(csv_file, season):
     :param season: season string indicator
     :return: parsed CSV into json
     """
-    player_data = []
-    season_df = pd.read_csv(csv_file, encoding='utf-8')
-    columns_to_drop = ['bonus']
-    if season == '201718':
-        columns_to_drop.append('now_cost')
-
-    for column in columns_to_drop:
-        season_df.drop(column, axis=1, inplace=True)
-
-    field_names = (
-        Player.FIRST_NAME,
-        Player.LAST_NAME,
-        Player.NUMBER_OF_GOALS,
-        Player.ASSISTS,
-        Player.FANTASY_OVERALL_POINTS,
-        Player.MINUTES_PLAYED,
-        Player.GOALS_CONCEDED,
-        Player.FANTASY_CREATIVITY,
-        Player.FANTASY_INFLUENCE,
-        Player.FANTASY_THREAT,
-        Player.FANTASY_TOTAL_BONUS,
-        Player.FANTASY_ICT_INDEX,
-        Player.CLEAN_SHEETS,
-        Player.RED_CARDS,
-        Player.YELLOW_CARDS,
-        Player.FANTASY_SELECTION_PERCENTAGE,
-    )
-
-    season_df.columns = field_names
-    season_df = season_df.transpose().to_dict()
-    for player in season_df.values():
-        player[Season.NAME] = season
-        player[Player.NAME] = f'{player[Player.FIRST_NAME]} {player[Player.LAST_NAME]}'
-        player_data.append(player)
-
-    return player_data
+    return read_historical_base_csv(csv_file=csv_file, season=season).to_dict('records')
+
+
+def historical_seasons(path=HISTORICAL_FANTASY_PATH):
+    """
+    :param path: root of the historical fantasy data
+    :return: season directories available e.g. ['2016-17', '2017-18']
+    :rtype: list
+    """
+    return sorted(season for season in os.listdir(path)
+                  if os.path.isfile(os.path.join(path, season, 'cleaned_players.csv')))
+
+
+def season_code(season):
+    """
+    :param season: season directory e.g. 2016-17
+    :return: season code used in the season column e.g. 201617
+    :rtype: int
+    """
+    return int(season.replace('-', ''))
+
+
+def source_files(path, season):
+    """
+    :return: every CSV of a season, relative to the historical fantasy root
+    :rtype: list
+    """
+    files = [os.path.join(season, 'cleaned_players.csv')]
+    files.extend(os.path.relpath(csv_file, path) for csv_file in glob(os.path.join(path, season, 'gws', 'gw*.csv')))
+    return sorted(files)
+
+
+def source_signature(path, season):
+    """
+    Size and modification time of every CSV of a season, a cached season is stale once this changes
+    :rtype: dict
+    """
+    signature = {}
+    for csv_file in source_files(path=path, season=season):
+        stat = os.stat(os.path.join(path, csv_file))
+        signature[csv_file] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def load_parquet_manifest(cache_path):
+    manifest_file = os.path.join(cache_path, PARQUET_MANIFEST)
+    if not os.path.isfile(manifest_file):
+        return {}
+
+    with open(manifest_file, 'rb') as manifest:
+        manifest = orjson.loads(manifest.read())
+
+    if manifest.get('schema_version') != PARQUET_SCHEMA_VERSION:
+        return {}
+    return manifest.get('seasons', {})
+
+
+def build_historical_parquet(path=HISTORICAL_FANTASY_PATH, cache_path=HISTORICAL_PARQUET_PATH, seasons=None):
+    """
+    Convert the historical CSVs into Parquet datasets partitioned by season (and gameweek)
+    <cache_path>/gameweeks/season_name=201617/fantasy_week=1/... and <cache_path>/seasons/season_name=201617/...
+    :param path: root of the historical fantasy data
+    :param cache_path: directory the Parquet datasets are written to
+    :param seasons: season directories to convert, all of them by default
+    :return: season codes converted
+    :rtype: list
+    """
+    if seasons is None:
+        seasons = historical_seasons(path=path)
+
+    manifest = load_parquet_manifest(cache_path=cache_path)
+    for season in seasons:
+        code = season_code(season)
+        gw_df = load_historical_gameweeks(path=path, seasons=[season])
+        pq.write_to_dataset(pa.Table.from_pandas(gw_df, preserve_index=False),
+                            root_path=os.path.join(cache_path, 'gameweeks'),
+                            partition_cols=[Season.NAME, Player.FANTASY_WEEK],
+                            existing_data_behavior='delete_matching')
+
+        season_df = read_historical_base_csv(csv_file=os.path.join(path, season, 'cleaned_players.csv'), season=code)
+        pq.write_to_dataset(pa.Table.from_pandas(season_df, preserve_index=False),
+                            root_path=os.path.join(cache_path, 'seasons'),
+                            partition_cols=[Season.NAME],
+                            existing_data_behavior='delete_matching')
+
+        manifest[str(code)] = source_signature(path=path, season=season)
+        logging.info(f'Historical fantasy - {season} written to Parquet ({len(gw_df)} gameweek rows)')
+
+    with open(os.path.join(cache_path, PARQUET_MANIFEST), 'wb') as manifest_file:
+        manifest_file.write(orjson.dumps({'schema_version': PARQUET_SCHEMA_VERSION, 'seasons': manifest}))
+
+    return [season_code(season) for season in seasons]
+
+
+def apply_filters(df, filters):
+    """
+    Apply pyarrow style filters e.g. [('minutes_played', '>', 0)] to a frame, for the CSV fallback
+    :param df: frame to filter
+    :param filters: list of (column, operator, value), all of which must hold
+    :return: filtered frame
+    :rtype: pd.DataFrame
+    """
+    operators = {
+        '=': lambda column, value: column == value,
+        '==': lambda column, value: column == value,
+        '!=': lambda column, value: column != value,
+        '<': lambda column, value: column < value,
+        '<=': lambda column, value: column <= value,
+        '>': lambda column, value: column > value,
+        '>=': lambda column, value: column >= value,
+        'in': lambda column, value: column.isin(value),
+        'not in': lambda column, value: ~column.isin(value),
+    }
+    for column, operator, value in filters or []:
+        df = df[operators[operator](df[column], value)]
+    return df.reset_index(drop=True)
+
+
+def read_historical(dataset, seasons=None, columns=None, filters=None, path=HISTORICAL_FANTASY_PATH,
+                    cache_path=HISTORICAL_PARQUET_PATH):
+    """
+    Read historical fantasy data, from the Parquet cache when it is fresh for every requested season
+    Column projection and filters are pushed down to Parquet so only matching partitions and columns are read,
+    the CSV fallback applies them after parsing
+    :param dataset: 'gameweeks' or 'seasons'
+    :param seasons: season directories to read e.g. ['2016-17'], all of them by default
+    :param columns: columns to return, all of them by default
+    :param filters: pyarrow style filters e.g. [('minutes_played', '>', 0)]
+    :param path: root of the historical fantasy data
+    :param cache_path: directory holding the Parquet datasets
+    :return: frame of the requested data
+    :rtype: pd.DataFrame
+    """
+    if seasons is None:
+        seasons = historical_seasons(path=path)
+
+    manifest = load_parquet_manifest(cache_path=cache_path) if pq else {}
+    fresh = all(manifest.get(str(season_code(season))) == source_signature(path=path, season=season)
+                for season in seasons)
+    filters = [(Season.NAME, 'in', [season_code(season) for season in seasons])] + list(filters or [])
+
+    if fresh:
+        partitioning = [(Season.NAME, pa.int64())]
+        if dataset == 'gameweeks':
+            partitioning.append((Player.FANTASY_WEEK, pa.int64()))
+        table = pq.read_table(os.path.join(cache_path, dataset), columns=columns, filters=filters,
+                              partitioning=ds.partitioning(pa.schema(partitioning), flavor='hive'))
+        return table.to_pandas()
+
+    logging.info(f'Historical fantasy - Parquet cache stale or missing for {seasons}, reading CSVs')
+    if dataset == 'gameweeks':
+        df = load_historical_gameweeks(path=path, seasons=seasons)
+    else:
+        df = pd.concat([read_historical_base_csv(csv_file=os.path.join(path, season, 'cleaned_players.csv'),
+                                                 season=season_code(season)) for season in seasons],
+                       ignore_index=True)
+
+    df = apply_filters(df, filters)
+    return df[columns] if columns else df
 
 
 class Fantasy(ApiIntegration):
     """
     Wrapper for API available at -> https://fantasy.premierleague.com/api/
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, http_cache=None):
+        super().__init__(http_cache=http_cache)
         self.uri = 'https://fantasy.premierleague.com/api/'
         self.team_mapper = None
 
@@ -168,7 +421,7 @@ class Fantasy(ApiIntegration):
             "West Ham": "West Ham United"
         }
         if not self.team_mapper:
-            teams = self.perform_get(built_uri=self.uri + 'bootstrap-static/').get('teams')
+            teams = self.cached_get(built_uri=self.uri + 'bootstrap-static/').get('teams')
             team_mapper = {}
             if teams:
                 for team in teams:
@@ -204,13 +457,24 @@ class Fantasy(ApiIntegration):
     def request_base_information(self):
         """
         Base information from /bootstrap-static/ endpoint
+        Downloaded and parsed once per cache ttl, the result is shared so callers must not mutate it
         :return: Player, team, field etc information
         :rtype: List
         """
         built_uri = 'bootstrap-static/'
-        total_result = {}
+        return self.response_cache.get_or_load(
+            f'{built_uri}parsed',
+            lambda: self.parse_base_information(result=self.cached_get(built_uri=self.uri + built_uri)))
 
-        result = self.perform_get(built_uri=self.uri+built_uri)
+    @staticmethod
+    def parse_base_information(result):
+        """
+        Parse the raw /bootstrap-static/ document
+        :param result: decoded response of the endpoint
+        :return: Player, team, field etc information
+        :rtype: dict
+        """
+        total_result = {}
         if result:
             current_game_week = None
             for game_week in result['events']:
@@ -388,7 +652,8 @@ class Fantasy(ApiIntegration):
                             Player.YELLOW_CARDS: match['yellow_cards'],
                             Player.RED_CARDS: match['red_cards'],
                             Player.SAVES: match['saves'],
-                            Player.FANTASY_WEEK_BONUS: match['bps'],
+                            Player.FANTASY_WEEK_BONUS: match['bonus'],
+                            Player.FANTASY_TOTAL_BONUS: match['bps'],
                             Player.FANTASY_INFLUENCE: match['influence'],
                             Player.FANTASY_CREATIVITY: match['creativity'],
                             Player.FANTASY_THREAT: match['threat'],
@@ -423,7 +688,8 @@ class Fantasy(ApiIntegration):
                 if "kickoff_time" in match and match["kickoff_time"]:  # Filter for actual matches
                     match_data = {
                         Match.START_TIME: match["kickoff_time"],
-                        Match.FINISHED: match['started'],
+                        # Provisionally finished at the final whistle, finished once the bonus points are confirmed
+                        Match.FINISHED: match['finished_provisional'] or match['finished'],
                         Match.FANTASY_GAME_WEEK: match["event"],
                         Match.HOME_TEAM_DIFFICULTY: match["team_h_difficulty"],
                         Match.AWAY_TEAM_DIFFICULTY: match["team_a_difficulty"],
@@ -2,7 +2,7 @@ from ratelimit import limits, sleep_and_retry
 import requests as re
 import os
 import json
-from ingest_engine.api_integration import ApiIntegration
+from ingest_engine.api_integration import ApiIntegration, DEFAULT_WORKERS
 from ingest_engine.cons import Competition, Player, Team, Match, MatchEvent, FLS_STATES_MAPPER as state_mapper
 
 HOUR = 3600
@@ -12,8 +12,9 @@ class FastestLiveScores(ApiIntegration):
     """
     Wrapper for API available at -> https://customer.fastestlivescores.com/
     """
-    def __init__(self, api_key=None):
-        super().__init__()
+    max_concurrency = 4
+    def __init__(self, api_key=None, http_cache=None):
+        super().__init__(http_cache=http_cache)
         self.api_key = api_key
         if not api_key:
             self.api_key = os.environ.get('FASTEST_LIVE_SCORES_API_KEY')
@@ -41,7 +42,7 @@ class FastestLiveScores(ApiIntegration):
         :return: Parsed results or {} if failed
         """
 
-        request = self.session.get(built_uri)
+        request = self.get(built_uri)
         try:
             result = json.loads(request.text)
             if request.status_code == 400 or request.status_code == 404:
@@ -148,6 +149,35 @@ class FastestLiveScores(ApiIntegration):
         result = self.perform_get(built_uri=endpoint)
         additional_data_endpoint = self.build_endpoint(endpoint_name=f"matches/{match_id}/additional-data")
         additional_data = self.perform_get(built_uri=additional_data_endpoint)
+        return self.parse_match_details(result=result, additional_data=additional_data)
+
+    def request_match_details_many(self, match_ids, workers=DEFAULT_WORKERS):
+        """
+        request_match_details for several matches at once, both documents of every match are requested concurrently
+        :param match_ids: FLS match ids for which to retrieve details
+        :param workers: maximum threads in use
+        :return: FLS match id -> parsed match events and details
+        :rtype: dict
+        """
+        match_ids = list(dict.fromkeys(match_ids))
+        endpoints = []
+        for match_id in match_ids:
+            endpoints.append(self.build_endpoint(endpoint_name=f"matches/{match_id}"))
+            endpoints.append(self.build_endpoint(endpoint_name=f"matches/{match_id}/additional-data"))
+
+        documents = self.perform_get_many(built_uris=endpoints, workers=workers)
+        return {match_id: self.parse_match_details(result=documents[2 * idx], additional_data=documents[2 * idx + 1])
+                for idx, match_id in enumerate(match_ids)}
+
+    @staticmethod
+    def parse_match_details(result, additional_data):
+        """
+        Parse the matches/{id} and matches/{id}/additional-data documents of a match
+        :param result: matches/{id} document
+        :param additional_data: matches/{id}/additional-data document
+        :return: Parsed match events and detailed for the match
+        :rtype: dict
+        """
         match_events = []
         dict_result = {}
 
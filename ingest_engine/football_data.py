@@ -3,66 +3,65 @@ import json
 import os
 from time import sleep
 from ingest_engine.api_integration import ApiIntegration
+from ingest_engine.rate_limiter import football_data_rate_limiter
 from ingest_engine.cons import Competition, Match, Team, Standings, Player
 from ingest_engine.cons import FootballDataApiFilters as fda
 
 MINUTE = 65  # Extra buffer of time
+MAX_ATTEMPTS = 3  # Calls made for one request when rate limited or hitting the faulty authentication
 
 
 class FootballData(ApiIntegration):
     """
     Wrapper for the football-data api available at https://www.football-data.org/documentation/api
     """
+    max_concurrency = 2  # Per minute quota is small, more parallelism only results in 429s
 
-    def __init__(self, api_key=None):
-        super().__init__(api_key=api_key)
+    def __init__(self, api_key=None, http_cache=None):
+        super().__init__(api_key=api_key, http_cache=http_cache)
         if not api_key:
             api_key = os.environ.get('FOOTBALL_DATA_API_KEY')
             self.session.headers.update({'X-Auth-Token': api_key})
         self.uri = 'http://api.football-data.org/v2/'
         self.api_key = api_key
+        self.rate_limiter = football_data_rate_limiter()
 
     def perform_get(self, built_uri):
         """
         Performs GET request and deals with any issues arising from call
-        Handles API rate limits
+        Calls are spaced out by the shared rate limiter, a 429 getting through anyway is retried after the
+        advertised wait, up to MAX_ATTEMPTS calls in total
         :param built_uri: endpoint to attach to the base API url
         :return: dict result of call, {} if failed
         """
+        for _ in range(MAX_ATTEMPTS):
+            result = self.get(url=self.uri + built_uri)
+            try:
+                result = json.loads(result.text)
+            except re.exceptions.ConnectionError:
+                return {}
 
-        result = self.session.get(url=self.uri + built_uri)
-        try:
-            result = json.loads(result.text)
             if 'errorCode' in result:
                 if result['errorCode'] == 429:
                     wait_time = [int(s) for s in result['message'].split() if s.isdigit()][0]
-                    sleep(wait_time + 10)  # Wait for rate limiting to end before performing request again
+                    # Wait for rate limiting to end before performing request again, holding other threads too
+                    self.back_off(wait_time + 10)
+                    continue
 
-                    # Resume as necessary
-                    result = self.perform_get(built_uri=built_uri)
+                # Buggy API endpoint results in faulty authentication, sleep and try again
+                if result['errorCode'] == 400 and 'message' in result and \
+                        self.session.headers['X-Auth-Token'] != 'test':
+                    sleep(5)
+                    continue
 
-                elif result['errorCode'] == 400:  # Buggy API endpoint results in faulty authentication
-                    if 'message' in result:
-                        if self.session.headers['X-Auth-Token'] != 'test':
-                            sleep(5)  # Sleep and try again
+                return {}
 
-                            result = self.perform_get(built_uri=built_uri)
+            if 'error' in result:
+                return {}
 
-                        result = {}
+            return result
 
-                elif result['errorCode'] == 403:
-                    result = {}
-
-            elif 'error' in result:
-                result = {}
-
-            else:
-                return result
-
-        except re.exceptions.ConnectionError:
-            result = {}
-
-        return result
+        return {}
 
     def request_competitions(self, competition_id=None):
         """
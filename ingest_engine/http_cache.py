@@ -0,0 +1,202 @@
+import os
+import sqlite3
+from functools import lru_cache
+from threading import Lock
+from time import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests as re
+
+# Query parameters carrying credentials, dropped from cache keys so keys can be shared across api keys
+SECRET_PARAMS = {'api_key'}
+
+
+def cache_key(url):
+    """
+    Normalise a url into a cache key, stripping credentials and sorting the query string
+    :param url: requested url
+    :return: cache key
+    :rtype: str
+    """
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def build_response(url, status_code, body, headers=None):
+    """
+    Build a requests Response from stored data so callers can't tell it apart from a network response
+    :param url: requested url
+    :param status_code: HTTP status to report
+    :param body: raw response body
+    :param headers: response headers
+    :return: requests Response
+    """
+    response = re.models.Response()
+    response.url = url
+    response.status_code = status_code
+    response._content = body
+    response.headers = re.structures.CaseInsensitiveDict(headers or {})
+    response.encoding = 'utf-8'
+    return response
+
+
+class HttpCache(object):
+    """
+    On-disk store of raw provider responses kept in SQLite, revalidated with ETag / Last-Modified
+    Entries younger than max_age are replayed without touching the network, so re-runs and backfills
+    don't use up provider rate limits. In offline mode the network is never used and misses come back as 504s
+    """
+    def __init__(self, path, max_age=0, offline=False):
+        """
+        :param path: SQLite file, ':memory:' for a throw away cache
+        :param max_age: seconds an entry is served without revalidation
+        :param offline: only ever serve from the cache
+        """
+        self.path = path
+        self.max_age = max_age
+        self.offline = offline
+        self.lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS http_cache ('
+                                'key TEXT PRIMARY KEY, '
+                                'body BLOB NOT NULL, '
+                                'etag TEXT, '
+                                'last_modified TEXT, '
+                                'content_type TEXT, '
+                                'stored_at REAL NOT NULL)')
+        self.connection.commit()
+        self.counters = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'offline_misses': 0, 'bytes_saved': 0}
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build the cache configured by INGEST_HTTP_CACHE (file path), INGEST_HTTP_CACHE_MAX_AGE (seconds)
+        and INGEST_OFFLINE (1 for cache only)
+        :return: HttpCache or None when no cache is configured
+        """
+        path = os.getenv('INGEST_HTTP_CACHE')
+        if not path:
+            return None
+
+        return cls(path=path,
+                   max_age=int(os.getenv('INGEST_HTTP_CACHE_MAX_AGE', 0)),
+                   offline=os.getenv('INGEST_OFFLINE', '0') == '1')
+
+    def lookup(self, key):
+        with self.lock:
+            return self.connection.execute('SELECT body, etag, last_modified, content_type, stored_at '
+                                           'FROM http_cache WHERE key = ?', (key,)).fetchone()
+
+    def store(self, key, response):
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?)',
+                                    (key, response.content, response.headers.get('ETag'),
+                                     response.headers.get('Last-Modified'), response.headers.get('Content-Type'),
+                                     time()))
+            self.connection.commit()
+
+    def touch(self, key):
+        with self.lock:
+            self.connection.execute('UPDATE http_cache SET stored_at = ? WHERE key = ?', (time(), key))
+            self.connection.commit()
+
+    def count(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] += amount
+
+    def before_request(self, url):
+        """
+        Cache side of a GET before the network is used
+        :param url: url to request
+        :return: stored response to return as is (None when the network is needed), the conditional headers to send
+        and the stored entry to pass on to after_request
+        :rtype: tuple
+        """
+        entry = self.lookup(cache_key(url))
+        if entry:
+            body, etag, last_modified, content_type, stored_at = entry
+            if self.offline or time() - stored_at < self.max_age:
+                self.count('fresh_hits')
+                self.count('bytes_saved', len(body))
+                return build_response(url, 200, body, {'Content-Type': content_type}), {}, entry
+
+        elif self.offline:
+            self.count('offline_misses')
+            return build_response(url, 504, b'{}'), {}, entry
+
+        headers = {}
+        if entry and entry[1]:
+            headers['If-None-Match'] = entry[1]
+        if entry and entry[2]:
+            headers['If-Modified-Since'] = entry[2]
+
+        return None, headers, entry
+
+    def after_request(self, url, entry, response):
+        """
+        Cache side of a GET once the network answered: a 304 replays the stored body, a 200 is stored
+        :param url: requested url
+        :param entry: stored entry returned by before_request
+        :param response: network response
+        :return: requests Response
+        """
+        if entry and response.status_code == 304:
+            body, _, _, content_type, _ = entry
+            self.count('revalidated')
+            self.count('bytes_saved', len(body))
+            self.touch(cache_key(url))
+            return build_response(url, 200, body, {'Content-Type': content_type})
+
+        self.count('misses')
+        if response.status_code == 200:
+            self.store(cache_key(url), response)
+
+        return response
+
+    def get(self, session, url, throttle=None):
+        """
+        GET through the cache
+        Only 200 responses are stored, anything else is passed straight through
+        :param session: requests session used for network calls
+        :param url: url to request
+        :param throttle: callable run right before a network call e.g. TokenBucket.acquire, fresh hits skip it
+        :return: requests Response
+        """
+        cached, headers, entry = self.before_request(url)
+        if cached is not None:
+            return cached
+
+        if throttle:
+            throttle()
+        return self.after_request(url, entry, session.get(url, headers=headers))
+
+    def invalidate(self, url=None):
+        """
+        Drop a single url or, if none given, every stored response
+        :param url: url to drop
+        """
+        with self.lock:
+            if url is None:
+                self.connection.execute('DELETE FROM http_cache')
+            else:
+                self.connection.execute('DELETE FROM http_cache WHERE key = ?', (cache_key(url),))
+            self.connection.commit()
+
+    def stats(self):
+        """
+        :return: counters since start up plus the number of stored responses
+        :rtype: dict
+        """
+        with self.lock:
+            stored = self.connection.execute('SELECT COUNT(*) FROM http_cache').fetchone()[0]
+            return {**self.counters, 'stored': stored}
+
+
+@lru_cache(maxsize=None)
+def shared_http_cache():
+    """
+    The environment configured HttpCache, a single instance shared by every provider in the process
+    :return: HttpCache or None when INGEST_HTTP_CACHE isn't set
+    """
+    return HttpCache.from_env()
@@ -1,40 +1,52 @@
 from itertools import filterfalse
-from datetime import datetime as dt, timedelta
+from collections import defaultdict
+from functools import lru_cache
+from datetime import datetime as dt, timedelta, timezone
+import os
 import unidecode
 
+from ingest_engine.api_integration import fan_out, DEFAULT_WORKERS
+from ingest_engine.async_api_integration import AsyncFootballData, AsyncFastestLiveScores, AsyncFantasy, \
+    async_fan_out
 from ingest_engine.football_data import FootballData
 from ingest_engine.fastest_live_scores_api import FastestLiveScores
-from ingest_engine.fantasy_api import Fantasy, ingest_historical_base_csv, ingest_historical_gameweek_csv
-from ingest_engine.cons import Competition, Match, Team, Player
+from ingest_engine.fantasy_api import Fantasy, ingest_historical_base_csv, read_historical, HISTORICAL_FANTASY_PATH
+from ingest_engine.cons import Competition, Match, Team, Player, Standings, Crosswalk as CW
+from ingest_engine.content_hash import tag_content_hash
+from ingest_engine.crosswalk import CrosswalkResolver
 from ingest_engine.cons import FootballDataApiFilters as fdf
 from ingest_engine.cons import FLSApiFilters as flsf
 from Levenshtein import ratio
 import re
-import os
 import logging
 
 logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
 
+STOPWORDS = ['fifa', 'uefa', 'afc', 'fc', 'cf', 'sl']
+
+# Fan out per team / per player provider calls on an event loop rather than threads
+DEFAULT_ASYNC = os.getenv('INGEST_ASYNC', '0') == '1'
+
+
+@lru_cache(maxsize=8192)
 def str_comparator(str1, str2):
     """
     Implements levenshtein distance algorithm to calculate similarity between two strings
+    Results are memoized, the same team and competition names get compared over and over during a join
     :param str1: first string to compare against
     :param str2: second string to compare against
     :return: Whether str1 and str2 are the same
     """
 
     # Clean strings for stop words
-    stopwords = ['fifa', 'uefa', 'afc', 'fc', 'cf', 'sl']
-    str1 = ' '.join([word.lower() for word in str1.split() if word.lower() not in stopwords])
-    str2 = ' '.join([word.lower() for word in str2.split() if word.lower() not in stopwords])
-
-    pattern = re.compile(r'^{%s}$' % str2)
+    str1 = ' '.join([word.lower() for word in str1.split() if word.lower() not in STOPWORDS])
+    str2 = ' '.join([word.lower() for word in str2.split() if word.lower() not in STOPWORDS])
 
     similarity = str1 == str2
     if similarity:
         return 1
 
-    elif pattern.match(str1):
+    elif str1 == '{%s}' % str2:  # What the former ^{str2}$ regex matched, without compiling a pattern per call
         return 0.99
 
     else:
@@ -42,54 +54,142 @@ def str_comparator(str1, str2):
         return similarity
 
 
+def normalize_team_name(name):
+    """
+    Normalise a team name so the same club has the same key across sources e.g. Brighton & Hove Albion FC
+    :param name: team name as given by any source
+    :return: lower case ascii name without punctuation or stop words
+    :rtype: str
+    """
+    name = re.sub(r'[^a-z0-9 ]', ' ', unidecode.unidecode(name or '').lower())
+    return ' '.join(word for word in name.split() if word not in STOPWORDS)
+
+
+def kickoff_timestamp(utc_date):
+    """
+    :param utc_date: kickoff as given by football-data and fantasy e.g. 2019-08-09T19:00:00Z
+    :return: kickoff as a unix timestamp
+    :rtype: int
+    """
+    return int(dt.strptime(utc_date, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc).timestamp())
+
+
+class FixtureIndex(object):
+    """
+    Hash index over the fixtures of a single source keyed by (kickoff, home team, away team)
+    Names which still differ after normalisation e.g. Norwich vs Norwich City fall back to a substring comparison
+    within the small bucket of fixtures sharing the same kickoff and score
+    """
+    def __init__(self, fixtures, team_names, kickoff=None):
+        """
+        :param fixtures: fixtures from one source
+        :param team_names: callable returning the (home, away) team names of a fixture
+        :param kickoff: callable returning the kickoff timestamp of a fixture, None for sources without kickoff times
+        """
+        self.exact = defaultdict(list)
+        self.buckets = defaultdict(list)
+        for fixture in fixtures:
+            home, away = (normalize_team_name(name) for name in team_names(fixture))
+            start = kickoff(fixture) if kickoff else None
+            score = (fixture[Match.FULL_TIME_HOME_SCORE], fixture[Match.FULL_TIME_AWAY_SCORE])
+            self.exact[(start, home, away)].append((score, fixture))
+            self.buckets[(start, score)].append((home, away, fixture))
+
+    def find(self, home, away, score, kickoff=None):
+        """
+        Find the fixture between two normalised team names
+        :param home: normalised home team name
+        :param away: normalised away team name
+        :param score: (home score, away score) the fixture must have
+        :param kickoff: kickoff timestamp, ignored if the index was built without kickoff times
+        :return: fixture or None
+        """
+        for fixture_score, fixture in self.exact.get((kickoff, home, away), []):
+            if fixture_score == score:
+                return fixture
+
+        for fixture_home, fixture_away, fixture in self.buckets.get((kickoff, score), []):
+            if fixture_home and fixture_away and fixture_home in home and fixture_away in away:
+                return fixture
+
+        return None
+
+
 class Driver(object):
     """
     Class responsible for handling the merger of different sources into seperate methods that are called for ingest
     """
 
-    def __init__(self):
-        self.fd = FootballData()
-        self.fls = FastestLiveScores()
-        self.fantasy = Fantasy()
+    def __init__(self, workers=DEFAULT_WORKERS, http_cache=None, use_async=DEFAULT_ASYNC):
+        """
+        :param workers: threads used to fan out per team / per player provider calls, 1 runs them sequentially
+        :param http_cache: HttpCache shared by every provider, defaults to the one configured by INGEST_HTTP_CACHE
+        :param use_async: overlap the fanned out calls on an event loop instead, workers is then unused
+        """
+        self.workers = workers
+        self.use_async = use_async
+        if use_async:
+            self.fd = AsyncFootballData(http_cache=http_cache)
+            self.fls = AsyncFastestLiveScores(http_cache=http_cache)
+            self.fantasy = AsyncFantasy(http_cache=http_cache)
+        else:
+            self.fd = FootballData(http_cache=http_cache)
+            self.fls = FastestLiveScores(http_cache=http_cache)
+            self.fantasy = Fantasy(http_cache=http_cache)
+
+        # Optional PlayerResolver, when set player records are tagged with their DB id as they are requested
+        self.player_resolver = None
+
+        # Team / competition id crosswalk, replace with DBInterface.load_crosswalk() to reuse persisted mappings
+        self.crosswalk = CrosswalkResolver()
 
         # Indicator of whether or not historical fantasy data has been collected
         self.historical_player_data_collected = False
-        self.historical_fantasy_gameweek_data = []
+        self.historical_fantasy_gameweek_data = None  # DataFrame once loaded
         self.historical_fantasy_base_data = []
 
+    def request_many(self, func, kwargs_list):
+        """
+        Call a provider request_* method once per kwargs entry, concurrently
+        :param func: bound request_* method of one of the providers e.g. self.fd.request_team
+        :param kwargs_list: list of keyword arguments, one entry per call
+        :return: results in the same order as kwargs_list
+        :rtype: list
+        """
+        if self.use_async:
+            return async_fan_out(func, kwargs_list)
+        return fan_out(func, kwargs_list, workers=self.workers)
+
     def request_competitions(self):
         """
         Joins competition information from Football-data and FLS together
         :return: Competition info from both APIs
         :rtype: list
         """
-        comp_comparator = {}  # keep track of 1 - 1 matching of competitions
         fd_competitions = self.fd.request_competitions()
         fls_competitions = self.fls.request_competitions()
-        for comp in fd_competitions:
-            comp_name = comp[Competition.NAME]
-            location = comp[Competition.LOCATION]
-            for fls_comp in fls_competitions:
-                comp_name_comparison_score = str_comparator(comp_name, fls_comp[Competition.NAME])
-                comp_loc_comparison_score = str_comparator(location, fls_comp[Competition.LOCATION])
-                if comp_name_comparison_score >= 0.9 and comp_loc_comparison_score >= 0.9:
-                    if comp[Competition.FOOTBALL_DATA_API_ID] not in comp_comparator:
-                        comp_comparator[comp[Competition.FOOTBALL_DATA_API_ID]] = (fls_comp, comp_name_comparison_score)
-
-                    else:
-                        if comp_comparator[comp[Competition.FOOTBALL_DATA_API_ID]][1] < comp_name_comparison_score:
-                            comp_comparator[comp[Competition.FOOTBALL_DATA_API_ID]] = \
-                                (fls_comp, comp_name_comparison_score)
 
-        joint_competition_info = []
-        for fd_comp_id, fls_comp_info in comp_comparator.items():
-            for comp in fd_competitions:
-                if comp[Competition.FOOTBALL_DATA_API_ID] == fd_comp_id:
-                    # Atm, just extraction the API ID for the competition and nothing else
-                    comp[Competition.FASTEST_LIVE_SCORES_API_ID] = \
-                        fls_comp_info[0][Competition.FASTEST_LIVE_SCORES_API_ID]
+        def competition_score(fd_comp, fls_comp):
+            if str_comparator(fd_comp[Competition.LOCATION], fls_comp[Competition.LOCATION]) < 0.9:
+                return 0
+            return str_comparator(fd_comp[Competition.NAME], fls_comp[Competition.NAME])
+
+        # Every football-data competition is paired with at most one FLS competition
+        fls_paired = self.crosswalk.reconcile(
+            entity_type=CW.COMPETITION,
+            source=CW.FLS,
+            anchors={comp[Competition.FOOTBALL_DATA_API_ID]: comp for comp in fd_competitions},
+            records={comp[Competition.FASTEST_LIVE_SCORES_API_ID]: comp for comp in fls_competitions},
+            name=lambda comp: comp[Competition.NAME],
+            score=competition_score)
 
-                    joint_competition_info.append(comp)
+        joint_competition_info = []
+        for comp in fd_competitions:
+            fls_comp = fls_paired.get(comp[Competition.FOOTBALL_DATA_API_ID])
+            if fls_comp:
+                # Atm, just extraction the API ID for the competition and nothing else
+                comp[Competition.FASTEST_LIVE_SCORES_API_ID] = fls_comp[Competition.FASTEST_LIVE_SCORES_API_ID]
+                joint_competition_info.append(comp)
 
         return joint_competition_info
 
@@ -102,6 +202,9 @@ class Driver(object):
         :rtype: dict
         """
         result = self.fd.request_competition_standings(competition_id=competition_id, standing_type=standing_type)
+        for standings in (result or {}).get('standings', []):
+            tag_content_hash(standings[Standings.TABLE])
+
         return result
 
     def request_match(self, fls_comp_id, fd_comp_id, game_week, season, limit=None):
@@ -124,7 +227,6 @@ class Driver(object):
         if isinstance(season, str):
             season = int(season.split("-")[0])
 
-        joint_matches = []
         fantasy_matches = self.fantasy.request_matches()
         fantasy_matches = list(filter(lambda x: x[Match.FANTASY_GAME_WEEK] == int(game_week), fantasy_matches))
         fd_matches = self.fd.request_competition_match(competition_id=fd_comp_id,
@@ -138,36 +240,54 @@ class Driver(object):
 
         fls_matches = list(filterfalse(lambda x: x[Match.FLS_API_COMPETITION_ID] != fls_comp_id, fls_matches))
 
+        joined = self.join_matches(fd_matches=fd_matches, fls_matches=fls_matches,
+                                   fantasy_matches=fantasy_matches)
+        if limit:
+            joined = joined[:limit]
+
+        # Advanced details are only requested for fixtures that made it through the join
+        adv_match_details = self.fls.request_match_details_many(
+            match_ids=[fls_match[Match.FLS_MATCH_ID] for _, fls_match, _ in joined], workers=self.workers)
+
+        joint_matches = []
+        for match, fls_match, f_match in joined:
+            joint_matches.append({**f_match, **match, **fls_match,
+                                  **adv_match_details[fls_match[Match.FLS_MATCH_ID]]})
+
+        return tag_content_hash(joint_matches)
+
+    def join_matches(self, fd_matches, fls_matches, fantasy_matches):
+        """
+        Pair every football-data fixture with the same fixture in FLS and fantasy
+        FLS has no kickoff times so it is matched on teams and score, fantasy on kickoff, teams and score
+        :param fd_matches: football-data fixtures
+        :param fls_matches: FLS fixtures
+        :param fantasy_matches: fantasy fixtures
+        :return: (football-data, FLS, fantasy) fixture triples, football-data fixtures missing elsewhere are dropped
+        :rtype: list
+        """
+        fls_index = FixtureIndex(fixtures=fls_matches,
+                                 team_names=lambda m: (m[Match.HOME_TEAM], m[Match.AWAY_TEAM]))
+        fantasy_index = FixtureIndex(fixtures=fantasy_matches,
+                                     team_names=lambda m: (self.fantasy.name_to_id(m[Match.FANTASY_HOME_TEAM_ID]),
+                                                           self.fantasy.name_to_id(m[Match.FANTASY_AWAY_TEAM_ID])),
+                                     kickoff=lambda m: kickoff_timestamp(m[Match.START_TIME]))
+
+        joined = []
         for match in fd_matches:
-            match_start_datetime = dt.strptime(match[Match.MATCH_UTC_DATE], '%Y-%m-%dT%H:%M:%SZ')
-            match_start_datetime = dt.strftime(match_start_datetime, '%Y-%d-%mT%H:%M:%SZ')
-            home_team = match[Match.HOME_TEAM]
-            away_team = match[Match.AWAY_TEAM]
-            home_score = match[Match.FULL_TIME_HOME_SCORE]
-            away_score = match[Match.FULL_TIME_AWAY_SCORE]
-            for fls_match in fls_matches:
-                if fls_match[Match.HOME_TEAM] in home_team and fls_match[Match.AWAY_TEAM] in away_team and \
-                        home_score == fls_match[Match.FULL_TIME_HOME_SCORE] and \
-                        away_score == fls_match[Match.FULL_TIME_AWAY_SCORE]:
-                    temp_dict = {**match, **fls_match}
-                    adv_match_details = self.fls.request_match_details(match_id=fls_match[Match.FLS_MATCH_ID])
-                    temp_dict2 = {**temp_dict, **adv_match_details}
-                    for f_match in fantasy_matches:
-                        f_home_team = self.fantasy.name_to_id(f_match[Match.FANTASY_HOME_TEAM_ID])
-                        f_away_team = self.fantasy.name_to_id(f_match[Match.FANTASY_AWAY_TEAM_ID])
-                        parsed_date = dt.strftime(dt.strptime(f_match[Match.START_TIME], '%Y-%m-%dT%H:%M:%SZ'),
-                                                  '%Y-%d-%mT%H:%M:%SZ')
-                        if parsed_date == match_start_datetime:
-                            if f_home_team in home_team and f_away_team in away_team and \
-                                    home_score == f_match[Match.FULL_TIME_HOME_SCORE] and \
-                                    away_score == f_match[Match.FULL_TIME_AWAY_SCORE]:
-                                final_dict = {**f_match, **temp_dict2}
-                                joint_matches.append(final_dict)
+            home_team = normalize_team_name(match[Match.HOME_TEAM])
+            away_team = normalize_team_name(match[Match.AWAY_TEAM])
+            score = (match[Match.FULL_TIME_HOME_SCORE], match[Match.FULL_TIME_AWAY_SCORE])
+            fls_match = fls_index.find(home=home_team, away=away_team, score=score)
+            if not fls_match:
+                continue
 
-        if limit:
-            return joint_matches[:limit]
+            f_match = fantasy_index.find(home=home_team, away=away_team, score=score,
+                                         kickoff=kickoff_timestamp(match[Match.MATCH_UTC_DATE]))
+            if f_match:
+                joined.append((match, fls_match, f_match))
 
-        return joint_matches
+        return joined
 
     def request_teams(self, fd_comp_id, fls_comp_id, season, limit=None) -> list:
         """
@@ -185,59 +305,62 @@ class Driver(object):
         if isinstance(season, str):
             season = int(season.split("-")[0])
 
-        joint_teams = []
         fd_teams = self.fd.request_competition_team(competition_id=fd_comp_id, season=season)
-        for idx, team in enumerate(fd_teams):
-            fd_team_extra = self.fd.request_team(team_id=team[Team.FOOTBALL_DATA_ID])
+        fd_teams_extra = self.request_many(self.fd.request_team,
+                                           [{'team_id': team[Team.FOOTBALL_DATA_ID]} for team in fd_teams])
+        for idx, (team, fd_team_extra) in enumerate(zip(fd_teams, fd_teams_extra)):
             fd_teams[idx] = {**team, **fd_team_extra}
 
         fls_teams = self.fls.request_teams(**{flsf.COMPETITION_ID: fls_comp_id})
-        f_teams = self.fantasy.request_base_information()
+        f_teams = self.fantasy.request_base_information().get('teams', [])
+
+        def f_team_name(f_team):
+            return self.fantasy.name_to_id(f_team[Team.FANTASY_ID]) or f_team[Team.NAME]
+
+        anchors = {fd_team[Team.FOOTBALL_DATA_ID]: fd_team for fd_team in fd_teams}
+        fls_paired = self.crosswalk.reconcile(
+            entity_type=CW.TEAM,
+            source=CW.FLS,
+            anchors=anchors,
+            records={fls_team[Team.FASTEST_LIVE_SCORES_API_ID]: fls_team for fls_team in fls_teams},
+            name=lambda fls_team: fls_team[Team.NAME],
+            score=lambda fd_team, fls_team: str_comparator(fd_team[Team.NAME], fls_team[Team.NAME]))
+        f_paired = self.crosswalk.reconcile(
+            entity_type=CW.TEAM,
+            source=CW.FANTASY,
+            anchors=anchors,
+            records={f_team[Team.FANTASY_CODE]: f_team for f_team in f_teams},
+            name=f_team_name,
+            score=lambda fd_team, f_team: str_comparator(fd_team[Team.NAME], f_team_name(f_team)))
 
+        joint_teams = []
         for fd_team in fd_teams:
-            temp_dict = {}
-            team_name = fd_team[Team.NAME]
-            for fls_team in fls_teams:
-                if str_comparator(team_name, fls_team[Team.NAME]) >= 0.9:
-                    temp_dict = {**fls_team, **fd_team}
-                    break
-
-            for f_team in f_teams:
-                # if team_name in f_team[Team.NAME] or f_team[Team.NAME] in team_name:
-                f_team[Team.NAME] = self.fantasy.name_to_id(f_team[Team.FANTASY_ID])
-                if str_comparator(team_name, f_team[Team.NAME]) >= 0.9:
-                    final_dict = {**f_team, **temp_dict}
-                    joint_teams.append(final_dict)
-                    break
+            f_team = f_paired.get(fd_team[Team.FOOTBALL_DATA_ID])
+            if f_team:
+                fls_team = fls_paired.get(fd_team[Team.FOOTBALL_DATA_ID])
+                temp_dict = {**fls_team, **fd_team} if fls_team else {}
+                # Fantasy records are shared through the response cache, so they are copied rather than renamed
+                joint_teams.append({**f_team, Team.NAME: f_team_name(f_team), **temp_dict})
 
         if limit:
-            return joint_teams[:limit]
+            joint_teams = joint_teams[:limit]
 
-        return joint_teams
+        return tag_content_hash(joint_teams)
 
     def get_historical_fantasy_data(self):
-        current_path = os.path.dirname(os.path.abspath(__file__))
-        current_path = "/".join(current_path.split("/")[:-1])
-        for week_i in range(1, 38):
-            # Season 2016-2017
-            temp_list = self.historical_fantasy_gameweek_data
-
-            # Merge the current record of historical gameweek data with this one
-            self.historical_fantasy_gameweek_data =\
-                ingest_historical_gameweek_csv(csv_file=f'{current_path}/historical_fantasy/2016-17/gw{week_i}.csv',
-                                               season='201617') + temp_list
-
-            temp_list = self.historical_fantasy_gameweek_data
-            # Season 2017-2018
-            self.historical_fantasy_gameweek_data = \
-                ingest_historical_gameweek_csv(csv_file=f'{current_path}/historical_fantasy/2017-18/gw{week_i}.csv',
-                                               season='201718') + temp_list
+        """
+        Load the historical fantasy data shipped in historical_fantasy/, from its Parquet cache when that is fresh
+        Gameweeks of every season are kept as a single frame, season summaries as a list of records
+        """
+        self.historical_fantasy_gameweek_data = read_historical('gameweeks')
 
+        self.historical_fantasy_base_data = []
         for season in ['2016-17', '2017-18']:
-            temp_list = self.historical_fantasy_base_data
-            self.historical_fantasy_base_data =  ingest_historical_base_csv(
-                csv_file=f'{current_path}/historical_fantasy/{season}/cleaned_players.csv',
-                season="".join(season.split("-"))) + temp_list
+            self.historical_fantasy_base_data.extend(ingest_historical_base_csv(
+                csv_file=f'{HISTORICAL_FANTASY_PATH}/{season}/cleaned_players.csv',
+                season="".join(season.split("-"))))
+
+        self.historical_player_data_collected = True
 
     def request_player_details(self, f_team_id):
         """
@@ -255,17 +378,89 @@ class Driver(object):
         f_players_base = self.fantasy.request_base_information()['players']
 
         f_players_base = list(filter(lambda p: p[Player.FANTASY_TEAM_ID] == f_team_id, f_players_base))
+        return self.join_player_details(f_players_base=f_players_base)
+
+    def request_player_details_by_id(self, f_player_ids):
+        """
+        request_player_details for the given players only e.g. the ones an IngestPlan found changed
+        :param f_player_ids: fantasy ids of the players
+        :return: List of player details
+        :rtype: list
+        """
+        f_player_ids = set(f_player_ids)
+        f_players_base = [player for player in self.fantasy.request_base_information()['players']
+                          if player[Player.FANTASY_ID] in f_player_ids]
+        return self.join_player_details(f_players_base=f_players_base)
+
+    def join_player_details(self, f_players_base):
+        """
+        Join the fantasy base information of players with their per player fantasy data
+        :param f_players_base: players from Fantasy.request_base_information
+        :return: List of player details
+        :rtype: list
+        """
         # Join together data from fantasy football
-        for idx, player in enumerate(f_players_base):
-            extra_player_data = self.fantasy.request_player_data(player_id=player[Player.FANTASY_ID])
-            f_players_base[idx] = {**extra_player_data, **player}
+        extra_players_data = self.request_many(self.fantasy.request_player_data,
+                                               [{'player_id': player[Player.FANTASY_ID]} for player in f_players_base])
+        for idx, (player, extra_player_data) in enumerate(zip(f_players_base, extra_players_data)):
+            f_players_base[idx] = {**(extra_player_data or {}), **player}
 
         for player in f_players_base:
             player[Player.NAME] = unidecode.unidecode(player[Player.NAME])
             player[Player.FIRST_NAME] = unidecode.unidecode(player[Player.FIRST_NAME])
             player[Player.LAST_NAME] = unidecode.unidecode(player[Player.LAST_NAME])
             player[Player.FANTASY_WEB_NAME] = unidecode.unidecode(player[Player.FANTASY_WEB_NAME])
-        return f_players_base
+            if self.player_resolver:
+                player_id = self.player_resolver.resolve(player)
+                if player_id:
+                    player[Player.ID] = player_id
+
+        return tag_content_hash(f_players_base)
+
+    def cache_stats(self):
+        """
+        Response cache counters for every provider, plus the on-disk http cache when one is in use
+        :return: provider name -> hits, misses and live entries
+        :rtype: dict
+        """
+        stats = {
+            'football_data': self.fd.response_cache.stats(),
+            'fls': self.fls.response_cache.stats(),
+            'fantasy': self.fantasy.response_cache.stats()
+        }
+        if self.fd.http_cache:
+            stats['http'] = self.fd.http_cache.stats()
+
+        return stats
+
+    def rate_limit_stats(self):
+        """
+        Client side rate limiter counters of every provider that has one
+        :return: provider name -> calls made, calls that had to wait and seconds spent waiting
+        :rtype: dict
+        """
+        return {name: api.rate_limiter.stats() for name, api in [('football_data', self.fd), ('fls', self.fls),
+                                                                  ('fantasy', self.fantasy)] if api.rate_limiter}
+
+    def invalidate_caches(self):
+        """
+        Drop every cached provider document e.g. before starting a new ingest run with a long lived Driver
+        """
+        for api in [self.fd, self.fls, self.fantasy]:
+            api.response_cache.invalidate()
+        self.fantasy.team_mapper = None
+
+    def request_all_player_details(self, f_team_ids):
+        """
+        request_player_details for several teams at once, teams are requested concurrently
+        :param f_team_ids: fantasy ids of the teams
+        :return: List of player details across all the teams
+        :rtype: list
+        """
+        teams_players = fan_out(self.request_player_details,
+                                [{'f_team_id': f_team_id} for f_team_id in f_team_ids],
+                                workers=self.workers)
+        return [player for team_players in teams_players for player in team_players]
 
 
 # if __name__ == "__main__":
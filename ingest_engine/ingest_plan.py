@@ -0,0 +1,118 @@
+from collections import Counter
+from datetime import datetime as dt, timezone
+
+from ingest_engine.cons import Match, Player, IngestState
+
+# Fantasy documents every plan is worked out from: /fixtures/ and /bootstrap-static/
+PLANNING_CALLS = 2
+
+
+def parse_time(value):
+    """
+    :param value: provider timestamp e.g. 2019-08-09T19:00:00Z or 2019-08-10T07:30:07.562745Z, may be empty
+    :return: naive UTC datetime as stored in the DB, None for an empty value
+    :rtype: datetime
+    """
+    if not value:
+        return None
+    if isinstance(value, dt):
+        return value
+
+    parsed = dt.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def is_after(value, watermark):
+    """
+    :param value: naive UTC datetime or None
+    :param watermark: naive UTC datetime, None when nothing has been ingested yet
+    :return: whether value is past the watermark
+    :rtype: bool
+    """
+    return value is not None and (watermark is None or value > watermark)
+
+
+class IngestPlan(object):
+    """
+    What a WeeklyIngest run requests, worked out from the fantasy fixtures and players against the IngestState
+    watermarks of each source:
+     - matches: every game week with a fixture finished since the last finished kickoff ingested, so runs that were
+       missed are caught up in one go
+     - players: the players of the teams that played since the players were last ingested, plus players whose
+       fantasy news is newer than the last news ingested
+     - standings: requested once any fixture finished since they were last stored
+    """
+    def __init__(self, fixtures, players, watermarks):
+        """
+        :param fixtures: fantasy fixtures as returned by Fantasy.request_matches, a fixture is only taken as finished
+        once fantasy flags it (provisionally) finished, suspended or delayed fixtures never move the watermarks
+        :param players: fantasy players as returned by Fantasy.request_base_information
+        :param watermarks: source -> watermarks as returned by DBInterface.get_watermarks
+        """
+        finished = [(parse_time(fixture[Match.START_TIME]), fixture) for fixture in fixtures
+                    if fixture.get(Match.FINISHED)]
+        matches, players_state, standings = (watermarks.get(source, {}) for source in
+                                             [IngestState.MATCHES, IngestState.PLAYERS, IngestState.STANDINGS])
+
+        self.game_weeks = sorted({fixture[Match.FANTASY_GAME_WEEK] for kickoff, fixture in finished
+                                  if is_after(kickoff, matches.get(IngestState.LAST_KICKOFF))})
+        # Fixtures requested for those game weeks, including ones not finished yet
+        self.fixtures_per_game_week = Counter(fixture[Match.FANTASY_GAME_WEEK] for fixture in fixtures
+                                              if fixture[Match.FANTASY_GAME_WEEK] in self.game_weeks)
+
+        # New watermark of every source once the plan has been carried out
+        self.last_kickoff = max([kickoff for kickoff, _ in finished] +
+                                [watermark.get(IngestState.LAST_KICKOFF) for watermark in
+                                 [matches, players_state, standings] if watermark.get(IngestState.LAST_KICKOFF)],
+                                default=None)
+
+        played = {team_id for kickoff, fixture in finished
+                  if is_after(kickoff, players_state.get(IngestState.LAST_KICKOFF))
+                  for team_id in [fixture[Match.FANTASY_HOME_TEAM_ID], fixture[Match.FANTASY_AWAY_TEAM_ID]]}
+        last_news = players_state.get(IngestState.LAST_NEWS)
+        self.players = [player for player in players if player[Player.FANTASY_TEAM_ID] in played or
+                        is_after(parse_time(player.get(Player.FANTASY_NEWS_TIMESTAMP)), last_news)]
+        self.last_news = max([parse_time(player[Player.FANTASY_NEWS_TIMESTAMP]) for player in players
+                              if player.get(Player.FANTASY_NEWS_TIMESTAMP)] + ([last_news] if last_news else []),
+                             default=None)
+
+        self.last_match_day = standings.get(IngestState.LAST_MATCH_DAY)
+        self.standings = any(is_after(kickoff, standings.get(IngestState.LAST_KICKOFF)) for kickoff, _ in finished)
+
+    def is_empty(self):
+        """
+        :return: whether nothing changed since the watermarks
+        :rtype: bool
+        """
+        return not (self.game_weeks or self.players or self.standings)
+
+    def estimated_calls(self):
+        """
+        Provider calls carrying out the plan takes, on top of the PLANNING_CALLS already made
+        Each game week takes one football-data match list, one FLS match list plus the FLS match details and
+        additional data of every fixture and the fantasy fixtures, each player one fantasy element summary
+        :return: provider name -> estimated number of calls
+        :rtype: dict
+        """
+        return {
+            'football_data': len(self.game_weeks) + int(self.standings),
+            'fls': sum(1 + 2 * self.fixtures_per_game_week[game_week] for game_week in self.game_weeks),
+            'fantasy': len(self.game_weeks) + len(self.players)
+        }
+
+    def describe(self):
+        """
+        :return: human readable lines of the planned fetch set, as logged by a dry run
+        :rtype: list
+        """
+        calls = self.estimated_calls()
+        return [
+            f'standings - {"requested" if self.standings else "skipped"}, last match day {self.last_match_day}',
+            f'matches - game weeks {self.game_weeks or "none"} '
+            f'({sum(self.fixtures_per_game_week.values())} fixtures)',
+            f'players - {len(self.players)} players',
+            f'watermarks - last kickoff {self.last_kickoff}, last news {self.last_news}',
+            f'estimated calls - {sum(calls.values())} {calls}, plus {PLANNING_CALLS} fantasy calls spent planning'
+        ]
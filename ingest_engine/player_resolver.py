@@ -0,0 +1,197 @@
+import re
+import time
+from collections import Counter, defaultdict
+from threading import Lock
+
+import unidecode
+from Levenshtein import ratio
+
+from ingest_engine.cons import Player
+
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9 ]+')
+
+
+def normalize_name(name):
+    """
+    Canonical form used for every name lookup: ascii, lower case, no punctuation, single spaced
+    :param name: raw player name from any source
+    :return: normalized name, '' when name is empty
+    :rtype: str
+    """
+    if not name:
+        return ''
+
+    name = NON_ALPHANUMERIC.sub(' ', unidecode.unidecode(name).lower())
+    return ' '.join(name.split())
+
+
+def player_name_candidates(player):
+    """
+    Name permutations used to match a player record against Player.name, in order of preference
+    Fantasy records carry first/last/web names, football-data and FLS records only a full name
+    :param player: player record from any source
+    :return: candidate full names
+    :rtype: list
+    """
+    candidates = [player[Player.NAME]] if player.get(Player.NAME) else []
+    if not player.get(Player.FIRST_NAME) or not player.get(Player.LAST_NAME):
+        return candidates
+
+    first_names = player[Player.FIRST_NAME].split(' ')
+    last_names = player[Player.LAST_NAME].split(' ')
+    web_name = player.get(Player.FANTASY_WEB_NAME) or player[Player.LAST_NAME]
+
+    return candidates + [
+        web_name,
+        f"{web_name} {player[Player.LAST_NAME]}",
+        f"{first_names[0]} {last_names[-1]}",  # just first and last name
+        f"{first_names[0]} {last_names[0]}",  # (first) first name and (first) last name
+        f"{first_names[-1]} {last_names[0]}",  # (last) first name and (first) last name
+        f"{web_name} {last_names[-1]}",  # web_name and (last) last name
+        f"{player[Player.FIRST_NAME]} {last_names[0]}",  # first_name and (first) last name
+        f"{web_name} {last_names[0]}",  # web_name and (first) last name
+    ]
+
+
+class PlayerResolver(object):
+    """
+    In-memory player identity index, loaded once per ingest batch and used to resolve fantasy, football-data and
+    FLS player records to a Player.id without querying the DB per row.
+    Lookups go: football-data id -> normalized name permutations -> (first initial, last name) -> bounded fuzzy match
+    """
+
+    def __init__(self, players=None, fuzzy_threshold=0.9, max_fuzzy_candidates=25):
+        """
+        :param players: iterable of dicts with at least Player.ID and Player.NAME
+        :param fuzzy_threshold: minimum levenshtein ratio accepted when the hash indexes miss
+        :param max_fuzzy_candidates: upper bound on names compared during the fuzzy fallback
+        """
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_fuzzy_candidates = max_fuzzy_candidates
+        self.by_fd_id = {}
+        self.by_name = {}
+        self.by_token = defaultdict(set)
+        self.by_initial_last_name = defaultdict(set)
+        self.names = {}
+        self.counters = Counter()
+        self.lookup_time = 0.0
+        self.lock = Lock()  # Records are resolved from fan_out worker threads
+
+        for player in players or []:
+            self.add(player)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, player):
+        """
+        Index a single DB player
+        :param player: dict with Player.ID, Player.NAME and optionally first/last/web names and football-data id
+        """
+        player_id = player[Player.ID]
+        name = normalize_name(player[Player.NAME])
+        self.names[player_id] = name
+        self.by_name.setdefault(name, player_id)
+
+        first_name = normalize_name(player.get(Player.FIRST_NAME))
+        last_name = normalize_name(player.get(Player.LAST_NAME))
+        if first_name and last_name:
+            self.by_name.setdefault(f'{first_name} {last_name}', player_id)
+
+        tokens = name.split()
+        if len(tokens) > 1:
+            self.by_initial_last_name[(tokens[0][0], tokens[-1])].add(player_id)
+
+        for token in tokens:
+            self.by_token[token].add(player_id)
+
+        if player.get(Player.FOOTBALL_DATA_API_ID):
+            self.by_fd_id[player[Player.FOOTBALL_DATA_API_ID]] = player_id
+
+    def resolve_fd(self, fd_id):
+        """
+        :param fd_id: football-data player id
+        :return: Player.id or None
+        """
+        return self.by_fd_id.get(fd_id)
+
+    def resolve(self, record):
+        """
+        Resolve a player record from any source to a DB player id
+        :param record: fantasy, football-data or FLS player record
+        :return: Player.id or None when no player is close enough
+        """
+        start = time.perf_counter()
+        player_id = self._resolve(record)
+        with self.lock:
+            self.counters['lookups'] += 1
+            self.lookup_time += time.perf_counter() - start
+            if player_id is None:
+                self.counters['misses'] += 1
+
+        return player_id
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def _resolve(self, record):
+        player_id = self.resolve_fd(record.get(Player.FOOTBALL_DATA_API_ID))
+        if player_id is not None:
+            self.count('fd_id_hits')
+            return player_id
+
+        candidates = [normalize_name(c) for c in player_name_candidates(record)]
+        for candidate in candidates:
+            if candidate in self.by_name:
+                self.count('name_hits')
+                return self.by_name[candidate]
+
+        if not candidates:
+            return None
+
+        tokens = candidates[0].split()
+        if len(tokens) > 1:
+            ids = self.by_initial_last_name.get((tokens[0][0], tokens[-1]), set())
+            if len(ids) == 1:  # Only trust the initial index when it is unambiguous
+                self.count('initial_hits')
+                return next(iter(ids))
+
+        return self._fuzzy_resolve(candidates)
+
+    def _fuzzy_resolve(self, candidates):
+        """
+        Levenshtein fallback restricted to players sharing at least one name token with the record
+        """
+        token_overlap = Counter()
+        for token in set(' '.join(candidates).split()):
+            token_overlap.update(self.by_token.get(token, ()))
+
+        best_id, best_score = None, 0
+        for player_id, _ in token_overlap.most_common(self.max_fuzzy_candidates):
+            score = max(ratio(candidate, self.names[player_id]) for candidate in candidates)
+            if score > best_score:
+                best_id, best_score = player_id, score
+
+        if best_score >= self.fuzzy_threshold:
+            self.count('fuzzy_hits')
+            return best_id
+
+        return None
+
+    def stats(self):
+        """
+        Match rate and latency counters for logging
+        :return: counters, match_rate and average lookup latency in microseconds
+        :rtype: dict
+        """
+        with self.lock:
+            counters, lookup_time = Counter(self.counters), self.lookup_time
+
+        lookups = counters['lookups']
+        return {
+            **{counter: counters[counter] for counter in ['lookups', 'fd_id_hits', 'name_hits', 'initial_hits',
+                                                         'fuzzy_hits', 'misses']},
+            'match_rate': round((lookups - counters['misses']) / lookups, 3) if lookups else 0,
+            'avg_lookup_us': round(lookup_time / lookups * 1e6, 1) if lookups else 0,
+        }
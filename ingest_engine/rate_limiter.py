@@ -0,0 +1,122 @@
+import fcntl
+import json
+import os
+import tempfile
+from functools import lru_cache
+from threading import Lock
+from time import sleep, time
+
+# football-data.org free tier quota, calls per minute
+FOOTBALL_DATA_CALLS_PER_MINUTE = 10
+MINUTE = 65  # Extra buffer of time, the provider window and our clock never line up exactly
+
+
+class TokenBucket(object):
+    """
+    Token bucket whose state lives in a file under an exclusive flock, so every ingest process (and thread)
+    calling the same provider draws from one bucket
+    Callers reserve a token straight away and sleep until it is due outside the lock, which spaces calls out in
+    the order they were made instead of having them all wake up and race for the next token
+    """
+    def __init__(self, name, rate, period=MINUTE, capacity=1, directory=None):
+        """
+        :param name: bucket name, processes using the same name and directory share the bucket
+        :param rate: tokens added per period
+        :param period: seconds over which rate tokens are added
+        :param capacity: most tokens held at once i.e. the largest burst, any period then sees at most
+        capacity + rate calls
+        :param directory: where the state file is kept, INGEST_RATE_LIMIT_DIR or the temp dir by default
+        """
+        directory = directory or os.getenv('INGEST_RATE_LIMIT_DIR') or tempfile.gettempdir()
+        self.path = os.path.join(directory, f'trackr_rate_limit_{name}.json')
+        self.per_second = rate / period
+        self.capacity = capacity
+        self.lock = Lock()
+        self.counters = {'acquired': 0, 'waits': 0, 'waited_seconds': 0.0, 'rate_limited': 0}
+
+    def update(self, func):
+        """
+        Run func on the shared state while holding the file lock
+        :param func: callable taking the current token count and returning the new one plus a result
+        :return: result of func
+        """
+        with open(self.path, 'a+') as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state_file.seek(0)
+                try:
+                    state = json.loads(state_file.read())
+                except ValueError:  # New or unreadable state, start with a full bucket
+                    state = {'tokens': self.capacity, 'updated_at': time()}
+
+                now = time()
+                tokens = min(self.capacity, state['tokens'] + (now - state['updated_at']) * self.per_second)
+                tokens, result = func(tokens)
+
+                state_file.seek(0)
+                state_file.truncate()
+                state_file.write(json.dumps({'tokens': tokens, 'updated_at': now}))
+                state_file.flush()
+                return result
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+    def count(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] += amount
+
+    def reserve(self):
+        """
+        Take a token without waiting for it e.g. to wait with asyncio.sleep instead
+        :return: seconds until the token is due
+        :rtype: float
+        """
+        # A negative balance is the tokens already promised to earlier callers
+        wait_time = self.update(lambda tokens: (tokens - 1, max(0.0, (1 - tokens) / self.per_second)))
+        self.count('acquired')
+        if wait_time > 0:
+            self.count('waits')
+            self.count('waited_seconds', wait_time)
+
+        return wait_time
+
+    def acquire(self):
+        """
+        Take a token, sleeping until one is available
+        :return: seconds waited
+        :rtype: float
+        """
+        wait_time = self.reserve()
+        if wait_time > 0:
+            sleep(wait_time)
+
+        return wait_time
+
+    def penalize(self, seconds):
+        """
+        Hold every process' next call for the given time e.g. after the provider answered with a 429 anyway
+        :param seconds: time before the next token is available
+        """
+        self.count('rate_limited')
+        self.update(lambda tokens: (min(tokens, 0) - seconds * self.per_second, None))
+
+    def stats(self):
+        """
+        :return: counters of this process since start up
+        :rtype: dict
+        """
+        with self.lock:
+            return {**self.counters, 'waited_seconds': round(self.counters['waited_seconds'], 3)}
+
+
+@lru_cache(maxsize=None)
+def football_data_rate_limiter():
+    """
+    The bucket shared by every football-data client, sized by FOOTBALL_DATA_RATE_LIMIT (calls per minute)
+    :return: TokenBucket or None when FOOTBALL_DATA_RATE_LIMIT is 0
+    """
+    rate = int(os.getenv('FOOTBALL_DATA_RATE_LIMIT', FOOTBALL_DATA_CALLS_PER_MINUTE))
+    if rate <= 0:
+        return None
+
+    return TokenBucket(name='football_data', rate=rate)
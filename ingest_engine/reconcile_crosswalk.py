@@ -0,0 +1,38 @@
+import os
+import logging
+
+from sqlalchemy import create_engine
+
+from db_engine.db_interface import DBInterface
+from db_engine.migrations import apply_migrations
+from ingest_engine.ingest_driver import Driver
+
+logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
+
+
+def reconcile_crosswalk(db_interface, driver, fd_comp_id=2021, fls_comp_id=2, season='2019-2020'):
+    """
+    Extend the persisted crosswalk with any team / competition ids it doesn't know yet
+    Ids already in the crosswalk are paired by lookup, only new names go through the fuzzy matcher
+    :param db_interface: DBInterface used to load and persist the crosswalk
+    :param driver: Driver whose sources are reconciled
+    :param fd_comp_id: football-data id of the competition whose teams are reconciled
+    :param fls_comp_id: FLS id of the same competition
+    :param season: season the teams are requested for
+    :return: crosswalk counters of the run
+    :rtype: dict
+    """
+    driver.crosswalk = db_interface.load_crosswalk()
+    driver.request_competitions()
+    driver.request_teams(fd_comp_id=fd_comp_id, fls_comp_id=fls_comp_id, season=season)
+
+    stats = driver.crosswalk.stats()
+    saved = db_interface.save_crosswalk(crosswalk=driver.crosswalk)
+    logging.info(f'Crosswalk - {saved} new mappings saved, {stats}')
+    return stats
+
+
+if __name__ == "__main__":
+    db = create_engine(os.getenv('POSTGRES_CREDS'))
+    apply_migrations(engine=db)
+    reconcile_crosswalk(db_interface=DBInterface(db=db), driver=Driver())
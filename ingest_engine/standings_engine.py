@@ -0,0 +1,147 @@
+from collections import Counter, defaultdict
+
+from ingest_engine.cons import Standings, Match
+from ingest_engine.player_resolver import normalize_name
+
+TOTAL = 'TOTAL'
+HOME = 'HOME'
+AWAY = 'AWAY'
+STANDINGS_TYPES = [TOTAL, HOME, AWAY]
+
+# Fields compared against the stored football-data snapshots
+ENTRY_FIELDS = [Standings.POSITION, Standings.GAMES_PLAYED, Standings.GAMES_WON, Standings.GAMES_DRAWN,
+                Standings.GAMES_LOST, Standings.POINTS, Standings.GOALS_FOR, Standings.GOALS_AGAINST,
+                Standings.GOAL_DIFFERENCE]
+
+
+def result_record(scored, conceded):
+    """
+    :param scored: goals scored by the team
+    :param conceded: goals conceded by the team
+    :return: the match as a standings record of the team
+    :rtype: Counter
+    """
+    outcome = Standings.GAMES_WON if scored > conceded else \
+        Standings.GAMES_DRAWN if scored == conceded else Standings.GAMES_LOST
+    return Counter({
+        Standings.GAMES_PLAYED: 1,
+        outcome: 1,
+        Standings.POINTS: {Standings.GAMES_WON: 3, Standings.GAMES_DRAWN: 1}.get(outcome, 0),
+        Standings.GOALS_FOR: scored,
+        Standings.GOALS_AGAINST: conceded,
+    })
+
+
+class StandingsEngine(object):
+    """
+    League tables (TOTAL / HOME / AWAY) derived from the full time scores of finished matches
+    Every match is added once to the running totals and to the totals of its match day, so tables at any earlier
+    match day are a sum of at most one record per match day and team instead of a replay of the season
+    """
+    def __init__(self):
+        self.match_ids = set()
+        self.teams = {}  # team key -> (team name, football-data team id)
+        self.totals = {standings_type: defaultdict(Counter) for standings_type in STANDINGS_TYPES}
+        # match day -> standings type -> team key -> record of the matches of that match day
+        self.match_days = defaultdict(lambda: {standings_type: defaultdict(Counter)
+                                               for standings_type in STANDINGS_TYPES})
+
+    def __len__(self):
+        return len(self.match_ids)
+
+    @staticmethod
+    def team_key(name, fd_id=None):
+        return fd_id if fd_id is not None else normalize_name(name)
+
+    @property
+    def last_match_day(self):
+        return max(self.match_days, default=None)
+
+    def add_match(self, match, home_fd_id=None, away_fd_id=None):
+        """
+        Add the result of a match to the tables
+        :param match: match record with id, match day, home / away team and full time scores
+        :param home_fd_id: football-data id of the home team, teams are keyed by name when unknown
+        :param away_fd_id: football-data id of the away team
+        :return: whether the tables changed, unfinished and already added matches are ignored
+        :rtype: bool
+        """
+        home_score, away_score = match[Match.FULL_TIME_HOME_SCORE], match[Match.FULL_TIME_AWAY_SCORE]
+        if match[Match.ID] in self.match_ids or home_score is None or away_score is None:
+            return False
+
+        self.match_ids.add(match[Match.ID])
+        match_day = self.match_days[match[Match.MATCHDAY] or 0]
+        for name, fd_id, side, scored, conceded in [(match[Match.HOME_TEAM], home_fd_id, HOME, home_score, away_score),
+                                                    (match[Match.AWAY_TEAM], away_fd_id, AWAY, away_score, home_score)]:
+            team = self.team_key(name, fd_id)
+            self.teams.setdefault(team, (name, fd_id))
+            record = result_record(scored, conceded)
+            for standings_type in [TOTAL, side]:
+                self.totals[standings_type][team].update(record)
+                match_day[standings_type][team].update(record)
+
+        return True
+
+    def table(self, match_day=None, standings_type=TOTAL):
+        """
+        League table, ordered by points, goal difference then goals scored
+        :param match_day: table after this match day, the latest one by default
+        :param standings_type: TOTAL | HOME | AWAY
+        :return: standings entries in the StandingsEntry record format
+        :rtype: list
+        """
+        if match_day is None:
+            records = self.totals[standings_type]
+        else:
+            records = defaultdict(Counter)
+            for day, day_records in self.match_days.items():
+                if day <= match_day:
+                    for team, record in day_records[standings_type].items():
+                        records[team].update(record)
+
+        entries = []
+        for team, (name, fd_id) in self.teams.items():
+            record = records.get(team, Counter())
+            entries.append({
+                Standings.TEAM_NAME: name,
+                Standings.FOOTBALL_DATA_TEAM_ID: fd_id,
+                **{field: record[field] for field in [Standings.GAMES_PLAYED, Standings.GAMES_WON,
+                                                      Standings.GAMES_DRAWN, Standings.GAMES_LOST, Standings.POINTS,
+                                                      Standings.GOALS_FOR, Standings.GOALS_AGAINST]},
+                Standings.GOAL_DIFFERENCE: record[Standings.GOALS_FOR] - record[Standings.GOALS_AGAINST],
+            })
+
+        entries.sort(key=lambda entry: (-entry[Standings.POINTS], -entry[Standings.GOAL_DIFFERENCE],
+                                        -entry[Standings.GOALS_FOR], entry[Standings.TEAM_NAME]))
+        for position, entry in enumerate(entries, start=1):
+            entry[Standings.POSITION] = position
+
+        return entries
+
+    def validate(self, entries, match_day=None, standings_type=TOTAL):
+        """
+        Compare the derived table with a stored football-data snapshot
+        :param entries: StandingsEntry records of the snapshot
+        :param match_day: match day of the snapshot
+        :param standings_type: type of the snapshot
+        :return: teams whose derived row differs, with the (snapshot, derived) values of every differing field
+        :rtype: list
+        """
+        # Rows are paired on the football-data id, or on the team name when either side doesn't have it
+        derived = {}
+        for entry in self.table(match_day=match_day, standings_type=standings_type):
+            derived[normalize_name(entry[Standings.TEAM_NAME])] = entry
+            if entry[Standings.FOOTBALL_DATA_TEAM_ID] is not None:
+                derived[entry[Standings.FOOTBALL_DATA_TEAM_ID]] = entry
+
+        mismatches = []
+        for entry in entries:
+            derived_entry = derived.get(entry[Standings.FOOTBALL_DATA_TEAM_ID]) or \
+                derived.get(normalize_name(entry[Standings.TEAM_NAME])) or {}
+            fields = {field: (entry[field], derived_entry.get(field)) for field in ENTRY_FIELDS
+                      if entry[field] != derived_entry.get(field)}
+            if fields:
+                mismatches.append({Standings.TEAM_NAME: entry[Standings.TEAM_NAME], **fields})
+
+        return mismatches
@@ -0,0 +1,35 @@
+import os
+import logging
+
+from sqlalchemy import create_engine
+
+from db_engine.db_interface import DBInterface
+from db_engine.migrations import apply_migrations
+from ingest_engine.cons import Standings as STANDINGS
+
+logging.basicConfig(format='%(asctime)s - %(message)s', level=logging.INFO)
+
+
+def validate_standings(db_interface, fd_comp_id=2021):
+    """
+    Compare the standings derived from the stored match results with the latest football-data standings
+    :param db_interface: DBInterface holding the matches and standings
+    :param fd_comp_id: football-data id of the competition whose standings are validated
+    :return: standings type -> teams whose derived row differs from the stored one
+    :rtype: dict
+    """
+    mismatches = db_interface.validate_standings(fd_competition_id=fd_comp_id)
+    for standings_type, teams in mismatches.items():
+        if teams:
+            logging.warning(f'Standings {standings_type} - {len(teams)} teams differ from the match results: '
+                            f'{[team[STANDINGS.TEAM_NAME] for team in teams]}')
+        else:
+            logging.info(f'Standings {standings_type} - match results agree with the stored standings')
+
+    return mismatches
+
+
+if __name__ == "__main__":
+    db = create_engine(os.getenv('POSTGRES_CREDS'))
+    apply_migrations(engine=db)
+    validate_standings(db_interface=DBInterface(db=db))
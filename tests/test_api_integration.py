@@ -0,0 +1,78 @@
+import unittest
+from threading import Lock
+from time import sleep, time
+from unittest import mock
+from ingest_engine.api_integration import ApiIntegration, ResponseCache, fan_out
+
+
+class ApiIntegrationTest(unittest.TestCase):
+    def setUp(self):
+        self.api = ApiIntegration()
+
+    def tearDown(self):
+        self.api.session.close()
+
+    def testFanOutKeepsOrder(self):
+        def slow_double(x):
+            sleep(0.01 * (5 - x))
+            return x * 2
+
+        kwargs_list = [{'x': x} for x in range(5)]
+        self.assertEqual(fan_out(slow_double, kwargs_list, workers=5), [0, 2, 4, 6, 8])
+        self.assertEqual(fan_out(slow_double, kwargs_list, workers=1), [0, 2, 4, 6, 8])
+        self.assertEqual(fan_out(slow_double, [], workers=5), [])
+
+    def testProviderConcurrencyLimit(self):
+        in_flight = []
+        peak = []
+        lock = Lock()
+
+        def fake_get(url):
+            with lock:
+                in_flight.append(url)
+                peak.append(len(in_flight))
+            sleep(0.02)
+            with lock:
+                in_flight.remove(url)
+
+        with mock.patch.object(self.api.session, 'get', side_effect=fake_get):
+            fan_out(self.api.get, [{'url': str(i)} for i in range(30)], workers=30)
+
+        self.assertLessEqual(max(peak), ApiIntegration.max_concurrency)
+
+    def testBackOff(self):
+        self.api.back_off(0.2)
+        start = time()
+        with mock.patch.object(self.api.session, 'get', return_value=None):
+            self.api.get('http://localhost')
+        self.assertGreaterEqual(time() - start, 0.15)
+
+    def testResponseCache(self):
+        cache = ResponseCache(ttl=60)
+        loader = mock.Mock(return_value={'teams': []})
+        fan_out(cache.get_or_load, [{'key': 'bootstrap-static/', 'loader': loader}] * 20, workers=20)
+        loader.assert_called_once()
+        self.assertEqual(cache.stats(), {'hits': 19, 'misses': 1, 'entries': 1})
+
+        cache.invalidate('bootstrap-static/')
+        cache.get_or_load('bootstrap-static/', loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def testResponseCacheExpiry(self):
+        cache = ResponseCache(ttl=0)
+        loader = mock.Mock(return_value={'teams': []})
+        cache.get_or_load('bootstrap-static/', loader)
+        cache.get_or_load('bootstrap-static/', loader)
+        self.assertEqual(loader.call_count, 2)
+
+        # Failed requests are not cached
+        failed = mock.Mock(return_value={})
+        cache.get_or_load('fixtures/', failed)
+        cache.get_or_load('fixtures/', failed)
+        self.assertEqual(failed.call_count, 2)
+
+    def testCachedGet(self):
+        with mock.patch.object(self.api, 'perform_get', return_value={'events': []}) as perform_get:
+            for _ in range(3):
+                self.assertEqual(self.api.cached_get('bootstrap-static/'), {'events': []})
+        perform_get.assert_called_once_with(built_uri='bootstrap-static/')
@@ -178,6 +178,10 @@ class ApiInterfaceTest(unittest.TestCase):
         self.assertEqual(error_result[API.MESSAGE], API_ERROR.FILTER_PROBLEM_400)
         self.assertEqual(error_result[API.STATUS_CODE], 400)
 
+        error_result = self.api.get('http://api.localhost:5000/v1/match?id=$lt5').get_json()
+        self.assertEqual(error_result[API.MESSAGE], API_ERROR.FILTER_PROBLEM_400)
+        self.assertEqual(error_result[API.STATUS_CODE], 400)
+
         error_result = self.api.get('http://api.localhost:5000/v1/match/all?hdas=1').get_json()
         self.assertEqual(error_result[API.MESSAGE], API_ERROR.RESOURCE_NOT_FOUND_404)
         self.assertEqual(error_result[API.STATUS_CODE], 404)
@@ -395,6 +399,16 @@ class ApiInterfaceTest(unittest.TestCase):
         self.assertEqual(error_result[API.MESSAGE], API_ERROR.MISSING_FILTER_400)
         self.assertEqual(error_result[API.STATUS_CODE], 400)
 
+    def testLeaderboardUrl(self):
+        error_result = self.api.get('http://api.localhost:5000/v1/leaderboard?stat=goals_scored&fantasy_price=$lt8')\
+            .get_json()
+        self.assertEqual(error_result[API.MESSAGE], API_ERROR.FILTER_PROBLEM_400)
+        self.assertEqual(error_result[API.STATUS_CODE], 400)
+
+        error_result = self.api.get('http://api.localhost:5000/v1/leaderboard?stat=played_at_home').get_json()
+        self.assertEqual(error_result[API.MESSAGE], API_ERROR.INVALID_STAT_400)
+        self.assertEqual(error_result[API.STATUS_CODE], 400)
+
     def filter_test(self, filter_str, filter_val, endpoint):
         filter_result = self.api.get(f'http://api.localhost:5000/v1/{endpoint}?{filter_str}={filter_val}').get_json()
         if not isinstance(filter_result, list):
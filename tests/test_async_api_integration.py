@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+from collections import Counter
+from threading import Thread
+from time import time
+from unittest import mock
+
+from aiohttp import web
+
+from ingest_engine.api_integration import ApiIntegration
+from ingest_engine.async_api_integration import AsyncApiIntegration, AsyncFootballData, FETCH_ATTEMPTS, \
+    async_fan_out
+from ingest_engine.cons import Competition
+from ingest_engine.http_cache import HttpCache
+
+
+class SlowProvider(AsyncApiIntegration, ApiIntegration):
+    def __init__(self, uri, http_cache=None):
+        super().__init__(http_cache=http_cache)
+        self.uri = uri
+
+    def request_pair(self, x):
+        return [self.perform_get(built_uri=f'{self.uri}slow/{x}')['x'],
+                self.perform_get(built_uri=f'{self.uri}slow/{x + 1}')['x']]
+
+    def request_range(self, n):
+        return [document['x'] for document in self.perform_get_many([f'{self.uri}slow/{x}' for x in range(n)])]
+
+
+class AsyncApiIntegrationTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hits = Counter()
+        cls.limited = set()
+
+        async def slow(request):
+            cls.hits[request.path] += 1
+            await asyncio.sleep(0.1)
+            return web.json_response({'x': int(request.match_info['x'])})
+
+        async def tagged(request):
+            cls.hits[request.path] += 1
+            if request.headers.get('If-None-Match') == '"v1"':
+                return web.Response(status=304)
+            return web.json_response({'x': int(request.match_info['x'])}, headers={'ETag': '"v1"'})
+
+        async def competitions(request):
+            cls.hits[request.path] += 1
+            if request.path in cls.limited or cls.hits[request.path] == 1:
+                return web.json_response({'errorCode': 429, 'message': 'Wait 0 seconds.'})
+            return web.json_response({'competitions': [{'id': 2021, 'name': 'Premier League', 'code': 'PL',
+                                                        'area': {'name': 'England'}}]})
+
+        app = web.Application()
+        app.add_routes([web.get('/slow/{x}', slow), web.get('/tagged/{x}', tagged),
+                        web.get('/v2/competitions/{id}', competitions)])
+        runner = web.AppRunner(app)
+        cls.loop = asyncio.new_event_loop()
+        cls.loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, 'localhost', 0)
+        cls.loop.run_until_complete(site.start())
+        cls.uri = f'http://localhost:{runner.addresses[0][1]}/'
+        cls.runner = runner
+        Thread(target=cls.loop.run_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        asyncio.run_coroutine_threadsafe(cls.runner.cleanup(), cls.loop).result()
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+
+    def setUp(self):
+        self.fd = AsyncFootballData(api_key='test')
+        self.fd.rate_limiter = None
+        self.fd.uri = self.uri + 'v2/'
+
+    def tearDown(self):
+        self.fd.session.close()
+
+    def testCallsOverlap(self):
+        provider = SlowProvider(uri=self.uri)
+        start = time()
+        result = async_fan_out(provider.request_pair, [{'x': x} for x in range(20)])
+
+        # 40 GETs of 0.1s, max_concurrency at a time
+        self.assertLess(time() - start, 2)
+        self.assertEqual(result, [[x, x + 1] for x in range(20)])
+        provider.session.close()
+
+    def testPerformGetMany(self):
+        provider = SlowProvider(uri=self.uri)
+        start = time()
+        self.assertEqual(provider.request_range(n=8), list(range(8)))
+        self.assertLess(time() - start, 0.5)  # A single round of downloads
+        provider.session.close()
+
+    def testHttpCache(self):
+        http_cache = HttpCache(path=':memory:', max_age=60)
+        provider = SlowProvider(uri=self.uri, http_cache=http_cache)
+        for _ in range(2):
+            self.assertEqual(provider.request_range(n=3), [0, 1, 2])
+        self.assertEqual(http_cache.stats()['fresh_hits'], 3)
+
+        # Stale entries are revalidated with the stored ETag, the 304 replays the stored body
+        http_cache.max_age = 0
+        url = f'{self.uri}tagged/7'
+        for _ in range(2):
+            self.assertEqual(async_fan_out(provider.perform_get_many, [{'built_uris': [url]}]), [[{'x': 7}]])
+        self.assertEqual(self.hits['/tagged/7'], 2)
+        self.assertEqual(http_cache.stats()['revalidated'], 1)
+        provider.session.close()
+
+    def testRetryAfterRateLimit(self):
+        async def request():
+            async with self.fd:
+                return await self.fd.request_competitions_async(competition_id=1)
+
+        with mock.patch.object(self.fd, 'back_off') as back_off:
+            result = asyncio.run(request())
+
+        self.assertEqual(result[0][Competition.FOOTBALL_DATA_API_ID], 2021)
+        back_off.assert_called_once_with(10)
+        self.assertEqual(self.hits['/v2/competitions/1'], 2)
+
+    def testFetchAttempts(self):
+        self.limited.add('/v2/competitions/2')
+        with mock.patch.object(self.fd, 'back_off'):
+            self.assertEqual(async_fan_out(self.fd.request_competitions, [{'competition_id': 2}]), [[]])
+        self.assertEqual(self.hits['/v2/competitions/2'], FETCH_ATTEMPTS)
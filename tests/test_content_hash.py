@@ -0,0 +1,32 @@
+import unittest
+from datetime import datetime
+from ingest_engine.cons import Match, Player
+from ingest_engine.content_hash import content_hash, tag_content_hash
+
+
+MATCH = {Match.FOOTBALL_DATA_ID: 264341, Match.HOME_TEAM: 'Liverpool FC', Match.AWAY_TEAM: 'Norwich City FC',
+         Match.FULL_TIME_HOME_SCORE: 4, Match.FULL_TIME_AWAY_SCORE: 1, Match.START_TIME: datetime(2019, 8, 9, 19)}
+
+
+class ContentHashTest(unittest.TestCase):
+    def testKeyOrder(self):
+        reordered = dict(reversed(list(MATCH.items())))
+        self.assertEqual(content_hash(MATCH), content_hash(reordered))
+        self.assertEqual(len(content_hash(MATCH)), 32)
+
+    def testIgnoredFields(self):
+        tagged = {**MATCH, Match.ID: 7, Match.CONTENT_HASH: 'stale'}
+        self.assertEqual(content_hash(MATCH), content_hash(tagged))
+
+    def testContentChange(self):
+        self.assertNotEqual(content_hash(MATCH), content_hash({**MATCH, Match.FULL_TIME_AWAY_SCORE: 2}))
+        self.assertNotEqual(content_hash(MATCH), content_hash({**MATCH, Match.START_TIME: datetime(2019, 8, 10)}))
+
+    def testTagContentHash(self):
+        players = tag_content_hash([{Player.NAME: 'Mohamed Salah'}, {Player.NAME: 'Sadio Mané'}])
+        self.assertEqual(len({player[Player.CONTENT_HASH] for player in players}), 2)
+        self.assertEqual(players[0][Player.CONTENT_HASH], content_hash(players[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
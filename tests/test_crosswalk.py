@@ -0,0 +1,58 @@
+import unittest
+from ingest_engine.crosswalk import CrosswalkResolver
+from ingest_engine.cons import Crosswalk, Team
+from ingest_engine.ingest_driver import str_comparator
+
+
+class CrosswalkTest(unittest.TestCase):
+    def setUp(self):
+        self.crosswalk = CrosswalkResolver(entries=[{
+            Crosswalk.ENTITY_TYPE: Crosswalk.TEAM,
+            Crosswalk.SOURCE: Crosswalk.FLS,
+            Crosswalk.SOURCE_ID: 1,
+            Crosswalk.CANONICAL_ID: 64
+        }])
+        self.fd_teams = {64: {Team.NAME: 'Liverpool FC'}, 65: {Team.NAME: 'Manchester City FC'},
+                         66: {Team.NAME: 'Manchester United FC'}}
+        self.fls_teams = {1: {Team.NAME: 'Pool'}, 2: {Team.NAME: 'Manchester United'},
+                          3: {Team.NAME: 'Manchester City'}, 4: {Team.NAME: 'Barcelona'}}
+
+    def tearDown(self):
+        pass
+
+    def reconcile(self):
+        return self.crosswalk.reconcile(entity_type=Crosswalk.TEAM, source=Crosswalk.FLS, anchors=self.fd_teams,
+                                        records=self.fls_teams, name=lambda team: team[Team.NAME],
+                                        score=lambda fd, fls: str_comparator(fd[Team.NAME], fls[Team.NAME]))
+
+    def testReconcile(self):
+        paired = self.reconcile()
+        # Known id is paired through the crosswalk even though the names are nothing alike
+        self.assertEqual(paired[64][Team.NAME], 'Pool')
+        self.assertEqual(paired[65][Team.NAME], 'Manchester City')
+        self.assertEqual(paired[66][Team.NAME], 'Manchester United')
+        self.assertEqual(self.crosswalk.canonical_id(Crosswalk.TEAM, Crosswalk.FLS, 3), 65)
+        self.assertEqual(self.crosswalk.source_id(Crosswalk.TEAM, Crosswalk.FLS, 66), 2)
+        self.assertEqual(len(self.crosswalk.new_entries), 2)
+        self.assertEqual(self.crosswalk.stats()['unmatched'], 1)
+
+    def testMappedIdsAreNotRepaired(self):
+        del self.fd_teams[64]
+        self.fls_teams[1] = {Team.NAME: 'Manchester City'}
+        paired = self.reconcile()
+        # FLS team 1 stays mapped onto Liverpool rather than being scored against the other anchors
+        self.assertEqual(paired[65][Team.NAME], 'Manchester City')
+        self.assertEqual(self.crosswalk.canonical_id(Crosswalk.TEAM, Crosswalk.FLS, 1), 64)
+        self.assertNotIn(1, [entry[Crosswalk.SOURCE_ID] for entry in self.crosswalk.new_entries])
+
+    def testOnlyNewNamesAreScored(self):
+        self.reconcile()
+        self.crosswalk.new_entries = []
+        scored = []
+        self.crosswalk.reconcile(entity_type=Crosswalk.TEAM, source=Crosswalk.FLS, anchors=self.fd_teams,
+                                 records=self.fls_teams, name=lambda team: team[Team.NAME],
+                                 score=lambda fd, fls: scored.append(fls[Team.NAME]) or 0)
+
+        # Every anchor is already mapped so the fuzzy matcher is never called
+        self.assertEqual(scored, [])
+        self.assertEqual(self.crosswalk.new_entries, [])
@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+from db_engine.db_interface import encode_cursor, decode_cursor, keyset_paginate, KEYSETS, projection, to_records, \
+    InvalidCursor, InvalidFields, InvalidSort, DBInterface
+from db_engine.db_driver import Match, Player, FantasyWeekStats
+
+
+class DBInterfaceTest(unittest.TestCase):
+    def testCursor(self):
+        cursor = encode_cursor(['2019-08-10T19:00:00', 42])
+        self.assertNotIn('=', cursor)
+        self.assertEqual(decode_cursor(cursor), ['2019-08-10T19:00:00', 42])
+
+        for invalid in ['zzz', encode_cursor([]), 'e30']:  # e30 is {}
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(invalid)
+
+    def testKeysetPaginate(self):
+        query = mock.Mock()
+        query.filter.return_value = query
+        query.add_columns.return_value.order_by.return_value.limit.return_value.all.return_value = [
+            ('m1', '2019-08-10T12:30:00', 1), ('m2', '2019-08-10T15:00:00', 7), ('m3', '2019-08-10T15:00:00', 9)]
+
+        page, next_cursor = keyset_paginate(query, keyset=KEYSETS[Match], limit=2)
+        self.assertEqual(page, [('m1',), ('m2',)])
+        self.assertEqual(decode_cursor(next_cursor), ['2019-08-10T15:00:00', 7])
+        query.add_columns.return_value.order_by.return_value.limit.assert_called_with(3)  # Never more than a page + 1
+
+        # Following the cursor seeks past the last row of the previous page
+        keyset_paginate(query, keyset=KEYSETS[Match], limit=2, cursor=next_cursor)
+        query.filter.assert_called_once()
+        with self.assertRaises(InvalidCursor):
+            keyset_paginate(query, keyset=KEYSETS[Match], limit=2, cursor=encode_cursor([7]))
+
+        query.add_columns.return_value.order_by.return_value.limit.return_value.all.return_value = [('m1', None, 1)]
+        self.assertEqual(keyset_paginate(query, keyset=KEYSETS[Match], limit=2), ([('m1',)], None))
+
+    def testProjection(self):
+        names, columns = projection(Player, ['name', 'team', 'fantasy_price'])
+        self.assertEqual(names, ['name', 'team', 'fantasy_price'])
+        self.assertEqual(columns, [Player.name, Player.team, Player.fantasy_price])
+
+        # Attribute names, not column names, are the fields
+        names, _ = projection(FantasyWeekStats)
+        self.assertEqual(names[:3], ['id', 'player_id', 'season'])
+        self.assertNotIn('matches', projection(Player)[0])
+
+        with self.assertRaises(InvalidFields):
+            projection(Player, ['name', '_sa_instance_state'])
+
+        self.assertEqual(to_records(['id', 'name'], [(1, 'Salah')]), {'id': 1, 'name': 'Salah'})
+        self.assertEqual(to_records(['id', 'name'], [(1, 'Salah')], as_list=True), [{'id': 1, 'name': 'Salah'}])
+
+    def testLatestStandings(self):
+        db = mock.Mock()
+        rows = db.session.query.return_value.filter.return_value.order_by.return_value
+        table = [{'position': position, 'team_name': f'Team {position}'} for position in range(1, 21)]
+        rows.__iter__ = mock.Mock(return_value=iter([({'type': 'TOTAL', 'match_day': 6, 'table': table},),
+                                                     ({'type': 'HOME', 'match_day': 6, 'table': table},)]))
+
+        latest = DBInterface(db=db).get_latest_standings(fd_competition_id=2021, limit=3)
+        self.assertEqual([standing['type'] for standing in latest], ['TOTAL', 'HOME'])
+        self.assertEqual([entry['position'] for entry in latest[0]['table']], [1, 2, 3])
+        self.assertEqual(len(table), 20)  # Stored summary left untouched
+
+        rows.__iter__ = mock.Mock(return_value=iter([({'type': 'TOTAL', 'match_day': 6, 'table': table},)]))
+        self.assertEqual(DBInterface(db=db).get_latest_standings(fd_competition_id=2021)['type'], 'TOTAL')
+
+    def testPlayerAggregates(self):
+        db = mock.Mock()
+        page = db.session.query.return_value.select_from.return_value.join.return_value.filter.return_value\
+            .add_columns.return_value.order_by.return_value.limit.return_value
+        page.all.return_value = [(1, 120, 'Mohamed Salah', 'Salah', 'Liverpool FC', 'Midfielder', -120, 1)]
+
+        result, next_cursor = DBInterface(db=db).get_player_aggregates(fields=['player_id', 'fantasy_points'])
+        self.assertEqual(result, [{'player_id': 1, 'fantasy_points': 120, 'name': 'Mohamed Salah', 'web_name': 'Salah',
+                                   'team': 'Liverpool FC', 'position': 'Midfielder'}])
+        self.assertIsNone(next_cursor)
+
+        # Current season totals unless filtered otherwise
+        filters = db.session.query.return_value.select_from.return_value.join.return_value.filter.call_args[0]
+        self.assertEqual([str(condition) for condition in filters],
+                         ['player_aggregate.season = :season_1', 'player_aggregate.weeks = :weeks_1'])
+
+        with self.assertRaises(InvalidSort):
+            DBInterface(db=db).get_player_aggregates(sort='-name')
+
+    def testLeaderboard(self):
+        with self.assertRaises(InvalidSort):
+            DBInterface(db=mock.Mock()).get_leaderboard(stat='name')
@@ -0,0 +1,406 @@
+"""
+DBInterface reads and writes checked against a throwaway local Postgres given by POSTGRES_TEST_CONNECTION_STR,
+all tables are dropped!
+
+    POSTGRES_TEST_CONNECTION_STR=postgresql://localhost/trackr_test python -m pytest tests/test_db_postgres.py
+"""
+import os
+import unittest
+from datetime import date
+
+TEST_DB = os.getenv('POSTGRES_TEST_CONNECTION_STR')
+
+
+def match_record(fd_id, match_day, home, away, home_score=None, away_score=None, status=None):
+    return {'match_fd_id': fd_id, 'fls_match_id': fd_id, 'fls_competition_id': 2, 'season_start_date': '2019-08-09',
+            'match_day': match_day, 'home_team': home, 'away_team': away, 'home_team_fls_id': len(home),
+            'away_team_fls_id': len(away), 'ft_home_score': home_score, 'ft_away_score': away_score,
+            'status': status or ('SCHEDULED' if home_score is None else 'FINISHED')}
+
+
+def team_record(stadium='Anfield'):
+    return {'fantasy_id': 10, 'team_fd_id': 64, 'name': 'Liverpool FC', 'country': 'England', 'short_name': 'Liverpool',
+            'acronym': 'LIV', 'crest_url': 'https://crests.football-data.org/64.svg', 'club_colours': 'Red / White',
+            'stadium': stadium, 'stadium_lat': 53.43, 'stadium_long': -2.96, 'stadium_capacity': 54074,
+            'team_fls_id': 3, 'fantasy_code': 14, 'fantasy_week_strength': 4, 'active_competitions': [2021],
+            **dict.fromkeys(['fantasy_overall_home_strength', 'fantasy_overall_away_strength',
+                             'fantasy_attack_home_strength', 'fantasy_attack_away_strength',
+                             'fantasy_defence_home_strength', 'fantasy_defence_away_strength'], 1300),
+            'squad': [{'name': 'Mohamed Salah', 'fd_id': 3754, 'position': 'Attacker', 'squad_role': 'PLAYER'}]}
+
+
+def standings_record(match_day, liverpool_points):
+    def entry(position, team, fd_team_id, points):
+        return {'position': position, 'team_name': team, 'fd_team_id': fd_team_id, 'games_played': match_day,
+                'games_won': points // 3, 'games_drawn': points % 3, 'games_lost': match_day - points // 3 - points % 3,
+                'points': points, 'goals_for': points, 'goals_against': 1, 'goals_difference': points - 1}
+
+    return {'standings': [{'type': standings_type, 'season': '2019', 'match_day': match_day,
+                           'table': [entry(1, 'Liverpool FC', 64, liverpool_points), entry(2, 'Arsenal FC', 57, 3)]}
+                          for standings_type in ['TOTAL', 'HOME']]}
+
+
+def history_entry(fixture_id, game_week, points, bonus=0):
+    from ingest_engine.cons import Match as MATCH, Player as PLAYER, MatchEvent as MATCH_EVENT
+    entry = dict.fromkeys([PLAYER.NUMBER_OF_GOALS, PLAYER.GOALS_CONCEDED, PLAYER.ASSISTS, PLAYER.OWN_GOALS,
+                           PLAYER.PENALTIES_SAVED, PLAYER.PENALTIES_MISSED, PLAYER.YELLOW_CARDS, PLAYER.RED_CARDS,
+                           PLAYER.SAVES, PLAYER.FANTASY_INFLUENCE, PLAYER.FANTASY_CREATIVITY, PLAYER.FANTASY_THREAT,
+                           PLAYER.FANTASY_ICT_INDEX, PLAYER.FANTASY_SEASON_VALUE, PLAYER.FANTASY_TRANSFERS_BALANCE,
+                           PLAYER.FANTASY_SELECTION_COUNT, PLAYER.FANTASY_WEEK_TRANSFERS_IN,
+                           PLAYER.FANTASY_WEEK_TRANSFERS_OUT, PLAYER.FANTASY_WEEK_BONUS], 0)
+    return {**entry, MATCH.FANTASY_MATCH_ID: fixture_id, MATCH.FANTASY_GAME_WEEK: game_week,
+            MATCH_EVENT.CLEAN_SHEET: False, PLAYER.PLAYED_AT_HOME: True, PLAYER.MINUTES_PLAYED: 90,
+            PLAYER.FANTASY_WEEK_POINTS: points, PLAYER.FANTASY_WEEK_BONUS: bonus}
+
+
+@unittest.skipIf(not TEST_DB, 'POSTGRES_TEST_CONNECTION_STR not set')
+class PostgresTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('POSTGRES_CONNECTION_STR', TEST_DB)
+        from sqlalchemy import create_engine
+        from db_engine.db_driver import db
+        from db_engine.migrations import apply_migrations
+
+        cls.engine = create_engine(TEST_DB)
+        db.metadata.drop_all(bind=cls.engine)
+        apply_migrations(engine=cls.engine)
+
+    @classmethod
+    def tearDownClass(cls):
+        from db_engine.db_driver import db
+        db.metadata.drop_all(bind=cls.engine)
+
+    def setUp(self):
+        from db_engine.db_driver import db
+        from db_engine.db_interface import DBInterface
+        tables = ', '.join(table.name for table in db.metadata.sorted_tables)
+        self.execute(f'TRUNCATE {tables} RESTART IDENTITY CASCADE')
+        self.db_interface = DBInterface(db=self.engine)
+
+    def tearDown(self):
+        self.db_interface.db.session.close()
+
+    def seed_competition(self):
+        self.execute("INSERT INTO competition (id, name, location, fd_api_id, fls_api_id) "
+                     "VALUES (1, 'Premier League', 'England', 2021, 2)")
+
+    def seed_player_stats(self):
+        """
+        Three players over game weeks 1-3 of 201920, goals_scored / own_goals per match:
+        Salah 2/0, 0/1, 1/0 - Mané 1/1, 1/0, 0/0 - Aubameyang 0/0 in game week 1 and 3/0 in game week 3
+        """
+        self.execute("INSERT INTO player (id, name, team, position, fd_id) VALUES "
+                     "(1, 'Mohamed Salah', 'Liverpool FC', 'Midfielder', 1), "
+                     "(2, 'Sadio Mané', 'Liverpool FC', 'Midfielder', 2), "
+                     "(3, 'Pierre-Emerick Aubameyang', 'Arsenal FC', 'Attacker', 3)")
+        self.execute("INSERT INTO match (id, match_fd_id, fls_match_id, fls_competition_id, home_team_fls_id, "
+                     "away_team_fls_id, home_team, away_team, fantasy_game_week) VALUES "
+                     "(1, 1, 1, 2, 1, 2, 'Liverpool FC', 'Arsenal FC', 1), "
+                     "(2, 2, 2, 2, 1, 3, 'Liverpool FC', 'Norwich City FC', 2), "
+                     "(3, 3, 3, 2, 2, 1, 'Arsenal FC', 'Liverpool FC', 3)")
+        self.execute('INSERT INTO fantasy_week_stats (player_id, season, game_week, fantasy_week_points) VALUES '
+                     '(1, 201920, 1, 12), (1, 201920, 2, 3), (1, 201920, 3, 6), (2, 201920, 1, 8), '
+                     '(2, 201920, 2, 7), (2, 201920, 3, 2), (3, 201920, 1, 2), (3, 201920, 3, 15)')
+        self.execute('INSERT INTO match_stats (player_id, match_id, season, fantasy_match_id, goals_scored, own_goals, '
+                     'minutes_played) VALUES (1, 1, 201920, 1, 2, 0, 90), (1, 2, 201920, 2, 0, 1, 90), '
+                     '(1, 3, 201920, 3, 1, 0, 90), (2, 1, 201920, 1, 1, 1, 90), (2, 2, 201920, 2, 1, 0, 90), '
+                     '(2, 3, 201920, 3, 0, 0, 0), (3, 1, 201920, 1, 0, 0, 90), (3, 3, 201920, 3, 3, 0, 90)')
+
+    def execute(self, statement, **parameters):
+        from sqlalchemy import text
+        with self.engine.begin() as conn:
+            return conn.execute(text(statement), parameters).all() if statement.startswith('SELECT') \
+                else conn.execute(text(statement), parameters)
+
+    def testMigrationDuplicates(self):
+        from db_engine.migrations import apply_migrations
+        # Databases created before the unique indexes may hold stats ingested twice
+        for table, index in [('match_stats', 'match_stats_player_season_fixture_uq'),
+                             ('fantasy_week_stats', 'fantasy_week_stats_player_season_week_uq')]:
+            self.execute(f'ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {index}')
+            self.execute(f'DROP INDEX IF EXISTS {index}')
+        self.execute("INSERT INTO player (id, name, team, fd_id) VALUES (1, 'Mohamed Salah', 'Liverpool FC', 1)")
+        self.execute('INSERT INTO match_stats (player_id, season, fantasy_match_id, goals_scored) '
+                     'VALUES (1, 201920, 1, 2), (1, 201920, 1, 5), (1, 201920, 2, 1)')
+        self.execute('INSERT INTO fantasy_week_stats (player_id, season, game_week, fantasy_week_points) '
+                     'VALUES (1, 201920, 1, 12), (1, 201920, 1, 3)')
+
+        apply_migrations(engine=self.engine)
+        self.assertEqual(self.execute('SELECT fantasy_match_id, goals_scored FROM match_stats ORDER BY id'),
+                         [(1, 2), (2, 1)])
+        self.assertEqual(self.execute('SELECT fantasy_week_points FROM fantasy_week_stats'), [(12,)])
+        self.assertEqual(self.execute("SELECT to_regclass('match_stats_player_season_fixture_uq') IS NOT NULL, "
+                                      "to_regclass('fantasy_week_stats_player_season_week_uq') IS NOT NULL"),
+                         [(True, True)])
+
+    def testTrigramMigrationsFailure(self):
+        from unittest import mock
+        from db_engine.migrations import apply_migrations, MIGRATIONS
+        # Same failure as a server without pg_trgm or a role that may not create extensions
+        failing = ['CREATE EXTENSION IF NOT EXISTS no_such_extension']
+        with mock.patch('db_engine.migrations.TRIGRAM_MIGRATIONS', failing), self.assertLogs(level='WARNING') as logs:
+            self.assertEqual(apply_migrations(engine=self.engine), len(MIGRATIONS))
+
+        self.assertIn('no_such_extension', logs.output[0])
+        self.assertEqual(self.execute("SELECT to_regclass('match_stats_player_season_fixture_uq') IS NOT NULL"),
+                         [(True,)])
+
+    def testBackfillFantasyHistory(self):
+        from db_engine.migrations import apply_migrations
+        from ingest_engine.cons import Player, CURRENT_SEASON
+        from ingest_engine.fantasy_api import load_historical_gameweeks, BACKFILL_CSV_COLUMNS
+        self.execute("INSERT INTO player (id, name, team, fd_id) VALUES (1, 'Mohamed Salah', 'Liverpool FC', 1), "
+                     "(2, 'Aaron Cresswell', 'West Ham United FC', 2)")
+        gw_df = load_historical_gameweeks(seasons=['2018-19'], columns=BACKFILL_CSV_COLUMNS)
+        gw_df = gw_df[gw_df[Player.FANTASY_WEEK] <= 2]
+
+        stats = self.db_interface.backfill_fantasy_history(gw_df, chunk_size=3)
+        self.assertEqual((stats['match_stats_inserted'], stats['week_stats_inserted']), (4, 4))
+        self.assertEqual(self.execute('SELECT player_id, season, game_week, fantasy_week_points '
+                                      'FROM fantasy_week_stats WHERE player_id = 1 ORDER BY game_week'),
+                         [(1, 201819, 1, 8), (1, 201819, 2, 9)])
+        self.assertEqual(self.execute('SELECT DISTINCT season FROM match_stats'), [(201819,)])
+
+        # Re-running only adds missing rows
+        stats = self.db_interface.backfill_fantasy_history(gw_df)
+        self.assertEqual((stats['match_stats_inserted'], stats['week_stats_inserted']), (0, 0))
+
+        # Rows from before the season column are tagged as current season, backfilled seasons are kept
+        self.execute('ALTER TABLE match_stats ALTER COLUMN season DROP NOT NULL')
+        self.execute('INSERT INTO match_stats (player_id, fantasy_match_id, goals_scored) VALUES (1, 1, 2)')
+        apply_migrations(engine=self.engine)
+        self.assertEqual(self.execute('SELECT season, count(*) FROM match_stats GROUP BY season ORDER BY season'),
+                         [(201819, 4), (CURRENT_SEASON, 1)])
+
+    def testPlayerFields(self):
+        from db_engine.db_filters import PlayerFilters
+        self.execute("INSERT INTO player (id, name, team, fd_id) VALUES (1, 'Mohamed Salah', 'Liverpool FC', 1)")
+        self.execute('INSERT INTO fantasy_week_stats (player_id, season, game_week, fantasy_week_points) '
+                     'VALUES (1, 201920, 1, 12), (1, 201920, 2, 3)')
+
+        player, _ = self.db_interface.get_player(filters=PlayerFilters(id=['1']), fields=['week_stats'])
+        self.assertEqual(list(player), ['week_stats'])
+        self.assertEqual([week['fantasy_week_points'] for week in player['week_stats']], [12, 3])
+
+        player, _ = self.db_interface.get_player(filters=PlayerFilters(id=['1']), fields=['name'])
+        self.assertEqual(player, {'name': 'Mohamed Salah'})
+
+    def testWatermarks(self):
+        from datetime import datetime
+        from ingest_engine.cons import IngestState
+        self.execute("INSERT INTO match (match_fd_id, fls_match_id, fls_competition_id, home_team_fls_id, "
+                     "away_team_fls_id, home_team, away_team, start_time, ft_home_score, ft_away_score) VALUES "
+                     "(1, 1, 2, 1, 2, 'Liverpool FC', 'Norwich City FC', '2019-08-09 19:00', 4, 1), "
+                     "(2, 2, 2, 3, 4, 'Arsenal FC', 'Burnley FC', '2019-08-17 14:00', NULL, NULL)")
+
+        # Fixtures stored before they are played don't move the default watermark
+        watermarks = self.db_interface.get_watermarks()
+        self.assertEqual(watermarks[IngestState.MATCHES][IngestState.LAST_KICKOFF], datetime(2019, 8, 9, 19))
+
+        self.db_interface.set_watermark(IngestState.PLAYERS, last_kickoff=datetime(2019, 8, 9, 19),
+                                        last_news=datetime(2019, 8, 10))
+        self.db_interface.set_watermark(IngestState.PLAYERS, last_kickoff=datetime(2019, 8, 17, 16))
+        players = self.db_interface.get_watermarks()[IngestState.PLAYERS]
+        self.assertEqual(players[IngestState.LAST_KICKOFF], datetime(2019, 8, 17, 16))
+        self.assertEqual(players[IngestState.LAST_NEWS], datetime(2019, 8, 10))
+
+    def testDerivedStandings(self):
+        self.seed_competition()
+        self.db_interface.insert_match([match_record(1, 1, 'Liverpool FC', 'Norwich City FC', 4, 1),
+                                        match_record(2, 2, 'Norwich City FC', 'Arsenal FC', 0, 2),
+                                        match_record(3, 3, 'Arsenal FC', 'Liverpool FC')])
+
+        first = self.db_interface.get_derived_standings(match_day=1, standings_type='TOTAL')
+        self.assertEqual([(entry['team_name'], entry['points']) for entry in first['table']],
+                         [('Liverpool FC', 3), ('Arsenal FC', 0), ('Norwich City FC', 0)])
+        self.assertEqual([standing['type'] for standing in self.db_interface.get_derived_standings()],
+                         ['TOTAL', 'HOME', 'AWAY'])
+
+        # Scores of a match in play are left out until it is finished
+        self.db_interface.insert_match(match_record(3, 3, 'Arsenal FC', 'Liverpool FC', 1, 0, status='IN_PLAY'))
+        self.assertEqual(self.db_interface.get_derived_standings(standings_type='TOTAL')['match_day'], 2)
+
+        # The loaded engine is kept up to date by insert_match, only the newly finished match is added
+        self.db_interface.insert_match(match_record(3, 3, 'Arsenal FC', 'Liverpool FC', 1, 1))
+        latest = self.db_interface.get_derived_standings(standings_type='TOTAL', limit=2)
+        self.assertEqual(latest['match_day'], 3)
+        self.assertEqual([(entry['team_name'], entry['points']) for entry in latest['table']],
+                         [('Liverpool FC', 4), ('Arsenal FC', 4)])  # Ahead on goal difference
+        self.assertEqual(len(self.db_interface.standings_engines[(2021, date(2019, 8, 9))]), 3)
+
+        with self.assertRaises(ValueError):
+            self.db_interface.get_derived_standings(standings_type='WEEKLY')
+
+    def testPlayerAggregates(self):
+        def aggregates():
+            return {(player_id, weeks): totals for player_id, weeks, *totals in self.execute(
+                'SELECT player_id, weeks, last_game_week, game_weeks, fantasy_points, appearances, goals_scored '
+                'FROM player_aggregate WHERE season = 201920')}
+
+        self.seed_player_stats()
+        self.assertEqual(self.db_interface.refresh_player_aggregates(seasons=[201920]), 18)
+        self.db_interface.db.session.commit()
+        stored = aggregates()
+        self.assertEqual(len(stored), 9)  # Season, 3 and 5 weeks of every player
+        self.assertEqual(stored[(1, 0)], [3, 3, 21, 3, 3])
+        self.assertEqual(stored[(2, 0)], [3, 3, 17, 2, 2])  # No appearance without minutes played
+        self.assertEqual(stored[(3, 3)], [3, 2, 17, 2, 3])
+
+        # Only the rows of the players given are deleted and rebuilt while the last game week stays put
+        self.execute('UPDATE match_stats SET goals_scored = 2 WHERE player_id = 2 AND match_id = 3')
+        self.execute('UPDATE match_stats SET goals_scored = 4 WHERE player_id = 1 AND match_id = 1')
+        self.assertEqual(self.db_interface.refresh_player_aggregates(seasons=[201920], player_ids=[2]), 6)
+        self.db_interface.db.session.commit()
+        stored = aggregates()
+        self.assertEqual((len(stored), stored[(2, 0)][-1], stored[(1, 0)][-1]), (9, 4, 3))
+
+        # A new game week moves every rolling window, all players are refreshed whichever changed
+        self.execute("INSERT INTO match (id, match_fd_id, fls_match_id, fls_competition_id, home_team_fls_id, "
+                     "away_team_fls_id, home_team, away_team, fantasy_game_week) "
+                     "VALUES (4, 4, 4, 2, 1, 4, 'Liverpool FC', 'Burnley FC', 4)")
+        self.execute('INSERT INTO fantasy_week_stats (player_id, season, game_week, fantasy_week_points) '
+                     'VALUES (1, 201920, 4, 10)')
+        self.execute('INSERT INTO match_stats (player_id, match_id, season, fantasy_match_id, goals_scored, '
+                     'minutes_played) VALUES (1, 4, 201920, 4, 1, 90)')
+        self.db_interface.refresh_player_aggregates(seasons=[201920], player_ids=[1])
+        self.db_interface.db.session.commit()
+        stored = aggregates()
+        self.assertEqual(stored[(1, 0)], [4, 4, 31, 4, 6])
+        self.assertEqual(stored[(1, 3)], [4, 3, 19, 3, 2])  # Game weeks 2-4
+        self.assertEqual(stored[(2, 3)], [4, 2, 9, 1, 3])
+        self.assertEqual(stored[(3, 3)], [4, 1, 15, 1, 3])
+        self.assertEqual(stored[(3, 5)], stored[(3, 0)])
+
+    def testLeaderboard(self):
+        self.seed_player_stats()
+        self.db_interface.refresh_player_aggregates(seasons=[201920])
+        self.db_interface.db.session.commit()
+
+        def ranking(stat, **kwargs):
+            return [(player['name'], player['rank'], player[stat])
+                    for player in self.db_interface.get_leaderboard(stat=stat, season=201920, **kwargs)]
+
+        # Season totals read from PlayerAggregate, equal totals share a rank and the top K cut breaks ties on player id
+        self.assertEqual(ranking('goals_scored'), [('Mohamed Salah', 1, 3), ('Pierre-Emerick Aubameyang', 1, 3),
+                                                   ('Sadio Mané', 3, 2)])
+        self.assertEqual(ranking('goals_scored', limit=2), [('Mohamed Salah', 1, 3),
+                                                            ('Pierre-Emerick Aubameyang', 1, 3)])
+        # A window not kept in PlayerAggregate is summed from the raw stats of the last game week
+        self.assertEqual(ranking('goals_scored', weeks=1, limit=1), [('Pierre-Emerick Aubameyang', 1, 3)])
+
+        # MatchStats columns without an aggregate are summed from the raw stats for the season or its last weeks
+        self.assertEqual(ranking('own_goals'), [('Mohamed Salah', 1, 1), ('Sadio Mané', 1, 1),
+                                                ('Pierre-Emerick Aubameyang', 3, 0)])
+        self.assertEqual(ranking('own_goals', weeks=2), [('Mohamed Salah', 1, 1), ('Sadio Mané', 2, 0),
+                                                         ('Pierre-Emerick Aubameyang', 2, 0)])
+        self.assertEqual(ranking('fantasy_points', weeks=1, limit=1), [('Pierre-Emerick Aubameyang', 1, 15)])
+
+        from db_engine.db_interface import InvalidSort
+        with self.assertRaises(InvalidSort):
+            self.db_interface.get_leaderboard(stat='played_at_home')
+
+        from db_engine.db_filters import LeaderboardFilters
+        with self.assertRaises(ValueError):  # Served as a filter problem
+            self.db_interface.get_leaderboard(stat='goals_scored', filters=LeaderboardFilters(fantasy_price=['$lt8']))
+
+    def testInsertTeamChanges(self):
+        self.assertEqual(self.db_interface.insert_team(team_record()), 1)
+        team_id, = self.execute('SELECT id FROM team')[0]
+        self.assertEqual(self.db_interface.get_data_version(), 1)
+
+        # Unchanged teams are skipped, squad included, and don't move the data version
+        self.assertEqual(self.db_interface.insert_team(team_record()), 0)
+        self.assertEqual(self.db_interface.get_data_version(), 1)
+
+        self.assertEqual(self.db_interface.insert_team(team_record(stadium='Anfield Road')), 1)
+        self.assertEqual(self.execute('SELECT id, stadium FROM team'), [(team_id, 'Anfield Road')])
+        self.assertEqual(self.execute('SELECT count(*) FROM player')[0][0], 1)
+        self.assertEqual(self.db_interface.get_data_version(), 2)
+
+    def testInsertMatchChanges(self):
+        self.assertEqual(self.db_interface.insert_match(match_record(1, 1, 'Liverpool FC', 'Norwich City FC')), 1)
+        match_id, = self.execute('SELECT id FROM match')[0]
+        self.assertEqual(self.db_interface.insert_match(match_record(1, 1, 'Liverpool FC', 'Norwich City FC')), 0)
+        self.assertEqual(self.db_interface.get_data_version(), 1)
+
+        # Played, the stored fixture is updated in place
+        self.assertEqual(self.db_interface.insert_match(match_record(1, 1, 'Liverpool FC', 'Norwich City FC', 4, 1)), 1)
+        self.assertEqual(self.execute('SELECT id, ft_home_score, ft_away_score FROM match'), [(match_id, 4, 1)])
+        self.assertEqual(self.db_interface.get_data_version(), 2)
+
+    def testUpdateStandingsChanges(self):
+        from unittest import mock
+        self.seed_competition()
+        self.assertTrue(self.db_interface.update_standings(match_day=1, record=standings_record(1, 3)))
+        self.assertEqual(self.db_interface.get_data_version(), 1)
+        entry_ids = self.execute('SELECT id FROM standings_entry ORDER BY id')
+
+        session = self.db_interface.db.session
+        with mock.patch.object(session, 'bulk_update_mappings', wraps=session.bulk_update_mappings) as bulk_update:
+            self.db_interface.update_standings(match_day=1, record=standings_record(1, 3))
+            bulk_update.assert_not_called()
+            self.assertEqual(self.db_interface.get_data_version(), 1)
+
+            # Only the changed Liverpool entries of each type are written, the stored rows are kept
+            self.db_interface.update_standings(match_day=1, record=standings_record(1, 1))
+            bulk_update.assert_called_once()
+            self.assertEqual(len(bulk_update.call_args[0][1]), 2)
+
+        self.assertEqual(self.db_interface.get_data_version(), 2)
+        self.assertEqual(self.execute('SELECT id FROM standings_entry ORDER BY id'), entry_ids)
+        self.assertEqual(self.execute("SELECT points FROM standings_entry WHERE fd_team_id = 64"), [(1,), (1,)])
+
+    def testBulkInsertPlayerChanges(self):
+        self.execute("INSERT INTO player (id, name, team, fd_id) VALUES (1, 'Mohamed Salah', 'Liverpool FC', 1)")
+
+        def player(price, history):
+            return {'id': 1, 'fantasy_price': price, 'season_match_history': history}
+
+        self.assertEqual(self.db_interface.bulk_insert_player(player(12.5, [history_entry(1, 1, 12)])), 1)
+        self.assertEqual(self.db_interface.bulk_insert_player(player(12.5, [history_entry(1, 1, 12)])), 0)
+        self.assertEqual(self.db_interface.get_data_version(), 1)
+
+        self.assertEqual(self.db_interface.bulk_insert_player(
+            player(12.6, [history_entry(1, 1, 12), history_entry(2, 2, 3)])), 1)
+        self.assertEqual(self.execute('SELECT fantasy_price FROM player'), [(12.6,)])
+        self.assertEqual(self.execute('SELECT game_week FROM fantasy_week_stats ORDER BY game_week'), [(1,), (2,)])
+        self.assertEqual(self.db_interface.get_data_version(), 2)
+
+        # Bonus points awarded after the game week was first ingested update the stored week
+        self.db_interface.bulk_insert_player(player(12.6, [history_entry(1, 1, 15, bonus=3), history_entry(2, 2, 3)]))
+        self.assertEqual(self.execute('SELECT fantasy_week_points, fantasy_week_bonus FROM fantasy_week_stats '
+                                      'WHERE game_week = 1'), [(15, 3)])
+        self.assertEqual(self.execute('SELECT bonus FROM match_stats WHERE fantasy_match_id = 1'), [(3,)])
+        self.assertEqual(self.execute('SELECT bonus FROM player_aggregate WHERE weeks = 0'), [(3,)])
+
+    def testLatestStandings(self):
+        self.seed_competition()
+        self.db_interface.update_standings(match_day=1, record=standings_record(1, 3))
+        self.db_interface.update_standings(match_day=2, record=standings_record(2, 6))
+        # Standings without a type aren't summarised, even when they are the most recent
+        self.execute("INSERT INTO standings (competition_id, season, match_day) VALUES (1, '2019', 5)")
+
+        self.assertEqual(self.db_interface.refresh_latest_standings(competition_id=1), 2)
+        self.db_interface.db.session.commit()
+        rows = self.execute('SELECT type, match_day, standings_id FROM latest_standings ORDER BY type')
+        stored = self.execute('SELECT type, id FROM standings WHERE match_day = 2 ORDER BY type')
+        self.assertEqual(rows, [('HOME', 2, stored[0][1]), ('TOTAL', 2, stored[1][1])])
+
+        latest = self.db_interface.get_latest_standings(fd_competition_id=2021)
+        self.assertEqual([standing['type'] for standing in latest], ['TOTAL', 'HOME'])
+        for standing in latest:
+            # Each summary holds the entries of its own standings, in table order
+            self.assertEqual({entry['standings_id'] for entry in standing['table']}, {standing['id']})
+            self.assertEqual([(entry['position'], entry['points']) for entry in standing['table']], [(1, 6), (2, 3)])
+
+        # The next match day replaces the summary rows of each type
+        self.db_interface.update_standings(match_day=3, record=standings_record(3, 9))
+        self.assertEqual(self.execute('SELECT type, match_day FROM latest_standings ORDER BY type'),
+                         [('HOME', 3), ('TOTAL', 3)])
+        total = self.db_interface.get_latest_standings(fd_competition_id=2021, limit=1)[0]
+        self.assertEqual([(entry['team_name'], entry['points']) for entry in total['table']], [('Liverpool FC', 9)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,13 @@
 import unittest
-from ingest_engine.fantasy_api import Fantasy, ingest_historical_base_csv, ingest_historical_gameweek_csv
+from unittest import mock
+from ingest_engine.fantasy_api import Fantasy, ingest_historical_base_csv, ingest_historical_gameweek_csv, \
+    load_historical_gameweeks, build_historical_parquet, read_historical, pq, BACKFILL_CSV_COLUMNS
 from ingest_engine.cons import Team, Player, Match, FantasyGameWeek, Season
 from pathlib import Path
 from itertools import chain
 import os
+import shutil
+import tempfile
 
 
 class ApiTest(unittest.TestCase):
@@ -87,6 +91,52 @@ class ApiTest(unittest.TestCase):
                 self.assertTrue(Player.NAME in player_data)
                 self.assertTrue(Player.YELLOW_CARDS in player_data)
 
+    def testLoadHistoricalGameweeks(self):
+        current_path = os.path.dirname(os.path.abspath(__file__))
+        current_path = "/".join(current_path.split("/")[:-1])
+        gw_df = load_historical_gameweeks(path=f'{current_path}/historical_fantasy', seasons=['2016-17', '2018-19'])
+        self.assertEqual(set(gw_df[Season.NAME].unique()), {201617, 201819})
+        self.assertEqual(len(gw_df.columns), 49)
+
+        # Same rows as parsing the gameweek files one at a time
+        single_gw = ingest_historical_gameweek_csv(csv_file=f'{current_path}/historical_fantasy/2016-17/gws/gw1.csv',
+                                                   season='201617')
+        gw1 = gw_df[gw_df[Player.FANTASY_WEEK_ID] == 20161701].drop(columns=Season.NAME).to_dict('records')
+        self.assertEqual(gw1, single_gw)
+        self.assertEqual(single_gw[0][Player.FIRST_NAME], 'Aaron')
+        self.assertEqual(single_gw[0][Player.NAME], 'Aaron Cresswell')
+
+    def testLoadBackfillColumns(self):
+        gw_df = load_historical_gameweeks(seasons=['2018-19'], columns=BACKFILL_CSV_COLUMNS)
+        self.assertEqual(len(gw_df.columns), 51)
+        self.assertTrue((gw_df[Match.FANTASY_MATCH_ID] > 0).all())
+
+        # 2018-19 names carry the element id e.g. Aaron_Cresswell_402
+        self.assertEqual(gw_df[Player.NAME][0], 'Aaron Cresswell')
+        self.assertEqual(gw_df[Player.LAST_NAME][0], 'Cresswell')
+        self.assertFalse(gw_df[Player.NAME].str.contains(r'\d').any())
+
+    @unittest.skipIf(pq is None, 'pyarrow not installed')
+    def testHistoricalParquet(self):
+        cache_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_path)
+        build_historical_parquet(cache_path=cache_path, seasons=['2017-18'])
+
+        read_kwargs = {'seasons': ['2017-18'], 'columns': [Player.NAME, Player.FANTASY_WEEK, Player.MINUTES_PLAYED],
+                       'filters': [(Player.MINUTES_PLAYED, '>', 0), (Player.FANTASY_WEEK, '<=', 3)]}
+        from_parquet = read_historical('gameweeks', cache_path=cache_path, **read_kwargs)
+        from_csv = read_historical('gameweeks', cache_path=os.path.join(cache_path, 'missing'), **read_kwargs)
+
+        self.assertEqual(list(from_parquet.columns), read_kwargs['columns'])
+        self.assertTrue((from_parquet[Player.MINUTES_PLAYED] > 0).all())
+        self.assertEqual(sorted(from_parquet.astype(object).values.tolist()),
+                         sorted(from_csv.astype(object).values.tolist()))
+
+        # A season missing from the cache manifest is read from the CSVs
+        with mock.patch('ingest_engine.fantasy_api.pq.read_table') as read_table:
+            self.assertEqual(len(read_historical('seasons', seasons=['2016-17'], cache_path=cache_path)), 683)
+            read_table.assert_not_called()
+
     def testHistoricalIngestSeason(self):
         current_path = os.path.dirname(os.path.abspath(__file__))
         current_path = "/".join(current_path.split("/")[:-1])
@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 from ingest_engine.fastest_live_scores_api import FastestLiveScores
 from ingest_engine.cons import Match, Team, Player
 
@@ -47,4 +48,21 @@ class ApiTest(unittest.TestCase):
         self.assertTrue(Match.AWAY_FORM in match_details)
         self.assertTrue(Match.PREVIOUS_ENCOUNTERS in match_details)
 
+    def testMatchDetailsMany(self):
+        documents = {'matches/1': {'matchevents': []},
+                     'matches/1/additional-data': {'headToHead': [{'homeTeam': {'dbid': 2, 'name': 'Man Utd'},
+                                                                   'awayTeam': {'dbid': 481, 'name': 'Leicester'},
+                                                                   'start': 1514058300000, 'homeGoals': 2,
+                                                                   'awayGoals': 2, 'outcome': {'winner': 'draw'},
+                                                                   'penaltyShootoutScore': None}]}}
 
+        def perform_get(built_uri):
+            return documents.get(built_uri.split('/v1/')[1].split('?')[0], {})
+
+        with mock.patch.object(self.test_fls, 'perform_get', side_effect=perform_get) as get:
+            match_details = self.test_fls.request_match_details_many(match_ids=[1, 2, 1])
+
+        self.assertEqual(get.call_count, 4)  # Both documents of each match, once
+        self.assertEqual(list(match_details), [1, 2])
+        self.assertEqual(match_details[1][Match.PREVIOUS_ENCOUNTERS][0][Match.HOME_TEAM], 'Man Utd')
+        self.assertEqual(match_details[2], {})
@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+from ingest_engine.http_cache import HttpCache, build_response, cache_key
+from ingest_engine.fastest_live_scores_api import FastestLiveScores
+
+
+class HttpCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = HttpCache(path=':memory:')
+        self.session = mock.Mock()
+        self.url = 'https://api.crowdscores.com/v1/competitions?api_key=secret'
+
+    def tearDown(self):
+        self.cache.connection.close()
+
+    def testCacheKey(self):
+        self.assertEqual(cache_key(self.url), 'https://api.crowdscores.com/v1/competitions')
+        self.assertEqual(cache_key('http://a/b?y=2&x=1'), cache_key('http://a/b?x=1&y=2'))
+
+    def testConditionalGet(self):
+        self.session.get.return_value = build_response(self.url, 200, b'{"a": 1}', {'ETag': '"v1"'})
+        self.assertEqual(self.cache.get(self.session, self.url).json(), {'a': 1})
+
+        self.session.get.return_value = build_response(self.url, 304, b'')
+        response = self.cache.get(self.session, self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'a': 1})
+        self.assertEqual(self.session.get.call_args[1]['headers'], {'If-None-Match': '"v1"'})
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['misses'], stats['revalidated'], stats['stored']), (1, 1, 1))
+
+    def testErrorsNotStored(self):
+        self.session.get.return_value = build_response(self.url, 429, b'{"errorCode": 429}')
+        self.cache.get(self.session, self.url)
+        self.assertEqual(self.cache.stats()['stored'], 0)
+
+    def testMaxAge(self):
+        self.cache.max_age = 60
+        self.session.get.return_value = build_response(self.url, 200, b'{"a": 1}')
+        self.cache.get(self.session, self.url)
+        self.cache.get(self.session, self.url)
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(self.cache.stats()['fresh_hits'], 1)
+
+    def testOffline(self):
+        self.session.get.return_value = build_response(self.url, 200, b'{"a": 1}')
+        self.cache.get(self.session, self.url)
+        self.cache.offline = True
+
+        self.assertEqual(self.cache.get(self.session, self.url).json(), {'a': 1})
+        self.assertEqual(self.cache.get(self.session, 'http://not/cached').status_code, 504)
+        self.assertEqual(self.session.get.call_count, 1)
+        self.assertEqual(self.cache.stats()['offline_misses'], 1)
+
+    def testProviderReplay(self):
+        self.session.get.return_value = build_response(self.url, 200, b'{"a": 1}')
+        self.cache.get(self.session, self.url)
+        self.cache.offline = True
+
+        fls = FastestLiveScores(api_key='other', http_cache=self.cache)
+        with mock.patch.object(fls.session, 'get') as network:
+            self.assertEqual(fls.perform_get(built_uri=self.url), {'a': 1})
+            self.assertEqual(fls.perform_get(built_uri='https://api.crowdscores.com/v1/teams'), {})
+        network.assert_not_called()
@@ -4,7 +4,7 @@ from tests.resources.team_data import f_teams, fls_teams, fd_teams
 from tests.resources.match_data import fls_matches, fd_matches, fls_match_detail
 from tests.resources.standings_data import standings
 from tests.resources.player_data import f_data, extra_f_data
-from ingest_engine.ingest_driver import Driver, str_comparator
+from ingest_engine.ingest_driver import Driver, str_comparator, normalize_team_name
 from ingest_engine.cons import Competition, Match, Season, Team, Standings, Player, FootballDataApiFilters as fdf, \
     MatchEvent
 from ingest_engine.cons import FLSApiFilters as flsf
@@ -58,13 +58,13 @@ class ApiTest(unittest.TestCase):
         fd_comp_teams.return_value = fd_teams
         fd_req_team.return_value = {}
         fls_comp_teams.return_value = fls_teams
-        mock_f_teams.return_value = f_teams
+        mock_f_teams.return_value = {'teams': f_teams}
 
         fls_comp_id = 2
         fd_comp_id = 2021
         teams = self.driver.request_teams(fd_comp_id=fd_comp_id, fls_comp_id=fls_comp_id, season=2019)
         _fls_teams = self.driver.fls.request_teams(**{flsf.COMPETITION_ID: fls_comp_id})
-        _f_teams = self.driver.fantasy.request_base_information()
+        _f_teams = self.driver.fantasy.request_base_information()['teams']
 
         for team in teams:
             for fls_team in _fls_teams:
@@ -107,8 +107,36 @@ class ApiTest(unittest.TestCase):
                                                               Player.SHIRT_NUMBER,
                                                               Team.SQUAD_ROLE]))
 
+    def testNormalizeTeamName(self):
+        self.assertEqual(normalize_team_name('Brighton & Hove Albion FC'), 'brighton hove albion')
+        self.assertEqual(normalize_team_name('AFC Bournemouth'), 'bournemouth')
+        self.assertEqual(normalize_team_name(None), '')
+
+    def testJoinMatches(self):
+        # Fantasy fixtures mirroring football-data ones, team names as given by the fantasy team mapper
+        team_names = sorted({m[Match.HOME_TEAM] for m in fd_matches} | {m[Match.AWAY_TEAM] for m in fd_matches})
+        self.driver.fantasy.team_mapper = {idx: name.replace(' FC', '') for idx, name in enumerate(team_names)}
+        self.driver.fantasy.team_mapper[team_names.index('Leicester City FC')] = 'Leicester'
+        f_matches = [{Match.START_TIME: m[Match.MATCH_UTC_DATE],
+                      Match.FANTASY_HOME_TEAM_ID: team_names.index(m[Match.HOME_TEAM]),
+                      Match.FANTASY_AWAY_TEAM_ID: team_names.index(m[Match.AWAY_TEAM]),
+                      Match.FULL_TIME_HOME_SCORE: m[Match.FULL_TIME_HOME_SCORE],
+                      Match.FULL_TIME_AWAY_SCORE: m[Match.FULL_TIME_AWAY_SCORE],
+                      Match.FANTASY_MATCH_ID: idx} for idx, m in enumerate(fd_matches)]
+
+        joined = self.driver.join_matches(fd_matches=fd_matches, fls_matches=fls_matches, fantasy_matches=f_matches)
+        self.assertEqual(len(joined), len(fls_matches))
+        for match, fls_match, f_match in joined:
+            self.assertEqual(f_match[Match.FANTASY_MATCH_ID], fd_matches.index(match))
+            self.assertIn(fls_match[Match.HOME_TEAM], match[Match.HOME_TEAM])
+            self.assertIn(fls_match[Match.AWAY_TEAM], match[Match.AWAY_TEAM])
+            self.assertEqual(fls_match[Match.FULL_TIME_HOME_SCORE], match[Match.FULL_TIME_HOME_SCORE])
+
+        # Leicester vs Leicester City is only matched through the substring fallback
+        self.assertTrue(any('Leicester' in match[Match.AWAY_TEAM] for match, _, _ in joined))
+
     @mock.patch('ingest_engine.fantasy_api.Fantasy.build_team_mapper')
-    @mock.patch('ingest_engine.fastest_live_scores_api.FastestLiveScores.request_match_details')
+    @mock.patch('ingest_engine.fastest_live_scores_api.FastestLiveScores.request_match_details_many')
     @mock.patch('ingest_engine.fastest_live_scores_api.FastestLiveScores.request_matches')
     @mock.patch('ingest_engine.football_data.FootballData.request_competition_match')
     def testRequestMatch(self, mock_fd_matches, mock_fls_matches, mock_fls_match_detail, mock_f_mapper):
@@ -116,7 +144,8 @@ class ApiTest(unittest.TestCase):
         # Build mocks
         mock_fd_matches.return_value = fd_matches
         mock_fls_matches.return_value = fls_matches
-        mock_fls_match_detail.return_value = fls_match_detail
+        mock_fls_match_detail.side_effect = lambda match_ids, workers: {match_id: fls_match_detail
+                                                                        for match_id in match_ids}
         mock_f_mapper.return_value = {
             1: "Arsenal",
             2: "Aston Villa",
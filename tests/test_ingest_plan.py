@@ -0,0 +1,83 @@
+import unittest
+from datetime import datetime
+from ingest_engine.cons import Match, Player, IngestState
+from ingest_engine.ingest_plan import IngestPlan, parse_time
+
+
+def fixture(fixture_id, game_week, kickoff, home, away, finished=True):
+    return {Match.FANTASY_MATCH_ID: fixture_id, Match.FANTASY_GAME_WEEK: game_week, Match.START_TIME: kickoff,
+            Match.FINISHED: finished, Match.FANTASY_HOME_TEAM_ID: home, Match.FANTASY_AWAY_TEAM_ID: away}
+
+
+def player(player_id, team_id, news_added=None):
+    return {Player.FANTASY_ID: player_id, Player.FANTASY_TEAM_ID: team_id, Player.FANTASY_NEWS_TIMESTAMP: news_added}
+
+
+FIXTURES = [
+    fixture(1, 1, '2019-08-09T19:00:00Z', 1, 2),
+    fixture(2, 1, '2019-08-10T14:00:00Z', 3, 4),
+    fixture(3, 2, '2019-08-17T14:00:00Z', 2, 3),
+    fixture(4, 2, '2019-08-17T16:30:00Z', 4, 1),
+    fixture(5, 3, '2019-08-24T14:00:00Z', 1, 3, finished=False),
+]
+
+PLAYERS = [player(10, 1), player(20, 2, '2019-08-12T10:00:00.123456Z'), player(30, 3), player(40, 4),
+           player(50, 5, '2019-08-01T09:00:00Z')]
+
+NOW = datetime(2019, 8, 20)
+
+
+class IngestPlanTest(unittest.TestCase):
+    def testFirstRun(self):
+        plan = IngestPlan(fixtures=FIXTURES, players=PLAYERS, watermarks={})
+        self.assertEqual(plan.game_weeks, [1, 2])
+        self.assertEqual(len(plan.players), 5)
+        self.assertTrue(plan.standings)
+        self.assertEqual(plan.last_kickoff, datetime(2019, 8, 17, 16, 30))
+        self.assertEqual(plan.last_news, datetime(2019, 8, 12, 10, 0, 0, 123456))
+        self.assertEqual(plan.estimated_calls(), {'football_data': 3, 'fls': 10, 'fantasy': 7})
+
+    def testSinceWatermarks(self):
+        watermarks = {
+            IngestState.MATCHES: {IngestState.LAST_KICKOFF: datetime(2019, 8, 10, 14)},
+            IngestState.PLAYERS: {IngestState.LAST_KICKOFF: datetime(2019, 8, 17, 14),
+                                  IngestState.LAST_NEWS: datetime(2019, 8, 5)},
+            IngestState.STANDINGS: {IngestState.LAST_KICKOFF: datetime(2019, 8, 17, 16, 30),
+                                    IngestState.LAST_MATCH_DAY: 2}
+        }
+        plan = IngestPlan(fixtures=FIXTURES, players=PLAYERS, watermarks=watermarks)
+        self.assertEqual(plan.game_weeks, [2])
+        # Teams 4 and 1 played the only fixture after the players watermark, player 20 has news since
+        self.assertEqual(sorted(p[Player.FANTASY_ID] for p in plan.players), [10, 20, 40])
+        self.assertFalse(plan.standings)
+        self.assertEqual(plan.last_match_day, 2)
+
+    def testCatchUp(self):
+        watermarks = {IngestState.MATCHES: {IngestState.LAST_KICKOFF: datetime(2019, 8, 1)}}
+        fixtures = FIXTURES[:-1] + [fixture(5, 3, '2019-08-24T14:00:00Z', 1, 3)]
+        plan = IngestPlan(fixtures=fixtures, players=[], watermarks=watermarks)
+        self.assertEqual(plan.game_weeks, [1, 2, 3])
+
+    def testNothingChanged(self):
+        watermark = {IngestState.LAST_KICKOFF: datetime(2019, 8, 17, 16, 30), IngestState.LAST_NEWS: NOW}
+        plan = IngestPlan(fixtures=FIXTURES, players=PLAYERS,
+                          watermarks=dict.fromkeys([IngestState.MATCHES, IngestState.PLAYERS, IngestState.STANDINGS],
+                                                   watermark))
+        self.assertTrue(plan.is_empty())
+        self.assertEqual(sum(plan.estimated_calls().values()), 0)
+        self.assertEqual(plan.last_kickoff, datetime(2019, 8, 17, 16, 30))
+
+    def testFixtureInPlay(self):
+        # Started long ago but suspended or still in play, only fixtures flagged finished move the watermarks
+        fixtures = FIXTURES[:3] + [fixture(4, 2, '2019-08-17T16:30:00Z', 4, 1, finished=False)]
+        plan = IngestPlan(fixtures=fixtures, players=[], watermarks={})
+        self.assertEqual(plan.game_weeks, [1, 2])  # The 14:00 fixture of game week 2 is finished
+        self.assertEqual(plan.last_kickoff, datetime(2019, 8, 17, 14))
+
+    def testParseTime(self):
+        self.assertEqual(parse_time('2019-08-09T19:00:00Z'), datetime(2019, 8, 9, 19))
+        self.assertIsNone(parse_time(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+from ingest_engine.player_resolver import PlayerResolver, normalize_name, player_name_candidates
+from ingest_engine.cons import Player
+
+
+class PlayerResolverTest(unittest.TestCase):
+    def setUp(self):
+        self.resolver = PlayerResolver(players=[
+            {Player.ID: 1, Player.NAME: 'Mohamed Salah', Player.FOOTBALL_DATA_API_ID: 3754},
+            {Player.ID: 2, Player.NAME: 'Heung-Min Son'},
+            {Player.ID: 3, Player.NAME: 'Bernardo Silva'},
+            {Player.ID: 4, Player.NAME: 'David Silva'},
+            {Player.ID: 5, Player.NAME: 'Sergio Agüero'},
+            {Player.ID: 6, Player.NAME: 'Trent Alexander-Arnold'},
+        ])
+
+    def tearDown(self):
+        pass
+
+    def testNormalizeName(self):
+        self.assertEqual(normalize_name('Sergio  Agüero'), 'sergio aguero')
+        self.assertEqual(normalize_name('Heung-Min Son'), 'heung min son')
+        self.assertEqual(normalize_name(None), '')
+
+    def testNameCandidates(self):
+        fantasy_player = {Player.NAME: 'Mohamed Salah', Player.FIRST_NAME: 'Mohamed', Player.LAST_NAME: 'Salah',
+                          Player.FANTASY_WEB_NAME: 'Salah'}
+        candidates = player_name_candidates(fantasy_player)
+        self.assertEqual(candidates[0], 'Mohamed Salah')
+        self.assertEqual(len(candidates), 9)
+        self.assertEqual(player_name_candidates({Player.NAME: 'Son'}), ['Son'])
+
+    def testResolve(self):
+        self.assertEqual(self.resolver.resolve({Player.FOOTBALL_DATA_API_ID: 3754, Player.NAME: 'M. Salah'}), 1)
+        self.assertEqual(self.resolver.resolve({Player.NAME: 'Sergio Aguero'}), 5)
+        self.assertEqual(self.resolver.resolve({Player.NAME: 'Son Heung-Min', Player.FIRST_NAME: 'Heung-Min',
+                                                Player.LAST_NAME: 'Son', Player.FANTASY_WEB_NAME: 'Son'}), 2)
+        self.assertEqual(self.resolver.resolve({Player.NAME: 'Trent Alexander Arnold'}), 6)
+
+        # Two Silvas with different initials, initial index must stay unambiguous
+        self.assertEqual(self.resolver.resolve({Player.NAME: 'D. Silva'}), 4)
+        self.assertIsNone(self.resolver.resolve({Player.NAME: 'Kevin De Bruyne'}))
+
+    def testFuzzyResolve(self):
+        self.assertEqual(self.resolver.resolve({Player.NAME: 'Bernardo Silvaa'}), 3)
+        self.assertEqual(self.resolver.stats()['fuzzy_hits'], 1)
+
+    def testStats(self):
+        self.resolver.resolve({Player.NAME: 'Mohamed Salah'})
+        self.resolver.resolve({Player.NAME: 'Nobody'})
+        stats = self.resolver.stats()
+        self.assertEqual(stats['lookups'], 2)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['match_rate'], 0.5)
+        self.assertTrue(stats['avg_lookup_us'] > 0)
+
+    def testConcurrentStats(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(self.resolver.resolve, [{Player.NAME: 'Mohamed Salah'}, {Player.NAME: 'Nobody'}] * 500))
+        stats = self.resolver.stats()
+        self.assertEqual((stats['lookups'], stats['name_hits'], stats['misses']), (1000, 500, 500))
@@ -0,0 +1,136 @@
+"""
+EXPLAIN checks of the DBInterface.get_* queries, a sequential scan of a large table fails the test
+Runs against a throwaway local Postgres given by POSTGRES_TEST_CONNECTION_STR, all tables are dropped!
+
+    POSTGRES_TEST_CONNECTION_STR=postgresql://localhost/trackr_test python -m pytest tests/test_query_plans.py
+"""
+import os
+import unittest
+
+TEST_DB = os.getenv('POSTGRES_TEST_CONNECTION_STR')
+
+# Tables that grow with every season, they must only ever be reached through an index
+LARGE_TABLES = {'match', 'match_stats', 'fantasy_week_stats', 'standings', 'standings_entry'}
+
+
+def seq_scans(plan):
+    """
+    :param plan: EXPLAIN (FORMAT JSON) plan node
+    :return: relations read with a sequential scan anywhere in the plan
+    :rtype: set
+    """
+    scans = {plan['Relation Name']} if plan['Node Type'] == 'Seq Scan' else set()
+    for child in plan.get('Plans', []):
+        scans |= seq_scans(child)
+    return scans
+
+
+@unittest.skipIf(not TEST_DB, 'POSTGRES_TEST_CONNECTION_STR not set')
+class QueryPlanTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault('POSTGRES_CONNECTION_STR', TEST_DB)
+        from sqlalchemy import create_engine, event, text
+        from db_engine.db_driver import db
+        from db_engine.db_interface import DBInterface
+        from db_engine.migrations import apply_migrations, has_extension
+
+        cls.engine = create_engine(TEST_DB)
+        db.metadata.drop_all(bind=cls.engine)
+        apply_migrations(engine=cls.engine)
+        with cls.engine.connect() as conn:
+            cls.trigram = has_extension(conn, 'pg_trgm')
+
+        with cls.engine.begin() as conn:
+            conn.execute(text("INSERT INTO competition (id, name, location, fd_api_id, fls_api_id) "
+                              "SELECT i, 'Competition ' || i, 'England', 2020 + i, i FROM generate_series(1, 10) i"))
+            conn.execute(text("INSERT INTO standings (id, competition_id, type, season, match_day) "
+                              "SELECT i, i % 10 + 1, 'TOTAL', '2019', i % 38 + 1 FROM generate_series(1, 2000) i"))
+            conn.execute(text("INSERT INTO standings_entry (standings_id, position, team_name, fd_team_id, "
+                              "games_played, games_won, games_drawn, games_lost, points, goals_for, goals_against, "
+                              "goals_difference) SELECT s, t, 'Team ' || t, t, 0, 0, 0, 0, 0, 0, 0, 0 "
+                              "FROM generate_series(1, 2000) s, generate_series(1, 20) t"))
+            conn.execute(text("INSERT INTO match (id, match_fd_id, fls_match_id, fls_competition_id, home_team_fls_id, "
+                              "away_team_fls_id, home_team, away_team, fantasy_game_week, start_time) "
+                              "SELECT i, i, i, 2, i % 20, (i + 1) % 20, 'Team ' || i % 20, 'Team ' || (i + 1) % 20, "
+                              "i % 38 + 1, timestamp '2010-08-01' + i * interval '1 hour' "
+                              "FROM generate_series(1, 20000) i"))
+            conn.execute(text("INSERT INTO player (id, name, team, fd_id) "
+                              "SELECT i, 'Player ' || i, 'Team ' || i % 20, i FROM generate_series(1, 5000) i"))
+            conn.execute(text("INSERT INTO match_stats (match_id, player_id, season, fantasy_match_id) "
+                              "SELECT i % 20000 + 1, i % 5000 + 1, 201920, i FROM generate_series(1, 200000) i"))
+            conn.execute(text("INSERT INTO fantasy_week_stats (player_id, season, game_week, fantasy_week_points) "
+                              "SELECT p, s, w, w % 10 FROM generate_series(1, 5000) p, "
+                              "generate_series(201617, 201920, 101) s, generate_series(1, 38) w"))
+            conn.execute(text('ANALYZE'))
+
+        cls.db_interface = DBInterface(db=cls.engine)
+        cls.statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            cls.statements.append((statement, parameters))
+
+        event.listen(cls.engine, 'before_cursor_execute', record)
+
+    @classmethod
+    def tearDownClass(cls):
+        from db_engine.db_driver import db
+        cls.db_interface.db.session.close()
+        db.metadata.drop_all(bind=cls.engine)
+
+    def assertIndexed(self, query, tables=LARGE_TABLES, **kwargs):
+        """
+        Run a DBInterface query then EXPLAIN every statement it sent
+        :param query: DBInterface.get_* method
+        :param tables: relations that may not be sequentially scanned
+        """
+        del self.statements[:]
+        query(**kwargs)
+        statements = list(self.statements)
+        self.assertTrue(statements)
+        with self.engine.connect() as conn:
+            for statement, parameters in statements:
+                plan = conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()[0]['Plan']
+                self.assertFalse(seq_scans(plan) & tables, f'{query.__name__}({kwargs}) scans {statement}')
+
+    def testMatch(self):
+        from db_engine.db_filters import MatchFilters
+        self.assertIndexed(self.db_interface.get_match, filters=MatchFilters(fantasy_game_week=[5]))
+        self.assertIndexed(self.db_interface.get_match, filters=MatchFilters(id=[5]))
+
+    def testStats(self):
+        from db_engine.db_filters import StatFilters
+        self.assertIndexed(self.db_interface.get_stats, filters=StatFilters(match_id=[5]))
+        self.assertIndexed(self.db_interface.get_stats, filters=StatFilters(player_id=[5]))
+
+    def testPlayer(self):
+        from db_engine.db_filters import PlayerFilters
+        self.assertIndexed(self.db_interface.get_player, filters=PlayerFilters(id=[5]))
+        self.assertIndexed(self.db_interface.get_player, filters=PlayerFilters(id=['$lt:40'], game_week=[3]))
+
+    def testStandings(self):
+        from db_engine.db_filters import StandingsFilters
+        self.assertIndexed(self.db_interface.get_standings, filters=StandingsFilters(competition_id=[3]))
+
+    def testPlayerAggregates(self):
+        from db_engine.db_filters import PlayerAggregateFilters
+        self.db_interface.refresh_player_aggregates(seasons=[201920])
+        self.db_interface.db.session.commit()
+        self.assertIndexed(self.db_interface.refresh_player_aggregates, seasons=[201920], player_ids=[5])
+        self.assertIndexed(self.db_interface.get_player_aggregates, sort='-goals_scored',
+                           filters=PlayerAggregateFilters(weeks=[5], team=['Team 1']))
+
+    def testLeaderboard(self):
+        from db_engine.db_filters import LeaderboardFilters
+        # Windows missing from PlayerAggregate are summed from the game weeks of the window only
+        self.assertIndexed(self.db_interface.get_leaderboard, stat='fantasy_points', season=201920, weeks=4,
+                           filters=LeaderboardFilters(position=['Midfielder']))
+
+    def testTrigram(self):
+        if not self.trigram:
+            self.skipTest('pg_trgm not available')
+
+        from db_engine.db_filters import MatchFilters, PlayerFilters
+        self.assertIndexed(self.db_interface.get_match, filters=MatchFilters(home_team=['Team 12']))
+        self.assertIndexed(self.db_interface.get_player, tables=LARGE_TABLES | {'player'},
+                           filters=PlayerFilters(name=['Player 1234']))
@@ -0,0 +1,59 @@
+import tempfile
+import unittest
+from multiprocessing import Pool
+from time import time
+from unittest import mock
+from ingest_engine.football_data import FootballData, MAX_ATTEMPTS
+from ingest_engine.http_cache import build_response
+from ingest_engine.rate_limiter import TokenBucket
+
+
+def acquire_at(directory):
+    bucket = TokenBucket(name='test', rate=20, period=1, directory=directory)
+    calls = []
+    for _ in range(3):
+        bucket.acquire()
+        calls.append(time())
+    return calls
+
+
+class RateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testBucketSharedAcrossProcesses(self):
+        with Pool(3) as pool:
+            calls = sorted(call for calls in pool.map(acquire_at, [self.directory.name] * 3) for call in calls)
+
+        # 9 calls at 20 per second with no burst, whichever process made them
+        self.assertGreaterEqual(calls[-1] - calls[0], 8 / 20 - 0.02)
+        self.assertTrue(all(later - earlier >= 1 / 20 - 0.02 for earlier, later in zip(calls, calls[1:])))
+
+    def testPenalize(self):
+        bucket = TokenBucket(name='test', rate=100, period=1, directory=self.directory.name)
+        self.assertEqual(bucket.acquire(), 0)
+        bucket.penalize(0.2)
+        self.assertGreaterEqual(bucket.acquire(), 0.2)
+
+        stats = bucket.stats()
+        self.assertEqual((stats['acquired'], stats['waits'], stats['rate_limited']), (2, 1, 1))
+        self.assertGreaterEqual(stats['waited_seconds'], 0.2)
+
+    def testPerformGetRetries(self):
+        fd = FootballData(api_key='test')
+        fd.rate_limiter = None
+        url = fd.uri + 'competitions/'
+        limited = build_response(url, 429, b'{"errorCode": 429, "message": "You reached your request limit. '
+                                           b'Wait 0 seconds."}')
+        with mock.patch.object(fd, 'back_off') as back_off, mock.patch.object(fd.session, 'get') as get:
+            get.side_effect = [limited, build_response(url, 200, b'{"count": 1}')]
+            self.assertEqual(fd.perform_get('competitions/'), {'count': 1})
+            back_off.assert_called_once_with(10)
+
+            get.side_effect = [limited] * MAX_ATTEMPTS
+            self.assertEqual(fd.perform_get('competitions/'), {})
+            self.assertEqual(get.call_count, 2 + MAX_ATTEMPTS)
+        fd.session.close()
@@ -0,0 +1,87 @@
+import unittest
+import flask
+from werkzeug.datastructures import MultiDict
+from api_engine.response_cache import ResponseCache, LRUBackend, RedisBackend, CachedResponse, cached_view, \
+    response_key
+
+
+class FakeRedis(object):
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.version = 1
+        self.calls = 0
+        self.app = flask.Flask(__name__)
+        self.cache = ResponseCache(backend=LRUBackend(), version_source=lambda: self.version, version_ttl=0)
+        self.app.config['response_cache'] = self.cache
+
+        @self.app.route('/v1/player')
+        @cached_view
+        def player():
+            self.calls += 1
+            if flask.request.args.get('name') == 'nobody':
+                return flask.jsonify(message='not found'), 404
+            return flask.jsonify(name=flask.request.args.get('name'), version=self.version)
+
+        self.client = self.app.test_client()
+
+    def testResponseKey(self):
+        self.assertEqual(response_key('/v1/player', MultiDict([('team', 'Arsenal'), ('limit', '5')])),
+                         response_key('/v1/player', MultiDict([('limit', '5'), ('team', 'Arsenal')])))
+        self.assertNotEqual(response_key('/v1/player', MultiDict([('limit', '5')])),
+                            response_key('/v1/player/all', MultiDict([('limit', '5')])))
+
+    def testCachedView(self):
+        first = self.client.get('/v1/player?name=Salah&limit=5')
+        second = self.client.get('/v1/player?limit=5&name=Salah')
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+        not_modified = self.client.get('/v1/player?name=Salah&limit=5',
+                                       headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(self.cache.stats()['not_modified'], 1)
+
+        # Errors are never cached
+        self.client.get('/v1/player?name=nobody')
+        self.assertEqual(self.client.get('/v1/player?name=nobody').status_code, 404)
+        self.assertEqual(self.calls, 3)
+
+    def testVersionBump(self):
+        first = self.client.get('/v1/player?name=Salah')
+        self.version = 2
+        second = self.client.get('/v1/player?name=Salah', headers={'If-None-Match': first.headers['ETag']})
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json['version'], 2)
+
+    def testLRUBackend(self):
+        backend = LRUBackend(max_entries=2, max_bytes=10)
+        backend.set('a', CachedResponse(b'1234', 'a', 'application/json', None))
+        backend.set('b', CachedResponse(b'1234', 'b', 'application/json', None))
+        backend.get('a')
+        backend.set('c', CachedResponse(b'1234', 'c', 'application/json', None))
+        self.assertIsNone(backend.get('b'))  # Least recently used goes first
+        self.assertIsNotNone(backend.get('a'))
+
+        backend.set('d', CachedResponse(b'12345', 'd', 'application/json', None))
+        self.assertEqual(backend.stats(), {'entries': 2, 'bytes': 9, 'evictions': 2})
+        backend.set('e', CachedResponse(b'12345678901', 'e', 'application/json', None))  # Larger than the cache
+        self.assertIsNone(backend.get('e'))
+
+    def testRedisBackend(self):
+        backend = RedisBackend(client=FakeRedis())
+        entry = CachedResponse(b'{"name": "Salah"}', 'tag', 'application/json', '</v1/player?cursor=x>; rel="next"')
+        backend.set('key', entry)
+        self.assertEqual(backend.get('key'), entry)
+        self.assertIsNone(backend.get('missing'))
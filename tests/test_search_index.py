@@ -0,0 +1,48 @@
+import unittest
+from ingest_engine.cons import Search as SEARCH
+from api_engine.search_index import SearchIndex, VersionedSearchIndex, trigrams
+
+DOCUMENTS = [
+    {SEARCH.TYPE: SEARCH.PLAYER, 'id': 1, 'name': 'Mohamed Salah', 'web_name': 'Salah', 'team': 'Liverpool FC'},
+    {SEARCH.TYPE: SEARCH.PLAYER, 'id': 2, 'name': 'Salomón Rondón', 'web_name': 'Rondón', 'team': 'Newcastle'},
+    {SEARCH.TYPE: SEARCH.PLAYER, 'id': 3, 'name': 'Kevin De Bruyne', 'web_name': 'De Bruyne', 'team': 'Man City'},
+    {SEARCH.TYPE: SEARCH.TEAM, 'id': 1, 'name': 'Liverpool FC'},
+    {SEARCH.TYPE: SEARCH.COMPETITION, 'id': 1, 'name': 'Premier League'},
+]
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex(DOCUMENTS)
+
+    def testTrigrams(self):
+        self.assertEqual(trigrams('Rondón'), {'  r', ' ro', 'ron', 'ond', 'ndo', 'don', 'on '})
+        self.assertEqual(trigrams(None), set())
+
+    def testSearch(self):
+        matches = self.index.search('salah')
+        self.assertEqual([(match['name'], match[SEARCH.SCORE]) for match in matches][0], ('Mohamed Salah', 1.0))
+        self.assertEqual(matches[0]['team'], 'Liverpool FC')
+
+        # Misspelt and accent free names still come first
+        self.assertEqual(self.index.search('mo salha')[0]['id'], 1)
+        self.assertEqual(self.index.search('rondon')[0]['name'], 'Salomón Rondón')
+        self.assertEqual(self.index.search('debruyne')[0]['name'], 'Kevin De Bruyne')
+
+        self.assertEqual([match[SEARCH.TYPE] for match in self.index.search('liverpool')], [SEARCH.TEAM])
+        self.assertEqual(self.index.search('liverpool', kinds=[SEARCH.PLAYER]), [])
+        self.assertEqual(self.index.search('zzzz'), [])
+        self.assertEqual(len(self.index.search('s')), 2)
+        self.assertEqual(len(self.index.search('s', limit=1)), 1)
+
+    def testVersionedSearchIndex(self):
+        version = [1]
+        documents = list(DOCUMENTS)
+        index = VersionedSearchIndex(loader=lambda: list(documents), version_source=lambda: version[0], version_ttl=0)
+        self.assertEqual(len(index.current()), 5)
+
+        documents.append({SEARCH.TYPE: SEARCH.TEAM, 'id': 2, 'name': 'Arsenal FC'})
+        self.assertEqual(index.search('arsenal'), [])  # Same data version, same index
+
+        version[0] = 2
+        self.assertEqual(index.search('arsenal')[0]['name'], 'Arsenal FC')
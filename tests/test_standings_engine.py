@@ -0,0 +1,77 @@
+import unittest
+from ingest_engine.cons import Match, Standings
+from ingest_engine.standings_engine import StandingsEngine, HOME, AWAY
+
+
+def match(match_id, match_day, home_team, away_team, home_score, away_score):
+    return {Match.ID: match_id, Match.MATCHDAY: match_day, Match.HOME_TEAM: home_team, Match.AWAY_TEAM: away_team,
+            Match.FULL_TIME_HOME_SCORE: home_score, Match.FULL_TIME_AWAY_SCORE: away_score}
+
+
+MATCHES = [
+    (match(1, 1, 'Liverpool FC', 'Norwich City FC', 4, 1), 64, 68),
+    (match(2, 1, 'Arsenal FC', 'Chelsea FC', 1, 1), 57, 61),
+    (match(3, 2, 'Norwich City FC', 'Arsenal FC', 0, 2), 68, 57),
+    (match(4, 2, 'Chelsea FC', 'Liverpool FC', 1, 1), 61, 64),
+]
+
+
+def row(entries, team_name):
+    return next(entry for entry in entries if entry[Standings.TEAM_NAME] == team_name)
+
+
+class StandingsEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = StandingsEngine()
+        for record, home_fd_id, away_fd_id in MATCHES:
+            self.engine.add_match(record, home_fd_id=home_fd_id, away_fd_id=away_fd_id)
+
+    def testTable(self):
+        table = self.engine.table()
+        self.assertEqual([entry[Standings.TEAM_NAME] for entry in table],
+                         ['Liverpool FC', 'Arsenal FC', 'Chelsea FC', 'Norwich City FC'])
+        self.assertEqual([entry[Standings.POSITION] for entry in table], [1, 2, 3, 4])
+
+        liverpool = row(table, 'Liverpool FC')
+        self.assertEqual(liverpool[Standings.FOOTBALL_DATA_TEAM_ID], 64)
+        self.assertEqual((liverpool[Standings.GAMES_PLAYED], liverpool[Standings.GAMES_WON],
+                          liverpool[Standings.GAMES_DRAWN], liverpool[Standings.GAMES_LOST]), (2, 1, 1, 0))
+        self.assertEqual((liverpool[Standings.POINTS], liverpool[Standings.GOALS_FOR],
+                          liverpool[Standings.GOALS_AGAINST], liverpool[Standings.GOAL_DIFFERENCE]), (4, 5, 2, 3))
+
+    def testHomeAway(self):
+        home, away = self.engine.table(standings_type=HOME), self.engine.table(standings_type=AWAY)
+        self.assertEqual(row(home, 'Liverpool FC')[Standings.POINTS], 3)
+        self.assertEqual(row(away, 'Liverpool FC')[Standings.POINTS], 1)
+        self.assertEqual(row(home, 'Norwich City FC')[Standings.GAMES_LOST], 1)
+        self.assertEqual(row(away, 'Norwich City FC')[Standings.GAMES_PLAYED], 1)
+        self.assertEqual(row(away, 'Arsenal FC')[Standings.GOALS_FOR], 2)
+        self.assertEqual(row(home, 'Arsenal FC')[Standings.GOALS_FOR], 1)
+
+    def testMatchDay(self):
+        table = self.engine.table(match_day=1)
+        self.assertEqual(row(table, 'Liverpool FC')[Standings.POINTS], 3)
+        self.assertEqual(row(table, 'Arsenal FC')[Standings.POSITION], 2)
+        self.assertEqual(row(table, 'Norwich City FC')[Standings.GOAL_DIFFERENCE], -3)
+        self.assertEqual(self.engine.table(match_day=2), self.engine.table())
+        self.assertEqual(self.engine.last_match_day, 2)
+
+    def testIncremental(self):
+        # Already added and unfinished matches don't change the tables
+        self.assertFalse(self.engine.add_match(MATCHES[0][0], home_fd_id=64, away_fd_id=68))
+        self.assertFalse(self.engine.add_match(match(5, 3, 'Arsenal FC', 'Liverpool FC', None, None)))
+        self.assertEqual(len(self.engine), 4)
+
+        self.assertTrue(self.engine.add_match(match(6, 3, 'Arsenal FC', 'Liverpool FC', 3, 0),
+                                              home_fd_id=57, away_fd_id=64))
+        self.assertEqual(row(self.engine.table(), 'Arsenal FC')[Standings.POSITION], 1)
+        self.assertEqual(row(self.engine.table(match_day=2), 'Arsenal FC')[Standings.POSITION], 2)
+
+    def testValidate(self):
+        snapshot = [dict(entry) for entry in self.engine.table(match_day=1)]
+        self.assertEqual(self.engine.validate(snapshot, match_day=1), [])
+
+        snapshot[0][Standings.POINTS] = 4
+        snapshot[0][Standings.FOOTBALL_DATA_TEAM_ID] = None  # Teams unknown to the crosswalk are paired by name
+        self.assertEqual(self.engine.validate(snapshot, match_day=1),
+                         [{Standings.TEAM_NAME: 'Liverpool FC', Standings.POINTS: (4, 3)}])